@@ -64,6 +64,8 @@ EXPERIMENTS_PROJECT = PythonProject(
         "seaborn",
         "snowflake-connector-python",
         "cachetools",
+        # Shares the connection pool and batched ADF with the pipeline
+        'population_data_analysis@{path = "../population_data_analysis", develop = true}',
     ],
 )
 
@@ -90,6 +92,8 @@ POPULATION_DATA_ANALYSIS_PROJECT = PythonProject(
         "seaborn",
         "snowflake-connector-python",
         "cachetools",
+        "pyarrow",
+        "duckdb",
     ],
 )
 
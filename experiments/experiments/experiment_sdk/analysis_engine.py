@@ -52,7 +52,8 @@ class VARModelOptimizer:
             model_type (str): Model type to use. Options:
                               'VAR', 'VARMAX', 'SARIMAX', or 'MARKOV'.
         """
-        self.data = data.copy()
+        # Only ever read, so the caller's frame is used as is rather than copied.
+        self.data = data
         self.model_type = model_type.upper()  # Convert to uppercase for consistency.
         self.preprocessed_data = self.preprocess_data()
 
@@ -60,11 +61,11 @@ class VARModelOptimizer:
         """
         Preprocess the data if necessary.
 
-        Currently, this method simply returns a copy of the data.
+        Currently, this method returns the data unchanged, without copying it.
         Returns:
             pd.DataFrame: Preprocessed data.
         """
-        return self.data.copy()
+        return self.data
 
     def select_columns(
         self, n_columns: int = None, method: str = "correlation"
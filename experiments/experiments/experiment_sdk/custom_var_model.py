@@ -19,6 +19,9 @@ import networkx as nx
 import numpy as np
 import pandas as pd
 import seaborn as sns
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.batched_adf import (
+    adf_p_values_for_frame,
+)
 from scipy.stats import t as t_dist
 from statsmodels.tsa.api import VAR
 from statsmodels.tsa.stattools import adfuller
@@ -81,6 +84,21 @@ class VARModelAnalyzer:
         p_value = result[1]
         return (p_value < significance), p_value
 
+    @staticmethod
+    def any_non_stationary(df, significance=0.05):
+        """
+        Run the ADF test on every column of a DataFrame in one batch.
+
+        Parameters:
+            df (pd.DataFrame): Time series data, one series per column.
+            significance (float): Significance level for the test.
+
+        Returns:
+            bool: True if any column fails to reject the unit root.
+        """
+        p_values = adf_p_values_for_frame(df)
+        return not (p_values < significance).all()
+
     def difference_if_needed(self, df):
         """
         Check each column for stationarity and difference the DataFrame if needed.
@@ -91,12 +109,7 @@ class VARModelAnalyzer:
         Returns:
             tuple: (possibly differenced DataFrame, flag indicating if differencing was applied)
         """
-        non_stationary_found = False
-        for col in df.columns:
-            stationary, _ = self.check_stationarity(df[col], self.significance)
-            if not stationary:
-                non_stationary_found = True
-                break
+        non_stationary_found = self.any_non_stationary(df, self.significance)
         if non_stationary_found:
             df_diff = df.diff().dropna()
             return df_diff, True
@@ -194,12 +207,9 @@ class VARModelAnalyzer:
         combined_df.columns = [f"{state}_{var}" for state, var in combined_df.columns]
 
         # Check stationarity for each series; if any series is non-stationary, difference the entire DataFrame.
-        non_stationary_global = False
-        for col in combined_df.columns:
-            stationary, _ = self.check_stationarity(combined_df[col], self.significance)
-            if not stationary:
-                non_stationary_global = True
-                break
+        non_stationary_global = self.any_non_stationary(
+            combined_df, self.significance
+        )
         if non_stationary_global:
             combined_df = combined_df.diff().dropna()
 
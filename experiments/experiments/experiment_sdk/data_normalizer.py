@@ -6,8 +6,10 @@ from typing import List, Optional
 import numpy as np
 import pandas as pd
 import snowflake.connector
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.batched_adf import (
+    adf_p_values_for_frame,
+)
 from pydantic import BaseModel, ConfigDict
-from statsmodels.tsa.stattools import adfuller
 
 
 class RestorativeValues(BaseModel):
@@ -115,12 +117,28 @@ class DataTransformer:
         columns_to_include = [
             col for col in df.columns if col not in ["YEAR", "STATE_NAME"]
         ]
+
+        # 1) Decide on log transform based on skew
+        # Example criterion: if skew > 1, do log transform
+        # You must ensure all values are > 0 for log. If your data can be zero or negative,
+        # you'll need a shift, e.g.: series = np.log(series - series.min() + 1)
+        logged_columns = {col for col in columns_to_include if df[col].skew() > 1}
+        candidates = pd.DataFrame(
+            {
+                col: np.log(df[col]) if col in logged_columns else df[col]
+                for col in columns_to_include
+            }
+        )
+
+        # 2) Check stationarity of every column in one batch, unless we difference anyway
+        p_values = None if always_diff else adf_p_values_for_frame(candidates)
+
         for col in columns_to_include:
 
             # df[col] = df[col].astype(float)
 
-            # Grab the original data for this column
-            series = df[col].copy()
+            # Grab the (possibly log-transformed) data for this column
+            series = candidates[col].copy()
 
             # Prepare a dictionary to store transformation info
             rules = {
@@ -131,21 +149,10 @@ class DataTransformer:
                 "std": 1.0,
             }
 
-            # 1) Decide on log transform based on skew
-            skew_val = series.skew()
-            # Example criterion: if skew > 1, do log transform
-            if skew_val > 1:
-                rules["log"] = True
-                # You must ensure all values are > 0 for log. If your data can be zero or negative,
-                # you'll need a shift, e.g.: series = np.log(series - series.min() + 1)
-                series = np.log(series)
-
-            # 2) Check stationarity and possibly difference
-            result = adfuller(
-                series.dropna()
-            )  # dropna to avoid issues if log created NaNs
-            p_value = result[1]
-            if p_value > 0.05 or always_diff:
+            rules["log"] = col in logged_columns
+
+            # Possibly difference
+            if always_diff or p_values[col] > 0.05:
                 rules["needs_diff"] = True
                 # Store first value in the CURRENT scale (already log-transformed if log was True).
                 rules["first_value_diff"] = series.iloc[0]
@@ -1,16 +1,19 @@
 """Main file for working with experiments."""
 
-import os
 from collections import defaultdict
 from typing import List, Optional
 
 import numpy as np
 import pandas as pd
-import snowflake.connector
 from pandas.testing import assert_frame_equal, assert_series_equal
 from pydantic import BaseModel, ConfigDict
 from statsmodels.tsa.stattools import adfuller
 
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.connection_pool import (
+    ConnectionPool,
+    get_default_connection_pool,
+)
+
 from experiments.experiment_sdk.analysis_engine import VARModelOptimizer
 from experiments.experiment_sdk.custom_var_attempt import CustomVAR
 from experiments.experiment_sdk.data_normalizer import DataTransformer
@@ -30,44 +33,47 @@ class RestorativeValues(BaseModel):
 class ExperimentSDK:
     """Main class for working with experiments."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        connection_pool: Optional[ConnectionPool] = None,
+        compact_dtypes: bool = False,
+    ):
         """Initialize the class."""
         self.data_transformation = DataTransformer()
         self.visualizer = Visualizer()
+        self.connection_pool = connection_pool or get_default_connection_pool()
+        self.compact_dtypes = compact_dtypes
 
     def run_query(self, query):
-        # Define connection parameters
-        conn = snowflake.connector.connect(
-            user=os.getenv("dbt_user"),
-            password=os.getenv("dbt_password"),
-            account=os.getenv("dbt_account"),
-            warehouse="COMPUTE_WH",
-            database="POP_PREDICTION",
-            schema="DEV",  # Change to "dev" if needed
-            role="transform",
-        )
-
-        # Create a cursor object
-        cur = conn.cursor()
-
-        # Execute a query
-        cur.execute(query)
-
-        # Fetch all results into a pandas DataFrame
-        df = pd.DataFrame(cur.fetchall(), columns=[desc[0] for desc in cur.description])
-
-        # Close the cursor and connection
-        cur.close()
-        conn.close()
+        # Borrow a pooled connection instead of opening one per query
+        with self.connection_pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(query)
+
+                # Fetch all results into a pandas DataFrame
+                df = pd.DataFrame(
+                    cur.fetchall(), columns=[desc[0] for desc in cur.description]
+                )
+            finally:
+                cur.close()
 
         return df
 
     def standardize_data_types(self, df):
-        """Standardize the data types."""
-        for col in df.columns:
-            if col not in ["YEAR", "STATE_NAME"]:
-                df[col] = df[col].astype(float)
-        return df
+        """Standardize the data types in one cast; compact mode halves the memory."""
+        measure_dtype = np.float32 if self.compact_dtypes else np.float64
+        to_cast = {
+            col: measure_dtype
+            for col in df.columns
+            if col not in ["YEAR", "STATE_NAME"]
+        }
+        if self.compact_dtypes:
+            if "YEAR" in df.columns:
+                to_cast["YEAR"] = np.int16
+            if "STATE_NAME" in df.columns:
+                to_cast["STATE_NAME"] = "category"
+        return df.astype(to_cast)
 
     def get_database_averaged_across_state(self):
         """Get the database averaged across the state."""
@@ -115,7 +121,7 @@ class ExperimentSDK:
         """Run the experiment."""
         dataset = self.get_database_averaged_across_state()
         normalized_dataset = self.data_transformation.normalize_data(dataset, True)
-        normalized_dataset_reserve = normalized_dataset.copy()
+        normalized_columns = normalized_dataset.columns
         analysis_engine = VARModelOptimizer(normalized_dataset)
         selected_columns, best_hyperparams, performance = analysis_engine.run()
 
@@ -124,7 +130,7 @@ class ExperimentSDK:
                 self.data_transformation.undo_transformation_for_forcast(
                     performance["forecast"],
                     selected_columns,
-                    normalized_dataset_reserve.columns,
+                    normalized_columns,
                 )
             )
             self.visualizer.plot_true_and_predictions(
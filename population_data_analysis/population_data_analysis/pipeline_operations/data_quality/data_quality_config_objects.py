@@ -0,0 +1,63 @@
+"""Config objects for the data quality gate."""
+
+from enum import Enum
+from typing import List
+
+from population_data_analysis.common import BasePydanticForRepo
+
+
+class DataQualityMode(str, Enum):
+    """What the gate does when it finds a problem."""
+
+    off = "off"
+    reject = "reject"
+    repair = "repair"
+
+
+class DataQualityCheck(str, Enum):
+    """Problems the gate looks for."""
+
+    non_finite = "non_finite"
+    non_positive_under_log = "non_positive_under_log"
+    constant_column = "constant_column"
+    duplicate_column = "duplicate_column"
+    too_short = "too_short"
+
+
+class DataQualityOptions(BasePydanticForRepo):
+    """Options for the data quality gate."""
+
+    # Off by default so sweeps see the data they always have
+    mode: DataQualityMode = DataQualityMode.off
+    # Fewer finite observations than this leaves too little to difference and fit
+    min_series_length: int = 8
+
+
+class DataQualityIssue(BasePydanticForRepo):
+    """One kind of problem and the columns it was found in."""
+
+    check: DataQualityCheck
+    columns: List[str]
+    cells: int = 0
+
+
+class DataQualityReport(BasePydanticForRepo):
+    """Everything the gate found, and what it changed when repairing."""
+
+    issues: List[DataQualityIssue] = []
+    repaired_columns: List[str] = []
+    dropped_columns: List[str] = []
+
+    @property
+    def passed(self) -> bool:
+        """Whether the scanned frame had no problems."""
+        return not self.issues
+
+    def __str__(self):
+        if self.passed:
+            return "No data quality issues."
+        return "; ".join(
+            f"{issue.check.value} in {len(issue.columns)} column(s) "
+            f"(e.g. {', '.join(issue.columns[:3])})"
+            for issue in self.issues
+        )
@@ -0,0 +1,151 @@
+"""Vectorized checks and repairs run on a loaded frame before any fitting."""
+
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from population_data_analysis.pipeline_operations.data_quality.data_quality_config_objects import (
+    DataQualityCheck,
+    DataQualityIssue,
+    DataQualityMode,
+    DataQualityOptions,
+    DataQualityReport,
+)
+
+IDENTIFIER_COLUMNS = ("YEAR", "STATE_NAME")
+
+
+class DataQualityError(ValueError):
+    """Raised when the gate rejects a frame."""
+
+    def __init__(self, report: DataQualityReport):
+        super().__init__(f"Data quality gate rejected the data: {report}")
+        self.report = report
+
+
+def measure_columns(df: pd.DataFrame) -> List[str]:
+    """Numeric columns that will be transformed and fitted."""
+    return [
+        col
+        for col, dtype in df.dtypes.items()
+        if col not in IDENTIFIER_COLUMNS and pd.api.types.is_numeric_dtype(dtype)
+    ]
+
+
+def duplicate_column_mask(values: np.ndarray) -> np.ndarray:
+    """Flag every column that repeats an earlier one exactly, NaNs included."""
+    n_rows, n_cols = values.shape
+    if n_cols == 0:
+        return np.zeros(0, dtype=bool)
+    # Compare whole columns as raw bytes so matching NaN positions count as equal
+    rows_as_bytes = np.ascontiguousarray(values.T).view(
+        np.dtype((np.void, values.dtype.itemsize * n_rows))
+    )[:, 0]
+    _, first_positions = np.unique(rows_as_bytes, return_index=True)
+    duplicates = np.ones(n_cols, dtype=bool)
+    duplicates[first_positions] = False
+    return duplicates
+
+
+def scan(
+    df: pd.DataFrame, log_applied: bool, min_series_length: int
+) -> DataQualityReport:
+    """Check every measure column in one pass over a single float matrix."""
+    columns = np.array(measure_columns(df), dtype=object)
+    values = df[list(columns)].to_numpy(dtype=np.float64)
+    finite = np.isfinite(values)
+    counts = finite.sum(axis=0)
+
+    masks = {DataQualityCheck.non_finite: ~finite}
+    if log_applied:
+        masks[DataQualityCheck.non_positive_under_log] = finite & (values <= 0)
+
+    issues = []
+    for check, mask in masks.items():
+        column_hits = mask.sum(axis=0)
+        if column_hits.any():
+            issues.append(
+                DataQualityIssue(
+                    check=check,
+                    columns=list(columns[column_hits > 0]),
+                    cells=int(column_hits.sum()),
+                )
+            )
+
+    minimum = np.min(np.where(finite, values, np.inf), axis=0, initial=np.inf)
+    maximum = np.max(np.where(finite, values, -np.inf), axis=0, initial=-np.inf)
+    column_checks = {
+        DataQualityCheck.constant_column: (counts > 0) & (minimum == maximum),
+        DataQualityCheck.duplicate_column: duplicate_column_mask(values),
+        DataQualityCheck.too_short: counts < min_series_length,
+    }
+    for check, flagged in column_checks.items():
+        if flagged.any():
+            issues.append(DataQualityIssue(check=check, columns=list(columns[flagged])))
+    return DataQualityReport(issues=issues)
+
+
+# Left to the transformation's drop_near_constant_columns and
+# drop_correlated_columns options rather than dropped by repair
+TRANSFORMATION_HANDLED_CHECKS = (
+    DataQualityCheck.constant_column,
+    DataQualityCheck.duplicate_column,
+)
+
+
+def repair(
+    df: pd.DataFrame, log_applied: bool, min_series_length: int
+) -> (pd.DataFrame, DataQualityReport):
+    """Interpolate bad cells, then drop columns that still cannot be fitted."""
+    columns = measure_columns(df)
+    values = df[columns].to_numpy(dtype=np.float64, copy=True)
+    bad = ~np.isfinite(values)
+    if log_applied:
+        # A zero population or count is a recording error, not a real observation
+        bad |= values <= 0
+    repaired_columns = [col for col, hit in zip(columns, bad.any(axis=0)) if hit]
+
+    values[bad] = np.nan
+    filled = pd.DataFrame(values, columns=columns, index=df.index).interpolate(
+        limit_direction="both"
+    )
+    # Repaired columns stay float: a fill can fall between integers, and a
+    # column with nothing left to interpolate from stays NaN until dropped
+    repaired = df.copy()
+    repaired[repaired_columns] = filled[repaired_columns]
+
+    residual = scan(repaired, log_applied, min_series_length)
+    to_drop = [
+        col
+        for issue in residual.issues
+        if issue.check not in TRANSFORMATION_HANDLED_CHECKS
+        for col in issue.columns
+    ]
+    repaired = repaired.drop(columns=list(dict.fromkeys(to_drop)))
+    return repaired, DataQualityReport(
+        repaired_columns=repaired_columns, dropped_columns=list(dict.fromkeys(to_drop))
+    )
+
+
+def enforce_data_quality(
+    df: pd.DataFrame,
+    options: DataQualityOptions,
+    log_applied: bool,
+) -> (pd.DataFrame, Optional[DataQualityReport]):
+    """Pass, repair or reject a frame according to the options."""
+    if options.mode == DataQualityMode.off:
+        return df, None
+    report = scan(df, log_applied, options.min_series_length)
+    if report.passed:
+        return df, report
+    # No repair can make up missing years
+    if options.mode == DataQualityMode.reject or len(df) < options.min_series_length:
+        raise DataQualityError(report)
+
+    repaired, changes = repair(df, log_applied, options.min_series_length)
+    if not measure_columns(repaired):
+        raise DataQualityError(report)
+    report.repaired_columns = changes.repaired_columns
+    report.dropped_columns = changes.dropped_columns
+    return repaired, report
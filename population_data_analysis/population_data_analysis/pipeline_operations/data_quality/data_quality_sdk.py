@@ -0,0 +1,61 @@
+"""Data quality sdk."""
+
+from typing import Optional
+
+import mlflow
+import pandas as pd
+
+from population_data_analysis.pipeline_operations.data_quality.data_quality_config_objects import (
+    DataQualityOptions,
+    DataQualityReport,
+)
+from population_data_analysis.pipeline_operations.data_quality.data_quality_modules.quality_checks import (
+    DataQualityError,
+    enforce_data_quality,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformation_config_objects import (
+    DataTransformationOptions,
+)
+
+
+class DataQualitySDK:
+    """Data quality sdk."""
+
+    def __init__(self):
+        """Initialize the class."""
+        self.last_report: Optional[DataQualityReport] = None
+
+    def run(
+        self,
+        data: pd.DataFrame,
+        options: DataQualityOptions,
+        transformation_options: DataTransformationOptions,
+    ) -> pd.DataFrame:
+        """Check the data before it is transformed, repairing or rejecting it."""
+        self.last_report = None
+        try:
+            data, self.last_report = enforce_data_quality(
+                data,
+                options,
+                # Only the always setting logs every column whatever its values
+                log_applied=transformation_options.log == "always",
+            )
+        except DataQualityError as e:
+            self.last_report = e.report
+            raise
+        return data
+
+    def log_last_report(self):
+        """Log what the last run found and changed on the active MLflow run."""
+        if self.last_report is None:
+            return
+        mlflow.log_dict(
+            self.last_report.model_dump(mode="json"), "data_quality_report.json"
+        )
+        mlflow.log_metric("data_quality_issues", len(self.last_report.issues))
+        mlflow.log_metric(
+            "data_quality_repaired_columns", len(self.last_report.repaired_columns)
+        )
+        mlflow.log_metric(
+            "data_quality_dropped_columns", len(self.last_report.dropped_columns)
+        )
@@ -5,6 +5,7 @@ from typing import List, Optional
 
 import pandas as pd
 from pydantic import BaseModel
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from population_data_analysis.common import BasePydanticForRepo
 
@@ -36,6 +37,37 @@ class OperationChoices(str, Enum):
     conditional = "conditional"
 
 
+class CorrelationPruningMethod(str, Enum):
+    """How columns correlated with an earlier column are found."""
+
+    exact = "exact"
+    approximate = "approximate"
+
+
+class TransformationPrecision(str, Enum):
+    """Float type gap-free numeric columns are transformed in."""
+
+    float64 = "float64"
+    float32 = "float32"
+
+
+class DimensionalityReduction(str, Enum):
+    """How the transformed columns are compressed before modelling."""
+
+    none = "none"
+    pca = "pca"
+
+
+# Options added after sweeps were first logged. They are left out of run names
+# while at their defaults, so earlier runs are still found by name.
+RUN_NAME_OPTIONAL_FIELDS = (
+    "correlation_pruning",
+    "precision",
+    "dimensionality_reduction",
+    "n_components",
+)
+
+
 class DataTransformationOptions(BaseModel):
     """Options for transforming the data."""
 
@@ -49,6 +81,48 @@ class DataTransformationOptions(BaseModel):
     drop_correlated_columns: AlwaysOrNeverOperationChoices = "always"
     correlation_threshold: float = 0.99  # drop one column if |corr| > threshold
     jitter: float = 0.01  # e.g. 0.01 will add small noise
+    # approximate only checks pairs that collide under random-projection hashing
+    correlation_pruning: CorrelationPruningMethod = "exact"
+    # float32 halves memory at the cost of precision in the transformed values
+    precision: TransformationPrecision = "float64"
+    # pca replaces the columns by their leading n_components principal components
+    dimensionality_reduction: DimensionalityReduction = "none"
+    n_components: int = 10
+
+    def fields_left_out_of_run_name(self) -> set:
+        """Late-added options still at their defaults."""
+        defaults = type(self)()
+        return {
+            name
+            for name in RUN_NAME_OPTIONAL_FIELDS
+            if getattr(self, name) == getattr(defaults, name)
+        }
+
+
+class WalkForwardWindow(str, Enum):
+    """How each fold's training window follows the forecast origin."""
+
+    expanding = "expanding"
+    rolling = "rolling"
+
+
+class WalkForwardOptions(BaseModel):
+    """Options for splitting one dataset into train/test folds at successive forecast origins."""
+
+    window: WalkForwardWindow = "expanding"
+    test_rows: int = 1  # rows forecast from each origin
+    step: int = 1  # rows the origin moves between folds
+    # Rows a rolling window keeps; defaults to the first fold's training rows
+    train_rows: Optional[int] = None
+
+
+class SplitCacheSettings(BaseSettings):
+    """Settings for the transformed split cache, read from the environment."""
+
+    model_config = SettingsConfigDict(env_prefix="POP_PREDICTION_SPLIT_CACHE_")
+
+    max_bytes: int = 512 * 1024**2
+    directory: Optional[str] = None
 
 
 class AvailableDataTransformationOperations(str, Enum):
@@ -0,0 +1,117 @@
+"""Augmented Dickey-Fuller tests for many series at once, one stacked solve per lag."""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+from statsmodels.tools.sm_exceptions import MissingDataError
+from statsmodels.tsa.adfvalues import mackinnonp
+from statsmodels.tsa.stattools import adfuller
+
+# Singular values below this fraction of the largest are dropped, as in statsmodels' pinv
+PINV_RCOND = 1e-15
+
+
+def default_max_lag(nobs: int) -> int:
+    """Longest lag adfuller searches with a constant and no explicit maxlag."""
+    max_lag = int(np.ceil(12.0 * np.power(nobs / 100.0, 1 / 4.0)))
+    max_lag = min(nobs // 2 - 2, max_lag)
+    if max_lag < 0:
+        raise ValueError(
+            "sample size is too short to use selected regression component"
+        )
+    return max_lag
+
+
+def adf_design(
+    values: np.ndarray, diffs: np.ndarray, lags: int, constant_first: bool
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Regressors (series, rows, terms) and targets (series, rows) for one lag length."""
+    rows = len(diffs)
+    terms = [values[lags:-1]] + [diffs[lags - i : rows - i] for i in range(1, lags + 1)]
+    constant = np.ones_like(terms[0])
+    terms = [constant] + terms if constant_first else terms + [constant]
+    return np.stack(terms, axis=-1).transpose(1, 0, 2), diffs[lags:].T
+
+
+def stacked_ols(
+    design: np.ndarray, target: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Pseudo-inverse least squares for a stack of regressions, as OLS.fit does it.
+
+    Returns the coefficients, the pseudo-inverses, the residual sums of squares
+    and the ranks.
+    """
+    u, s, vt = np.linalg.svd(design, full_matrices=False)
+    cutoff = PINV_RCOND * s.max(axis=-1, keepdims=True)
+    s_inv = np.divide(1.0, s, out=np.zeros_like(s), where=s > cutoff)
+    pinv = np.swapaxes(vt, -1, -2) @ (s_inv[..., None] * np.swapaxes(u, -1, -2))
+    params = (pinv @ target[..., None])[..., 0]
+    resid = target - (design @ params[..., None])[..., 0]
+    ssr = np.sum(resid**2, axis=-1)
+    # Same tolerance as np.linalg.matrix_rank; s is float64 here
+    tolerance = s.max(axis=-1, keepdims=True) * s.shape[-1] * np.spacing(1.0)
+    rank = np.sum(s > tolerance, axis=-1)
+    return params, pinv, ssr, rank
+
+
+def adf_statistics(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ADF statistic and AIC-selected lag of each column, as adfuller(column) computes them."""
+    values = np.asarray(values, dtype=np.float64)
+    if not np.isfinite(values).all():
+        raise MissingDataError("exog contains inf or nans")
+    if (values.max(axis=0) == values.min(axis=0)).any():
+        raise ValueError("Invalid input, x is constant")
+    max_lag = default_max_lag(len(values))
+    diffs = np.diff(values, axis=0)
+
+    # Pick each column's lag by AIC, fitting every candidate on the same rows
+    design, target = adf_design(values, diffs, max_lag, constant_first=True)
+    nobs = target.shape[-1]
+    aic = np.empty((max_lag + 1, values.shape[1]))
+    for lag in range(max_lag + 1):
+        _, _, ssr, rank = stacked_ols(design[..., : lag + 2], target)
+        with np.errstate(divide="ignore"):
+            llf = -nobs / 2.0 * (np.log(2 * np.pi) + np.log(ssr / nobs) + 1)
+        aic[lag] = -2 * llf + 2 * rank
+    best_lags = np.argmin(aic, axis=0)
+
+    # Refit each column at its chosen lag on every row that lag allows
+    statistics = np.empty(values.shape[1])
+    for lag in np.unique(best_lags):
+        columns = best_lags == lag
+        design, target = adf_design(
+            values[:, columns], diffs[:, columns], lag, constant_first=False
+        )
+        params, pinv, ssr, rank = stacked_ols(design, target)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = ssr / (target.shape[-1] - rank)
+            statistics[columns] = params[:, 0] / np.sqrt(
+                scale * np.sum(pinv[:, 0] ** 2, axis=-1)
+            )
+    return statistics, best_lags
+
+
+def mackinnon_p_values(statistics: np.ndarray) -> np.ndarray:
+    """mackinnonp for an array of constant-only, single-series ADF statistics."""
+    return np.array(
+        [mackinnonp(statistic, regression="c", N=1) for statistic in statistics],
+        dtype=np.float64,
+    )
+
+
+def adf_p_values(values: np.ndarray) -> np.ndarray:
+    """MacKinnon p-value of each column's ADF test, matching adfuller(column)[1]."""
+    statistics, _ = adf_statistics(values)
+    return mackinnon_p_values(statistics)
+
+
+def adf_p_values_for_frame(df: pd.DataFrame) -> pd.Series:
+    """ADF p-value per column; columns with gaps are tested on their non-null rows."""
+    has_gaps = df.isna().any()
+    p_values = pd.Series(np.nan, index=df.columns)
+    if not has_gaps.all():
+        p_values[~has_gaps] = adf_p_values(df.loc[:, ~has_gaps].to_numpy())
+    for col in df.columns[has_gaps]:
+        p_values[col] = adfuller(df[col].dropna())[1]
+    return p_values
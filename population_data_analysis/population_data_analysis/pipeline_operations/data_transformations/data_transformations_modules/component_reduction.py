@@ -0,0 +1,92 @@
+"""Compress a transformed panel to its leading principal components."""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from population_data_analysis.common import BasePydanticForRepo
+
+# Extra sketch columns and power iterations for the randomized SVD
+OVERSAMPLES = 10
+POWER_ITERATIONS = 4
+SVD_SEED = 0
+
+
+def randomized_svd(
+    matrix: np.ndarray, n_components: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Leading singular triplets of a matrix from a random sketch of its range.
+
+    Costs O(rows x columns x components) rather than a full SVD's
+    O(rows x columns x min(rows, columns)). Falls back to the full SVD when
+    the sketch would be as large as the matrix anyway.
+    """
+    sketch_size = n_components + OVERSAMPLES
+    if sketch_size >= min(matrix.shape):
+        u, s, vt = np.linalg.svd(matrix, full_matrices=False)
+        return u[:, :n_components], s[:n_components], vt[:n_components]
+    rng = np.random.default_rng(SVD_SEED)
+    basis, _ = np.linalg.qr(
+        matrix @ rng.standard_normal((matrix.shape[1], sketch_size))
+    )
+    for _ in range(POWER_ITERATIONS):
+        basis, _ = np.linalg.qr(matrix.T @ basis)
+        basis, _ = np.linalg.qr(matrix @ basis)
+    u, s, vt = np.linalg.svd(basis.T @ matrix, full_matrices=False)
+    return (basis @ u)[:, :n_components], s[:n_components], vt[:n_components]
+
+
+class ComponentReduction(BasePydanticForRepo):
+    """Principal components of a transformed panel and what maps them back to its columns."""
+
+    columns: List[str]
+    component_columns: List[str]
+    center: np.ndarray
+    # (components, columns); rows are orthonormal
+    loadings: np.ndarray
+    explained_variance_ratio: np.ndarray
+
+    def expand(self, scores: np.ndarray) -> np.ndarray:
+        """Map component values shaped (..., rows, components) back to the columns."""
+        return np.asarray(scores, dtype=np.float64) @ self.loadings + self.center
+
+
+def principal_components(
+    df: pd.DataFrame, n_components: int, fit_rows: Optional[int] = None
+) -> Tuple[pd.DataFrame, ComponentReduction]:
+    """Replace the columns of df by the scores of its leading principal components.
+
+    The components are fitted on the first fit_rows rows, by default all of
+    them, and every row is projected onto them, so rows held out for testing
+    do not shape the components. At most fit_rows - 1 components are kept,
+    since centering leaves no variance for more. Each loading's largest entry
+    is made positive so the result does not depend on the SVD's sign choices.
+    """
+    values = df.to_numpy(dtype=np.float64)
+    if np.isnan(values).any():
+        raise ValueError("Principal components need columns without gaps.")
+    fitted = values[:fit_rows]
+    n_components = min(n_components, len(fitted) - 1, values.shape[1])
+    if n_components < 1:
+        raise ValueError("At least one component and two rows are needed.")
+    center = fitted.mean(axis=0)
+    centered = fitted - center
+    _, s, loadings = randomized_svd(centered, n_components)
+    signs = np.sign(loadings[np.arange(len(loadings)), np.abs(loadings).argmax(axis=1)])
+    loadings = loadings * signs[:, None]
+    total_variance = np.einsum("ij,ij->", centered, centered)
+    # Keep float32 output for float32 input
+    dtype = np.float32 if (df.dtypes == np.float32).all() else np.float64
+    scores = pd.DataFrame(
+        ((values - center) @ loadings.T).astype(dtype),
+        index=df.index,
+        columns=[f"component_{i + 1}" for i in range(n_components)],
+    )
+    return scores, ComponentReduction(
+        columns=list(df.columns),
+        component_columns=list(scores.columns),
+        center=center,
+        loadings=loadings,
+        explained_variance_ratio=s**2 / total_variance,
+    )
@@ -0,0 +1,156 @@
+"""Find columns highly correlated with an earlier column without a dense correlation matrix."""
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Correlations this close to the threshold are recomputed the way DataFrame.corr does
+THRESHOLD_TOLERANCE = 1e-9
+DEFAULT_BLOCK_SIZE = 1024
+
+# Random-projection hashing for the approximate pre-filter: a pair with
+# |corr| > 0.99 shares at least one band with probability above 1 - 1e-7.
+HASH_BANDS = 32
+HASH_BITS_PER_BAND = 20
+HASH_SEED = 0
+# Values gathered at once when correlating candidate pairs
+PAIR_CHUNK_VALUES = 1 << 22
+
+
+def standardized_columns(values: np.ndarray) -> np.ndarray:
+    """Center each column and scale it to unit length, so dot products are correlations.
+
+    Constant columns become zero and so never look correlated, as their NaN
+    correlation never exceeds a threshold.
+    """
+    centered = values - values.mean(axis=0)
+    norms = np.sqrt(np.einsum("ij,ij->j", centered, centered))
+    return np.divide(centered, norms, out=np.zeros_like(centered), where=norms > 0)
+
+
+def pandas_correlation(values: np.ndarray, i: int, j: int) -> float:
+    """Correlation of two columns computed exactly as DataFrame.corr does."""
+    return pd.DataFrame(values[:, [i, j]]).corr().iloc[0, 1]
+
+
+def resolve_near_threshold(
+    values: np.ndarray,
+    threshold: float,
+    drop: np.ndarray,
+    near_pairs: Dict[int, List[int]],
+):
+    """Settle undecided columns whose best correlation was within rounding of the threshold."""
+    for column, earlier_columns in near_pairs.items():
+        if drop[column]:
+            continue
+        drop[column] = any(
+            abs(pandas_correlation(values, earlier, column)) > threshold
+            for earlier in earlier_columns
+        )
+
+
+def correlated_mask_exact(
+    values: np.ndarray, threshold: float, block_size: int = DEFAULT_BLOCK_SIZE
+) -> np.ndarray:
+    """Which columns have |corr| above the threshold with any earlier column.
+
+    Works through the upper triangle one block x block tile at a time and
+    stops scanning a block of columns once every one of them is decided.
+    """
+    z = standardized_columns(values)
+    n_columns = z.shape[1]
+    drop = np.zeros(n_columns, dtype=bool)
+    near_pairs: Dict[int, List[int]] = {}
+    for start in range(0, n_columns, block_size):
+        columns = np.arange(start, min(start + block_size, n_columns))
+        for row_start in range(0, columns[-1], block_size):
+            columns = columns[~drop[columns]]
+            if not columns.size:
+                break
+            rows = np.arange(row_start, min(row_start + block_size, columns[-1]))
+            corr = np.abs(z[:, rows].T @ z[:, columns])
+            earlier = rows[:, None] < columns[None, :]
+            drop[columns] |= ((corr > threshold + THRESHOLD_TOLERANCE) & earlier).any(
+                axis=0
+            )
+            near = (np.abs(corr - threshold) <= THRESHOLD_TOLERANCE) & earlier
+            for row, column in zip(*np.nonzero(near)):
+                near_pairs.setdefault(columns[column], []).append(rows[row])
+    resolve_near_threshold(values, threshold, drop, near_pairs)
+    return drop
+
+
+def hash_candidate_pairs(z: np.ndarray) -> np.ndarray:
+    """(earlier, later) column pairs sharing a band of sign-random-projection bits.
+
+    A band and its complement hash alike, so strongly negative correlations
+    are found too. Pairs sharing several bands are listed once per band.
+    """
+    rng = np.random.default_rng(HASH_SEED)
+    planes = rng.standard_normal((HASH_BANDS, HASH_BITS_PER_BAND, z.shape[0]))
+    bits = (planes @ z) > 0
+    weights = 1 << np.arange(HASH_BITS_PER_BAND)
+    keys = (bits * weights[:, None]).sum(axis=1)
+    keys = np.minimum(keys, weights.sum() - keys)
+    earlier, later = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+    for band_keys in keys:
+        # Stable, so columns sharing a key stay in ascending order
+        order = np.argsort(band_keys, kind="stable")
+        sorted_keys = band_keys[order]
+        # Pair every column with the one `offset` places later in its bucket
+        offset = 1
+        while offset < len(order):
+            same = sorted_keys[offset:] == sorted_keys[:-offset]
+            if not same.any():
+                break
+            earlier.append(order[:-offset][same])
+            later.append(order[offset:][same])
+            offset += 1
+    return np.stack([np.concatenate(earlier), np.concatenate(later)])
+
+
+def pair_correlations(
+    z: np.ndarray, earlier: np.ndarray, later: np.ndarray
+) -> np.ndarray:
+    """|corr| of each listed column pair, gathering a bounded number of values at a time."""
+    corr = np.empty(len(earlier))
+    chunk = max(1, PAIR_CHUNK_VALUES // z.shape[0])
+    for start in range(0, len(earlier), chunk):
+        pairs = slice(start, start + chunk)
+        corr[pairs] = np.einsum("ij,ij->j", z[:, earlier[pairs]], z[:, later[pairs]])
+    return np.abs(corr)
+
+
+def correlated_mask_approximate(values: np.ndarray, threshold: float) -> np.ndarray:
+    """Like correlated_mask_exact, checking only pairs that hash together.
+
+    It never drops a column the exact mode keeps, but can keep one the exact
+    mode drops when a pair fails to hash together. That is rare near the
+    default 0.99 threshold and more common at low thresholds.
+    """
+    z = standardized_columns(values)
+    drop = np.zeros(z.shape[1], dtype=bool)
+    earlier, later = hash_candidate_pairs(z)
+    corr = pair_correlations(z, earlier, later)
+    np.logical_or.at(drop, later, corr > threshold + THRESHOLD_TOLERANCE)
+    near_pairs: Dict[int, List[int]] = {}
+    near = np.abs(corr - threshold) <= THRESHOLD_TOLERANCE
+    for i, j in zip(earlier[near], later[near]):
+        near_pairs.setdefault(j, []).append(i)
+    resolve_near_threshold(values, threshold, drop, near_pairs)
+    return drop
+
+
+def correlated_column_mask(
+    df: pd.DataFrame, threshold: float, method: str = "exact"
+) -> np.ndarray:
+    """Which columns of df have |corr| above the threshold with an earlier column."""
+    if df.isna().any().any():
+        # Pairwise-complete correlations need the dense pandas computation
+        corr_matrix = df.corr().abs().to_numpy()
+        return (np.triu(corr_matrix, k=1) > threshold).any(axis=0)
+    values = df.to_numpy(dtype=np.float64)
+    if method == "approximate":
+        return correlated_mask_approximate(values, threshold)
+    return correlated_mask_exact(values, threshold)
@@ -4,12 +4,43 @@ import numpy as np
 import pandas as pd
 from statsmodels.tsa.stattools import adfuller
 
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.component_reduction import (
+    principal_components,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.correlation_pruning import (
+    correlated_column_mask,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.inverse_transform import (
+    InverseTransform,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.matrix_normalization import (
+    count_unique,
+    difference_matrix,
+    log_matrix,
+    standardize_matrix,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.split_cache import (
+    frame_fingerprint,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.transformation_dag import (
+    PrefixMemo,
+    TransformationState,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.frame_cache import (
+    frame_nbytes,
+)
+
+# Bytes of memoized select, log and difference results kept across input frames
+MEMO_MAX_BYTES = 256 * 1024**2
+# Noise values drawn at once when jittering in place
+JITTER_CHUNK_VALUES = 1 << 20
+
 
 def drop_near_constant(
     df: pd.DataFrame, min_unique_ratio: float = 0.5
 ) -> (pd.DataFrame, pd.DataFrame):
     """Drop columns with too few unique values."""
-    nunique = df.nunique()
+    nunique = count_unique(df)
     keep = nunique > (len(df) * min_unique_ratio)
     dropped = df.loc[:, ~keep]
     return df.loc[:, keep], dropped
@@ -33,9 +64,10 @@ def apply_log(series: pd.Series, option: str) -> (pd.Series, dict):
 def apply_difference(series: pd.Series, option: str) -> (pd.Series, dict):
     """Difference the series if forced or if non-stationary (p-value > 0.05)."""
     rules = {"needs_diff": False, "first_value_diff": None}
-    result = adfuller(series.dropna())
-    p_value = result[1]
-    if option == "always" or (option == "conditional" and p_value > 0.05):
+    # The test only matters when the choice is conditional
+    if option == "always" or (
+        option == "conditional" and adfuller(series.dropna())[1] > 0.05
+    ):
         rules["needs_diff"] = True
         rules["first_value_diff"] = series.iloc[0]
         series = series.diff().dropna()
@@ -54,11 +86,11 @@ def standardize_series(series: pd.Series, option: str) -> (pd.Series, dict):
     return series, rules
 
 
-def drop_highly_correlated(df: pd.DataFrame, threshold: float) -> (pd.DataFrame, list):
+def drop_highly_correlated(
+    df: pd.DataFrame, threshold: float, method: str = "exact"
+) -> (pd.DataFrame, list):
     """Drop one of each pair of columns that are highly correlated."""
-    corr_matrix = df.corr().abs()
-    upper = corr_matrix.where(np.triu(np.ones(corr_matrix.shape), k=1).astype(bool))
-    to_drop = [col for col in upper.columns if any(upper[col] > threshold)]
+    to_drop = list(df.columns[correlated_column_mask(df, threshold, method)])
     return df.drop(columns=to_drop), to_drop
 
 
@@ -70,79 +102,392 @@ def add_jitter(df: pd.DataFrame, jitter: float) -> pd.DataFrame:
     return df
 
 
+def log_rules(columns: list, logged, shifted, shifts) -> dict:
+    """Per-column rules for a log_matrix result."""
+    rules = {}
+    for j, col in enumerate(columns):
+        rules[col] = {"log": bool(logged[j])}
+        if shifted[j]:
+            rules[col]["log_shift"] = shifts[j]
+    return rules
+
+
+def difference_rules(columns: list, differenced, first_values) -> dict:
+    """Per-column rules for a difference_matrix result."""
+    return {
+        col: {
+            "needs_diff": bool(differenced[j]),
+            "first_value_diff": first_values[j] if differenced[j] else None,
+        }
+        for j, col in enumerate(columns)
+    }
+
+
+def standardize_rules(columns: list, option: str, means, stds) -> dict:
+    """Per-column rules for a standardize_matrix result."""
+    standardized = option == "always"
+    return {
+        col: {
+            "mean": means[j] if standardized else 0.0,
+            "std": stds[j] if standardized else 1.0,
+        }
+        for j, col in enumerate(columns)
+    }
+
+
+def add_jitter_in_place(values: np.ndarray, jitter: float):
+    """Add the same noise as add_jitter, drawing it a block of rows at a time."""
+    if jitter > 0:
+        rows_per_chunk = max(1, JITTER_CHUNK_VALUES // max(1, values.shape[1]))
+        for start in range(0, len(values), rows_per_chunk):
+            rows = values[start : start + rows_per_chunk]
+            rows += np.random.normal(0, jitter, size=rows.shape)
+
+
+def select_columns_step(
+    df: pd.DataFrame, option: str, precision: str = "float64"
+) -> TransformationState:
+    """Drop near-constant columns if requested and group the numeric ones for the later steps."""
+    if option == "always":
+        df, dropped = drop_near_constant(df, min_unique_ratio=0.5)
+    else:
+        dropped = pd.DataFrame()
+
+    columns = [
+        col
+        for col, dtype in df.dtypes.items()
+        if col not in ["YEAR", "STATE_NAME"] and pd.api.types.is_numeric_dtype(dtype)
+    ]
+    has_gaps = df[columns].isna().any()
+    # Float columns without gaps go through the matrix path, one block per dtype
+    blocks = {}
+    for col, dtype in df[columns].dtypes.items():
+        if pd.api.types.is_float_dtype(dtype) and not has_gaps[col]:
+            if precision == "float32":
+                dtype = np.dtype(np.float32)
+            blocks.setdefault(dtype, []).append(col)
+    in_blocks = {col for block_cols in blocks.values() for col in block_cols}
+    return TransformationState(
+        source=df,
+        dropped=dropped,
+        columns=columns,
+        blocks=list(blocks.values()),
+        block_values=[
+            df[block_cols].to_numpy(dtype=dtype) for dtype, block_cols in blocks.items()
+        ],
+        series={col: df[col] for col in columns if col not in in_blocks},
+        rules={col: {} for col in columns},
+    )
+
+
+def log_step(state: TransformationState, option: str) -> TransformationState:
+    """Log transform every column that apply_log would."""
+    new_rules, block_values = {}, []
+    for block_cols, values in zip(state.blocks, state.block_values):
+        values = np.array(values, order="F", copy=True)
+        new_rules.update(log_rules(block_cols, *log_matrix(values, option)))
+        block_values.append(values)
+    series = {}
+    for col, values in state.series.items():
+        series[col], new_rules[col] = apply_log(values, option)
+    return state.with_rules(new_rules, block_values=block_values, series=series)
+
+
+def difference_step(state: TransformationState, option: str) -> TransformationState:
+    """Difference every column that apply_difference would."""
+    new_rules, block_values = {}, []
+    for block_cols, values in zip(state.blocks, state.block_values):
+        values = values.copy(order="F")
+        new_rules.update(
+            difference_rules(block_cols, *difference_matrix(values, option))
+        )
+        block_values.append(values)
+    series = {}
+    for col, values in state.series.items():
+        series[col], new_rules[col] = apply_difference(values, option)
+    return state.with_rules(new_rules, block_values=block_values, series=series)
+
+
+def standardize_step(state: TransformationState, option: str) -> TransformationState:
+    """Z-normalize if requested and line every column up on rows 1 onwards."""
+    new_rules, transformed_cols = {}, {}
+    transformed_df = None
+    for block_cols, values in zip(state.blocks, state.block_values):
+        values = values.copy(order="F")
+        differenced = np.array([state.rules[col]["needs_diff"] for col in block_cols])
+        means, stds = standardize_matrix(values, option, differenced)
+        new_rules.update(standardize_rules(block_cols, option, means, stds))
+        block = pd.DataFrame(
+            values[1:], index=state.source.index[1:], columns=block_cols
+        )
+        if len(block_cols) == len(state.columns):
+            transformed_df = block
+        else:
+            transformed_cols.update(block.items())
+    for col, series in state.series.items():
+        series, new_rules[col] = standardize_series(series, option)
+        # Align length if differencing dropped first element
+        if len(series) == len(state.source):
+            series = series[1:]
+        transformed_cols[col] = series
+    if transformed_df is None:
+        transformed_df = pd.DataFrame(
+            {col: transformed_cols[col] for col in state.columns}
+        )
+    return state.with_rules(new_rules, transformed=transformed_df)
+
+
+def decorrelate_step(
+    state: TransformationState, options: "DataTransformationOptions"
+) -> TransformationState:
+    """Optionally drop columns highly correlated with an earlier one."""
+    if options.drop_correlated_columns != "always":
+        return state
+    transformed_df, dropped_corr = drop_highly_correlated(
+        state.transformed,
+        options.correlation_threshold,
+        options.correlation_pruning,
+    )
+    return state.with_rules(
+        {col: {"dropped_due_to_correlation": dropped_corr} for col in state.columns},
+        transformed=transformed_df,
+    )
+
+
+def jitter_step(
+    state: TransformationState, jitter: float, precision: str = "float64"
+) -> TransformationState:
+    """Optionally add jitter."""
+    transformed_df = add_jitter(state.transformed, jitter)
+    if precision == "float32" and jitter > 0:
+        # Noise is drawn in float64; keep the precision asked for
+        transformed_df = transformed_df.astype(np.float32)
+    return state.model_copy(update={"transformed": transformed_df})
+
+
+def reduce_step(
+    state: TransformationState, options: "DataTransformationOptions"
+) -> TransformationState:
+    """Optionally replace the columns by their leading principal components.
+
+    The components are fitted on the training rows only and the test rows
+    are projected onto them.
+    """
+    if options.dimensionality_reduction != "pca":
+        return state
+    transformed_df, components = principal_components(
+        state.transformed,
+        options.n_components,
+        fit_rows=int(len(state.transformed) * options.train_test_split),
+    )
+    return state.model_copy(
+        update={
+            "transformed": transformed_df,
+            "components": components,
+            "unreduced": state.transformed,
+        }
+    )
+
+
 # The simplified DataTransformer class:
 class DataTransformer:
-    """Simplified data transformer using helper functions."""
+    """Simplified data transformer using helper functions.
+
+    The column selection, log and difference steps are memoized under the
+    input frame and the options that led to them, up to memo_max_bytes, so
+    option sets sharing those steps on the same data reuse that work. The
+    cheaper later steps, and the jitter and reduction whose outputs differ
+    for nearly every option set, run each time. With in_place, nothing is
+    memoized and every step works on one buffer instead, for single runs
+    where memory matters more than reuse.
+    """
 
-    def __init__(self):
+    def __init__(self, in_place: bool = False, memo_max_bytes: int = MEMO_MAX_BYTES):
         self.restorative_values = None
+        self.inverse = None
+        self.in_place = in_place
+        self.memo = PrefixMemo(max_bytes=memo_max_bytes)
 
     def normalize_data(
         self, df: pd.DataFrame, options: "DataTransformationOptions"
     ) -> pd.DataFrame:
         """Normalize the data using the provided options."""
+        if self.in_place:
+            transformed_df = self.normalize_data_in_place(df, options)
+            if transformed_df is not None:
+                return transformed_df
+        key = (
+            frame_fingerprint(df),
+            "drop_near_constant_columns",
+            options.drop_near_constant_columns,
+            options.precision,
+        )
+        # The selection holds on to the frame it selected from
+        state = self.memo.step(
+            key,
+            lambda: select_columns_step(
+                df, options.drop_near_constant_columns, options.precision
+            ),
+            lambda state: state.nbytes() + frame_nbytes(state.source),
+        )
+        key += ("log", options.log)
+        state = self.memo.step(
+            key, lambda: log_step(state, options.log), TransformationState.nbytes
+        )
+        key += ("difference", options.difference)
+        state = self.memo.step(
+            key,
+            lambda: difference_step(state, options.difference),
+            TransformationState.nbytes,
+        )
+        state = standardize_step(state, options.z_normalize)
+        state = decorrelate_step(state, options)
+        state = jitter_step(state, options.jitter, options.precision)
+        state = reduce_step(state, options)
 
-        original_length = len(df)
-        original_cols = list(df.columns)
+        # Store restorative values for undoing the transforms later.
+        source = state.source
+        # Inverting maps components back to the columns they were fitted on
+        remaining = list(state.transformed.columns)
+        unreduced_test_data = None
+        if state.components is not None:
+            remaining = state.components.columns
+            unreduced_test_data = state.unreduced[
+                int(len(state.unreduced) * options.train_test_split) :
+            ]
+        self.restorative_values = {
+            "first_row": source.iloc[0],
+            "operation_rules": state.rules,
+            "years_column": source["YEAR"] if "YEAR" in source.columns else None,
+            "dropped_columns": state.dropped,
+            "column_order": list(df.columns),
+            "remaining_columns": remaining,
+            "original_values": source[state.columns],
+            "components": state.components,
+            "unreduced_test_data": unreduced_test_data,
+        }
+        self.inverse = None
+        return state.transformed
 
-        # Step 0: Drop near-constant columns if requested
+    def normalize_data_in_place(
+        self, df: pd.DataFrame, options: "DataTransformationOptions"
+    ):
+        """Normalize into one preallocated buffer that the result is a view of.
+
+        Returns None, leaving the work to the stepwise path, unless every
+        numeric column is a float column without gaps.
+        """
         if options.drop_near_constant_columns == "always":
-            df, dropped = drop_near_constant(df, min_unique_ratio=0.5)
+            keep = (count_unique(df) > len(df) * 0.5).to_numpy()
+            dropped = df.loc[:, ~keep]
+            kept = list(df.columns[keep])
         else:
             dropped = pd.DataFrame()
+            kept = list(df.columns)
+        dtypes = df.dtypes[kept]
+        columns = [
+            col
+            for col, dtype in dtypes.items()
+            if col not in ["YEAR", "STATE_NAME"]
+            and pd.api.types.is_numeric_dtype(dtype)
+        ]
+        if not columns or not all(
+            pd.api.types.is_float_dtype(dtypes[col]) for col in columns
+        ):
+            return None
+        dtype = np.float32 if options.precision == "float32" else np.float64
+        buffer = np.empty((len(df), len(columns)), dtype=dtype, order="F")
+        for j, col in enumerate(columns):
+            buffer[:, j] = df[col].to_numpy()
+        if np.isnan(buffer).any():
+            return None
 
-        rules_list = {}
-        transformed_cols = {}
-
-        # Process each numeric column (skip identifiers)
-        for col in df.columns:
-            if col in ["YEAR", "STATE_NAME"]:
-                continue
-            if not pd.api.types.is_numeric_dtype(df[col]):
-                continue
+        rules = log_rules(columns, *log_matrix(buffer, options.log))
+        differenced, first_values = difference_matrix(buffer, options.difference)
+        means, stds = standardize_matrix(buffer, options.z_normalize, differenced)
+        for new_rules in (
+            difference_rules(columns, differenced, first_values),
+            standardize_rules(columns, options.z_normalize, means, stds),
+        ):
+            for col in columns:
+                rules[col].update(new_rules[col])
+        values = buffer[1:]
 
-            series = df[col].copy()
-            col_rules = {}
-
-            # 1. Log transform
-            series, log_rules = apply_log(series, options.log)
-            col_rules.update(log_rules)
-
-            # 2. Difference the series
-            series, diff_rules = apply_difference(series, options.difference)
-            col_rules.update(diff_rules)
-
-            # 3. Standardize
-            series, std_rules = standardize_series(series, options.z_normalize)
-            col_rules.update(std_rules)
-
-            # Align length if differencing dropped first element
-            if len(series) == original_length:
-                series = series[1:]
-            transformed_cols[col] = series
-            rules_list[col] = col_rules
-
-        transformed_df = pd.DataFrame(transformed_cols)
-
-        # 4. Optionally drop highly correlated columns
+        remaining = columns
         if options.drop_correlated_columns == "always":
-            transformed_df, dropped_corr = drop_highly_correlated(
-                transformed_df, options.correlation_threshold
+            drop = correlated_column_mask(
+                pd.DataFrame(values, copy=False),
+                options.correlation_threshold,
+                options.correlation_pruning,
             )
-            for col in rules_list:  # pylint: disable=consider-using-dict-items
-                rules_list[col]["dropped_due_to_correlation"] = dropped_corr
+            dropped_corr = [col for col, is_dropped in zip(columns, drop) if is_dropped]
+            # Shift kept columns left over dropped ones, then keep a view of them
+            kept_positions = np.flatnonzero(~drop)
+            for new_position, position in enumerate(kept_positions):
+                if new_position != position:
+                    values[:, new_position] = values[:, position]
+            values = values[:, : len(kept_positions)]
+            remaining = [columns[position] for position in kept_positions]
+            for col in columns:
+                rules[col]["dropped_due_to_correlation"] = dropped_corr
 
-        # 5. Optionally add jitter
-        transformed_df = add_jitter(transformed_df, options.jitter)
+        add_jitter_in_place(values, options.jitter)
+        transformed_df = pd.DataFrame(
+            values, index=df.index[1:], columns=remaining, copy=False
+        )
+        components, unreduced_test_data = None, None
+        if options.dimensionality_reduction == "pca":
+            break_point = int(len(transformed_df) * options.train_test_split)
+            unreduced_test_data = transformed_df[break_point:]
+            transformed_df, components = principal_components(
+                transformed_df, options.n_components, fit_rows=break_point
+            )
 
-        # Store restorative values for undoing the transforms later.
-        first_row = df.iloc[0]
         self.restorative_values = {
-            "first_row": first_row,
-            "operation_rules": rules_list,
-            "years_column": df["YEAR"] if "YEAR" in df.columns else None,
+            "first_row": df.iloc[0][kept],
+            "operation_rules": rules,
+            "years_column": df["YEAR"] if "YEAR" in kept else None,
             "dropped_columns": dropped,
-            "column_order": original_cols,
-            "remaining_columns": list(transformed_df.columns),
+            "column_order": list(df.columns),
+            "remaining_columns": remaining,
+            # Inverting only reads the transformed columns, so no subset is copied
+            "original_values": df,
+            "components": components,
+            "unreduced_test_data": unreduced_test_data,
         }
+        self.inverse = None
         return transformed_df
+
+    def inverse_transform(self, transformed, start_row=0, means=None, stds=None):
+        """Map transformed rows, or a stack of forecasts, back to original units.
+
+        Arrays are read in remaining_columns order. start_row is the
+        transformed row the values begin at, such as the train/test break
+        point for a forecast of the test rows. means and stds, in the same
+        order, override the z-scoring statistics, as for a walk-forward fold.
+        With principal components, values are component scores and are
+        expanded to remaining_columns through the loadings first.
+        """
+        if self.restorative_values is None:
+            raise ValueError("normalize_data must run before inverse_transform.")
+        if self.inverse is None:
+            self.inverse = InverseTransform(
+                self.restorative_values["remaining_columns"],
+                self.restorative_values["operation_rules"],
+                self.restorative_values["original_values"],
+            )
+        components = self.restorative_values.get("components")
+        values = transformed
+        if isinstance(transformed, pd.DataFrame):
+            columns = self.inverse.columns
+            if components is not None:
+                columns = components.component_columns
+            values = transformed[columns].to_numpy()
+        if components is not None:
+            values = components.expand(values)
+        restored = self.inverse.apply(values, start_row, means, stds)
+        if isinstance(transformed, pd.DataFrame):
+            return pd.DataFrame(
+                restored, index=transformed.index, columns=self.inverse.columns
+            )
+        return restored
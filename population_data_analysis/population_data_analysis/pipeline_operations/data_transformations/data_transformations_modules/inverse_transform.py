@@ -0,0 +1,59 @@
+"""Map transformed values, such as forecasts, back to original units in one pass."""
+
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+class InverseTransform:
+    """Vectorized undo of log/shift, differencing and z-scoring for a set of columns."""
+
+    def __init__(
+        self, columns: List[str], operation_rules: dict, original_values: pd.DataFrame
+    ):
+        """Initialize the class."""
+        self.columns = list(columns)
+        rules = [operation_rules[col] for col in self.columns]
+        self.mean = np.array([rule["mean"] for rule in rules], dtype=np.float64)
+        self.std = np.array([rule["std"] for rule in rules], dtype=np.float64)
+        self.differenced = np.array([rule["needs_diff"] for rule in rules], dtype=bool)
+        self.logged = np.array([rule["log"] for rule in rules], dtype=bool)
+        self.shift = np.array(
+            [rule.get("log_shift", 0.0) for rule in rules], dtype=np.float64
+        )
+        # Each original row in the space differencing was applied in
+        self.levels = original_values[self.columns].to_numpy(
+            dtype=np.float64, copy=True
+        )
+        self.levels[:, self.logged] = np.log(
+            self.levels[:, self.logged] + self.shift[self.logged]
+        )
+
+    def apply(
+        self,
+        values: np.ndarray,
+        start_row: Union[int, np.ndarray] = 0,
+        mean: Optional[np.ndarray] = None,
+        std: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Undo the transforms for values shaped (..., rows, columns).
+
+        Transformed row r stands for original row r + 1, so differenced columns
+        restart from the observed level at original row start_row. start_row may
+        be an array matching the leading dimensions of a stack of forecasts.
+        mean and std replace the z-scoring statistics, e.g. with a fold's.
+        """
+        mean = self.mean if mean is None else mean
+        std = self.std if std is None else std
+        restored = np.asarray(values, dtype=np.float64) * std + mean
+        if self.differenced.any():
+            anchors = self.levels[np.asarray(start_row)][..., None, self.differenced]
+            restored[..., self.differenced] = (
+                np.cumsum(restored[..., self.differenced], axis=-2) + anchors
+            )
+        if self.logged.any():
+            restored[..., self.logged] = (
+                np.exp(restored[..., self.logged]) - self.shift[self.logged]
+            )
+        return restored
@@ -0,0 +1,113 @@
+"""Whole-matrix versions of the per-column normalization steps."""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.batched_adf import (
+    adf_p_values,
+)
+
+# Vectorized skew can differ from Series.skew in the last bits, so columns
+# this close to the cut-off are re-checked one at a time.
+SKEW_TIE_TOLERANCE = 1e-9
+# Columns handled at a time by steps that need a temporary copy of their input
+CHUNK_COLUMNS = 256
+
+
+def count_unique(df: pd.DataFrame) -> pd.Series:
+    """Distinct non-null values per column, like DataFrame.nunique."""
+    is_float = df.dtypes.map(pd.api.types.is_float_dtype).to_numpy(dtype=bool)
+    if not is_float.any():
+        return df.nunique()
+    counts = pd.Series(0, index=df.columns)
+    float_positions = np.flatnonzero(is_float)
+    float_counts = np.empty(len(float_positions), dtype=np.int64)
+    for start in range(0, len(float_positions), CHUNK_COLUMNS):
+        chunk = float_positions[start : start + CHUNK_COLUMNS]
+        ordered = np.sort(df.iloc[:, chunk].to_numpy(dtype=np.float64), axis=0)
+        present = ~np.isnan(ordered)
+        changes = (ordered[1:] != ordered[:-1]) & present[1:]
+        float_counts[start : start + len(chunk)] = present[:1].sum(
+            axis=0
+        ) + changes.sum(axis=0)
+    counts[is_float] = float_counts
+    if not is_float.all():
+        counts[~is_float] = df.loc[:, ~is_float].nunique()
+    return counts
+
+
+def column_frame(values: np.ndarray) -> pd.DataFrame:
+    """Frame over the columns without copying, laid out so reductions match Series."""
+    return pd.DataFrame(np.asfortranarray(values), copy=False)
+
+
+def skew_exceeds(values: np.ndarray, threshold: float) -> np.ndarray:
+    """Which columns have a sample skew above the threshold, exactly as Series.skew."""
+    skew = column_frame(values).skew().to_numpy()
+    above = skew > threshold
+    for j in np.flatnonzero(np.abs(skew - threshold) < SKEW_TIE_TOLERANCE):
+        above[j] = pd.Series(values[:, j]).skew() > threshold
+    return above
+
+
+def log_matrix(
+    values: np.ndarray, option: str
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Log the columns apply_log would, in place, returning which ones and their shifts."""
+    n_columns = values.shape[1]
+    if option == "always":
+        logged = np.ones(n_columns, dtype=bool)
+    elif option == "conditional":
+        logged = skew_exceeds(values, 1)
+    else:
+        logged = np.zeros(n_columns, dtype=bool)
+    shifted = logged & (values <= 0).any(axis=0)
+    shifts = np.zeros(n_columns, dtype=values.dtype)
+    shifts[shifted] = np.abs(values[:, shifted].min(axis=0)) + 1
+    if logged.all():
+        values += shifts
+        np.log(values, out=values)
+    elif logged.any():
+        values[:, logged] = np.log(values[:, logged] + shifts[logged])
+    return logged, shifted, shifts
+
+
+def difference_matrix(values: np.ndarray, option: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Difference the columns apply_difference would, in place, leaving NaN in row 0."""
+    if option == "always":
+        differenced = np.ones(values.shape[1], dtype=bool)
+    elif option == "conditional":
+        differenced = adf_p_values(values) > 0.05
+    else:
+        differenced = np.zeros(values.shape[1], dtype=bool)
+    first_values = values[0].copy()
+    if differenced.all():
+        for start in range(0, values.shape[1], CHUNK_COLUMNS):
+            block = values[:, start : start + CHUNK_COLUMNS]
+            block[1:] = np.diff(block, axis=0)
+    elif differenced.any():
+        values[1:, differenced] = np.diff(values[:, differenced], axis=0)
+    values[0, differenced] = np.nan
+    return differenced, first_values
+
+
+def standardize_matrix(
+    values: np.ndarray, option: str, differenced: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Z-normalize every column in place, over the rows each column still has."""
+    means = np.zeros(values.shape[1], dtype=values.dtype)
+    stds = np.ones(values.shape[1], dtype=values.dtype)
+    if option != "always":
+        return means, stds
+    for columns, first_row in ((differenced, 1), (~differenced, 0)):
+        positions = np.flatnonzero(columns)
+        for start in range(0, len(positions), CHUNK_COLUMNS):
+            chunk = positions[start : start + CHUNK_COLUMNS]
+            block = column_frame(values[first_row:, chunk])
+            means[chunk] = block.mean().to_numpy()
+            column_stds = block.std().to_numpy()
+            stds[chunk] = np.where(column_stds != 0, column_stds, 1.0)
+            values[first_row:, chunk] = (block.to_numpy() - means[chunk]) / stds[chunk]
+    return means, stds
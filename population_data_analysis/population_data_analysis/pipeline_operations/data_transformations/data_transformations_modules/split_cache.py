@@ -0,0 +1,211 @@
+"""Cache of transformed train/test splits keyed by the input data and the options."""
+
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from population_data_analysis import __version__
+from population_data_analysis.common import BasePydanticForRepo
+from population_data_analysis.pipeline_operations.data_transformations.data_transformation_config_objects import (
+    DataTransformationOptions,
+    SplitCacheSettings,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.frame_cache import (
+    copy_on_write_enabled,
+    frame_nbytes,
+)
+
+# Bump whenever a change to the transformations alters what they output or
+# what TransformedSplit holds, so splits cached by older code are not served
+TRANSFORM_SCHEMA_VERSION = 2
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Hash a frame's values, index, column names and dtypes."""
+    digest = hashlib.sha256()
+    for labels in (df.columns, df.index):
+        digest.update(pd.util.hash_pandas_object(labels).to_numpy().tobytes())
+    # Hashing column by column is slow on wide frames, so numeric columns are
+    # hashed as raw bytes one dtype block at a time.
+    blocks = {}
+    for position, dtype in enumerate(df.dtypes):
+        blocks.setdefault(dtype, []).append(position)
+    for dtype, positions in blocks.items():
+        digest.update(str(dtype).encode("utf-8"))
+        digest.update(np.array(positions).tobytes())
+        block = df.iloc[:, positions]
+        if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+            digest.update(np.ascontiguousarray(block.to_numpy(dtype=dtype)).tobytes())
+        else:
+            digest.update(
+                pd.util.hash_pandas_object(block, index=False).to_numpy().tobytes()
+            )
+    return digest.hexdigest()
+
+
+def split_cache_key(df: pd.DataFrame, options: DataTransformationOptions) -> str:
+    """Key for one (data, options) pair; every option takes part, defaults included.
+
+    The package and transformation schema versions take part too, so a
+    directory shared across code versions never serves a stale split.
+    """
+    payload = (
+        f"{__version__}/{TRANSFORM_SCHEMA_VERSION}/"
+        + frame_fingerprint(df)
+        + options.model_dump_json()
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TransformedSplit(BasePydanticForRepo):
+    """Everything DataTransformationsSDK.run leaves behind for one (data, options) pair."""
+
+    train_data: pd.DataFrame
+    test_data: pd.DataFrame
+    restorative_values: dict
+    test_start_row: int
+
+    def nbytes(self) -> int:
+        """Memory held by the split and the inputs kept for inverting and scoring it."""
+        total = (
+            frame_nbytes(self.train_data)
+            + frame_nbytes(self.test_data)
+            + frame_nbytes(self.restorative_values["original_values"])
+        )
+        unreduced_test_data = self.restorative_values.get("unreduced_test_data")
+        if unreduced_test_data is not None:
+            total += frame_nbytes(unreduced_test_data)
+        return total
+
+    def hand_out(self) -> "TransformedSplit":
+        """Give each caller its own frames so in-place edits cannot leak between them."""
+        deep = not copy_on_write_enabled()
+        return self.model_copy(
+            update={
+                "train_data": self.train_data.copy(deep=deep),
+                "test_data": self.test_data.copy(deep=deep),
+            }
+        )
+
+
+class TransformedSplitCache:
+    """LRU of transformed splits bounded by total bytes, with an optional pickle directory."""
+
+    def __init__(self, max_bytes: int = 512 * 1024**2, directory: Optional[str] = None):
+        """Initialize the class."""
+        self.max_bytes = max_bytes
+        self.directory = None
+        if directory is not None:
+            self.directory = Path(directory)
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, TransformedSplit]" = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: SplitCacheSettings) -> "TransformedSplitCache":
+        """Build a cache from settings."""
+        return cls(max_bytes=settings.max_bytes, directory=settings.directory)
+
+    def _path(self, key: str) -> Path:
+        """Disk location of a key."""
+        return self.directory / f"{key}.pkl"
+
+    def _store(self, key: str, split: TransformedSplit) -> bool:
+        """Insert a split in memory and evict least recently used ones. Caller holds the lock.
+
+        Returns whether the split is now held in memory.
+        """
+        if key in self._entries:
+            return True
+        nbytes = split.nbytes()
+        if nbytes > self.max_bytes:
+            return False
+        self._entries[key] = split
+        self._current_bytes += nbytes
+        while self._current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._current_bytes -= evicted.nbytes()
+        return True
+
+    def _load(self, key: str) -> Optional[TransformedSplit]:
+        """Read a split from disk, or None when it is missing or unreadable.
+
+        A pickle from other library versions or a truncated write is removed
+        and treated as a miss.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                split = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception:  # pylint: disable=broad-exception-caught
+            split = None
+        if isinstance(split, TransformedSplit):
+            return split
+        path.unlink(missing_ok=True)
+        return None
+
+    def get(self, key: str) -> Optional[TransformedSplit]:
+        """Return the split for a key from memory, then disk, or None."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key].hand_out()
+        split = self._load(key) if self.directory is not None else None
+        if split is not None:
+            with self._lock:
+                self._store(key, split)
+                self.hits += 1
+            return split.hand_out()
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, split: TransformedSplit) -> bool:
+        """Store a split in memory and, when configured, atomically on disk.
+
+        Returns whether the split is held in memory.
+        """
+        with self._lock:
+            kept = self._store(key, split)
+        if self.directory is not None:
+            path = self._path(key)
+            temporary_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temporary_path, "wb") as file:
+                pickle.dump(split, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, path)
+        return kept
+
+    def get_or_transform(
+        self, key: str, transform: Callable[[], Optional[TransformedSplit]]
+    ) -> Optional[TransformedSplit]:
+        """Serve a split from the cache, transforming only on a miss. Failures are not kept."""
+        split = self.get(key)
+        if split is not None:
+            return split
+        split = transform()
+        # Only a split the cache holds on to needs protecting from the caller
+        if split is not None and self.put(key, split):
+            split = split.hand_out()
+        return split
+
+    def clear(self):
+        """Drop every cached split, on disk too."""
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+        if self.directory is not None:
+            for path in self.directory.glob("*.pkl"):
+                path.unlink()
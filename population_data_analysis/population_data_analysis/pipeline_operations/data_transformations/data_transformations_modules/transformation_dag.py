@@ -0,0 +1,98 @@
+"""Memoized chain of normalization steps shared by option sets with a common prefix."""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from population_data_analysis.common import BasePydanticForRepo
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.component_reduction import (
+    ComponentReduction,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.frame_cache import (
+    frame_nbytes,
+)
+
+
+class TransformationState(BasePydanticForRepo):
+    """The data as it stands after one normalization step.
+
+    Steps never modify the state they are given, since other option sets
+    may continue from it.
+    """
+
+    source: pd.DataFrame
+    dropped: pd.DataFrame
+    columns: List[str]
+    # Gap-free float columns handled as matrices, one block per dtype
+    blocks: List[List[str]]
+    block_values: List[np.ndarray]
+    # Remaining numeric columns, handled one at a time
+    series: Dict[str, pd.Series]
+    rules: Dict[str, dict]
+    transformed: Optional[pd.DataFrame] = None
+    components: Optional[ComponentReduction] = None
+    # The columns the components were fitted on, before reduction
+    unreduced: Optional[pd.DataFrame] = None
+
+    def nbytes(self) -> int:
+        """Memory held by the values this state computed; source is the caller's."""
+        total = sum(values.nbytes for values in self.block_values)
+        total += sum(
+            int(series.memory_usage(deep=True, index=False))
+            for series in self.series.values()
+        )
+        if self.transformed is not None:
+            total += frame_nbytes(self.transformed)
+        return total
+
+    def with_rules(self, new_rules: Dict[str, dict], **update) -> "TransformationState":
+        """Copy of the state with each column's rules extended by new_rules."""
+        rules = {col: {**self.rules[col], **new_rules[col]} for col in self.columns}
+        return self.model_copy(update={"rules": rules, **update})
+
+
+class PrefixMemo:
+    """LRU of the results of a chain of steps, bounded by total bytes.
+
+    Results are keyed by the choices made up to and including each step.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024**2):
+        """Initialize the class."""
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.current_bytes = 0
+        self._results: "OrderedDict[Tuple[Hashable, ...], Tuple[Any, int]]" = (
+            OrderedDict()
+        )
+
+    def step(
+        self,
+        key: Tuple[Hashable, ...],
+        compute: Callable[[], Any],
+        nbytes: Callable[[Any], int],
+    ) -> Any:
+        """Return the result for a prefix, computing it when it is not held.
+
+        nbytes measures a result; one larger than max_bytes is not kept.
+        """
+        if key in self._results:
+            self._results.move_to_end(key)
+            self.hits += 1
+            return self._results[key][0]
+        self.misses += 1
+        result = compute()
+        size = nbytes(result)
+        if size > self.max_bytes:
+            return result
+        self._results[key] = (result, size)
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._results.popitem(last=False)
+            self.current_bytes -= evicted_size
+            self.evictions += 1
+        return result
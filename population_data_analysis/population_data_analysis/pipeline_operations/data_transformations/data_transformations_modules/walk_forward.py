@@ -0,0 +1,161 @@
+"""Train/test folds at successive forecast origins from a single transformation pass."""
+
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from population_data_analysis.common import BasePydanticForRepo
+from population_data_analysis.pipeline_operations.data_transformations.data_transformation_config_objects import (
+    DataTransformationOptions,
+    WalkForwardOptions,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.data_normalization_logic import (
+    DataTransformer,
+)
+
+
+def prefix_sums(values: np.ndarray) -> np.ndarray:
+    """Column sums of rows [0, i) for every i, so any window's sum is one subtraction."""
+    sums = np.zeros((len(values) + 1,) + values.shape[1:])
+    np.cumsum(values, axis=0, out=sums[1:])
+    return sums
+
+
+class WindowMoments:
+    """Column means and standard deviations of any row window, from prefix sums built once.
+
+    Values are centered on each column's overall mean first, which keeps the
+    sums of squares from cancelling. A window whose values are all equal gets
+    std 1 as standardize_series gives it, found from counts of value changes
+    rather than from a rounded variance. Columns with gaps are computed
+    directly per window, since they are rare and pandas skips their NaNs.
+    """
+
+    def __init__(self, values: np.ndarray):
+        """Initialize the class."""
+        self.values = values
+        self.gaps = np.isnan(values).any(axis=0)
+        complete = values[:, ~self.gaps].astype(np.float64)
+        self.center = complete.mean(axis=0)
+        centered = complete - self.center
+        self.sums = prefix_sums(centered)
+        self.squares = prefix_sums(centered * centered)
+        # changes[i] counts rows j in [1, i] that differ from row j - 1
+        self.changes = prefix_sums(complete[1:] != complete[:-1])
+
+    def window(self, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Means and sample standard deviations of rows [start, stop)."""
+        n_rows = stop - start
+        sums = self.sums[stop] - self.sums[start]
+        squares = self.squares[stop] - self.squares[start]
+        variances = np.maximum(squares - sums * sums / n_rows, 0.0) / (n_rows - 1)
+        constant = self.changes[stop - 1] == self.changes[start]
+        means = np.empty(self.values.shape[1])
+        stds = np.empty(self.values.shape[1])
+        means[~self.gaps] = self.center + sums / n_rows
+        stds[~self.gaps] = np.where(constant, 1.0, np.sqrt(variances))
+        if self.gaps.any():
+            block = pd.DataFrame(self.values[start:stop, self.gaps])
+            means[self.gaps] = block.mean().to_numpy()
+            column_stds = block.std().to_numpy()
+            stds[self.gaps] = np.where(column_stds != 0, column_stds, 1.0)
+        return means, stds
+
+
+class WalkForwardFold(BasePydanticForRepo):
+    """One forecast origin's train/test split, z-scored by its own training rows."""
+
+    train_data: pd.DataFrame
+    test_data: pd.DataFrame
+    train_start_row: int
+    test_start_row: int
+    # z-scoring statistics in column order, zeros and ones when not z-normalizing
+    means: np.ndarray
+    stds: np.ndarray
+
+
+def fold_bounds(
+    n_rows: int, train_test_split: float, options: WalkForwardOptions
+) -> List[Tuple[int, int, int]]:
+    """(train start, origin, test stop) of each fold, in transformed rows.
+
+    The first origin is the single split's break point and each later one is
+    step rows further on, for as long as test_rows rows remain after it.
+    """
+    if options.test_rows < 1 or options.step < 1:
+        raise ValueError("test_rows and step must both be at least 1.")
+    first_origin = int(n_rows * train_test_split)
+    train_rows = options.train_rows or first_origin
+    bounds = []
+    for origin in range(first_origin, n_rows - options.test_rows + 1, options.step):
+        start = 0 if options.window == "expanding" else max(0, origin - train_rows)
+        bounds.append((start, origin, origin + options.test_rows))
+    if not bounds:
+        raise ValueError(
+            f"{n_rows} rows split at {train_test_split} leave no room for a test "
+            f"window of {options.test_rows} rows."
+        )
+    if min(origin - start for start, origin, _ in bounds) < 2:
+        raise ValueError("Every fold needs at least 2 training rows.")
+    return bounds
+
+
+def walk_forward_folds(
+    transformer: DataTransformer,
+    df: pd.DataFrame,
+    options: DataTransformationOptions,
+    walk_forward: WalkForwardOptions,
+) -> List[WalkForwardFold]:
+    """Transform df once, then z-score each fold by the statistics of its training rows.
+
+    Which columns are logged, differenced and dropped is decided once on the
+    whole frame, as it is for the single split. Only the z-scoring, which is
+    what would otherwise leak test rows into training, is fold-specific; its
+    statistics come from prefix sums rather than a pass over each fold.
+    Jitter is drawn once, so a row carries the same noise in every fold it
+    is in. Differenced columns of a fold are anchored by row index, so
+    inverting needs only the fold's statistics and start row.
+    """
+    if options.dimensionality_reduction != "none":
+        # Components are fitted after z-scoring, which differs from fold to fold
+        raise ValueError("Walk-forward folds do not support dimensionality reduction.")
+    unscaled = transformer.normalize_data(
+        df, options.model_copy(update={"z_normalize": "never", "jitter": 0.0})
+    )
+    values = unscaled.to_numpy()
+    n_columns = values.shape[1]
+    standardize = options.z_normalize == "always"
+    moments = WindowMoments(values) if standardize else None
+    noise = None
+    if options.jitter > 0:
+        noise = np.random.normal(0, options.jitter, size=values.shape)
+    folds = []
+    for start, origin, stop in fold_bounds(
+        len(unscaled), options.train_test_split, walk_forward
+    ):
+        if standardize:
+            means, stds = moments.window(start, origin)
+            scaled = ((values[start:stop] - means) / stds).astype(values.dtype)
+        else:
+            means, stds = np.zeros(n_columns), np.ones(n_columns)
+            scaled = values[start:stop].copy()
+        if noise is not None:
+            scaled += noise[start:stop]
+        fold = pd.DataFrame(
+            scaled,
+            index=unscaled.index[start:stop],
+            columns=unscaled.columns,
+            copy=False,
+        )
+        folds.append(
+            WalkForwardFold(
+                train_data=fold.iloc[: origin - start],
+                test_data=fold.iloc[origin - start :],
+                train_start_row=start,
+                test_start_row=origin,
+                means=means,
+                stds=stds,
+            )
+        )
+    return folds
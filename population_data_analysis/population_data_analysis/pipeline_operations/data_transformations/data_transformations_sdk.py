@@ -1,33 +1,150 @@
 """Data transformations sdk."""
 
+from typing import List, Optional
+
+import numpy as np
 import pandas as pd
 
 from population_data_analysis.pipeline_operations.data_transformations.data_transformation_config_objects import (
     DataTransformationOptions,
+    SplitCacheSettings,
+    WalkForwardOptions,
 )
 from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.data_normalization_logic import (
     DataTransformer,
 )
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.split_cache import (
+    TransformedSplit,
+    TransformedSplitCache,
+    split_cache_key,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.walk_forward import (
+    WalkForwardFold,
+    walk_forward_folds,
+)
 
 
 class DataTransformationsSDK:
     """Data transformations sdk."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        split_cache: Optional[TransformedSplitCache] = None,
+        in_place: bool = False,
+    ):
         """Initialize the class."""
-        self.data_transformer = DataTransformer()
+        self.data_transformer = DataTransformer(in_place=in_place)
+        self.test_start_row = None
+        self.split_cache = split_cache or TransformedSplitCache.from_settings(
+            SplitCacheSettings()
+        )
 
-    def run(self, data: pd.DataFrame, options: DataTransformationOptions):
-        """Run the data transformations."""
+    def transform(
+        self, data: pd.DataFrame, options: DataTransformationOptions
+    ) -> Optional[TransformedSplit]:
+        """Normalize and split the data without going through the cache."""
         # data = data.drop(columns=['STATE','YEAR'], errors='ignore')
         try:
             normalized_data = self.data_transformer.normalize_data(data, options)
         except Exception as e:  # pylint: disable=broad-exception-caught
             print(f"Error in data transformation: {e}")
-            self.data_transformer.normalize_data(data, options)
-            return None, None
+            return None
         train_test_split = options.train_test_split
         break_point = int(len(normalized_data) * train_test_split)
-        train_data = normalized_data[:break_point]
-        test_data = normalized_data[break_point:]
-        return train_data, test_data
+        return TransformedSplit(
+            train_data=normalized_data[:break_point],
+            test_data=normalized_data[break_point:],
+            restorative_values=self.data_transformer.restorative_values,
+            test_start_row=break_point,
+        )
+
+    def run(self, data: pd.DataFrame, options: DataTransformationOptions):
+        """Run the data transformations, once per distinct (data, options) pair."""
+        split = self.split_cache.get_or_transform(
+            split_cache_key(data, options), lambda: self.transform(data, options)
+        )
+        if split is None:
+            return None, None
+        self.data_transformer.restorative_values = split.restorative_values
+        self.data_transformer.inverse = None
+        self.test_start_row = split.test_start_row
+        return split.train_data, split.test_data
+
+    def to_original_units(self, values, start_row=None):
+        """Undo the last run's transforms on values starting at start_row, by default the test rows."""
+        if start_row is None:
+            start_row = self.test_start_row
+        return self.data_transformer.inverse_transform(values, start_row)
+
+    def original_rows(self, start_row: int, n_rows: int) -> pd.DataFrame:
+        """The last run's input rows behind n_rows transformed rows from start_row.
+
+        Transformed row r stands for original row r + 1.
+        """
+        restorative_values = self.data_transformer.restorative_values
+        return restorative_values["original_values"][
+            restorative_values["remaining_columns"]
+        ].iloc[start_row + 1 : start_row + 1 + n_rows]
+
+    def to_scoring_space(
+        self,
+        test_data: pd.DataFrame,
+        predictions,
+        original_units: bool = False,
+        fold: Optional[WalkForwardFold] = None,
+    ):
+        """The last run's test rows and predictions in the space runs are scored in.
+
+        With original_units, the forecasts are mapped back through every
+        transformation and compared with the input's own test rows. Otherwise,
+        with principal components, models forecast component scores; those
+        are expanded to the columns the components were fitted on and
+        compared with those columns' actual test rows, so errors are on the
+        same scale with and without the reduction. fold is given for the test
+        rows of one fold of the last walk_forward.
+        """
+        if original_units:
+            if fold is None:
+                restored = self.to_original_units(predictions)
+                start_row = self.test_start_row
+            else:
+                restored = self.fold_to_original_units(fold, predictions)
+                start_row = fold.test_start_row
+            return self.original_rows(start_row, len(test_data)), np.asarray(restored)
+        if fold is not None:
+            return test_data, predictions
+        restorative_values = self.data_transformer.restorative_values
+        components = restorative_values.get("components")
+        if components is None:
+            return test_data, predictions
+        if isinstance(predictions, pd.DataFrame):
+            predictions = predictions[components.component_columns].to_numpy()
+        return restorative_values["unreduced_test_data"], components.expand(predictions)
+
+    def walk_forward(
+        self,
+        data: pd.DataFrame,
+        options: DataTransformationOptions,
+        walk_forward_options: Optional[WalkForwardOptions] = None,
+    ) -> Optional[List[WalkForwardFold]]:
+        """Split the data into folds at successive forecast origins with one transformation pass."""
+        try:
+            folds = walk_forward_folds(
+                self.data_transformer,
+                data,
+                options,
+                walk_forward_options or WalkForwardOptions(),
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            print(f"Error in data transformation: {e}")
+            return None
+        self.test_start_row = None
+        return folds
+
+    def fold_to_original_units(self, fold: WalkForwardFold, values, start_row=None):
+        """Undo the last walk_forward's transforms on values of a fold, by default its test rows."""
+        if start_row is None:
+            start_row = fold.test_start_row
+        return self.data_transformer.inverse_transform(
+            values, start_row, fold.means, fold.stds
+        )
@@ -4,6 +4,9 @@ from enum import Enum
 from typing import List, Optional
 
 from population_data_analysis.common import BasePydanticForRepo
+from population_data_analysis.pipeline_operations.data_transformations.data_transformation_config_objects import (
+    WalkForwardOptions,
+)
 
 
 class AvailableEvaluationOperations(str, Enum):
@@ -12,10 +15,35 @@ class AvailableEvaluationOperations(str, Enum):
     evaluate_model = "evaluate_model"
 
 
+class EvaluationUnits(str, Enum):
+    """Units forecasts are compared with the test rows in."""
+
+    transformed = "transformed"
+    original = "original"
+
+
+# Options added after sweeps were first logged. They are left out of run names
+# while at their defaults, so earlier runs are still found by name.
+RUN_NAME_OPTIONAL_FIELDS = ("units", "walk_forward")
+
+
 class EvaluationConfig(BasePydanticForRepo):
     """Parameters for retrieving data."""
 
     metrics: Optional[List[str]] = ["mse", "mae"]
+    # original undoes the transformations first, so errors are in the data's units
+    units: EvaluationUnits = EvaluationUnits.transformed
+    # Set to fit and score one model per forecast origin instead of a single split
+    walk_forward: Optional[WalkForwardOptions] = None
+
+    def fields_left_out_of_run_name(self) -> set:
+        """Late-added options still at their defaults."""
+        defaults = type(self)()
+        return {
+            name
+            for name in RUN_NAME_OPTIONAL_FIELDS
+            if getattr(self, name) == getattr(defaults, name)
+        }
 
 
 class EvaluationOutput(BasePydanticForRepo):
@@ -1,5 +1,7 @@
 """Evaluations SDK for data analysis."""
 
+from typing import Dict, List
+
 import mlflow
 import numpy as np
 import pandas as pd
@@ -18,21 +20,70 @@ class TrainingProcedureSDK:
         mlflow.log_metric("successful_fit", False)
         mlflow.log_param("error_message", error_message)
 
+    def score(
+        self, test_data: pd.DataFrame, predictions: np.ndarray, config: EvaluationConfig
+    ) -> EvaluationOutput:
+        """Compute the configured error metrics without logging them."""
+        mse = None
+        mae = None
+        if "mse" in config.metrics:
+            mse = np.mean((test_data - predictions) ** 2)
+        if "mae" in config.metrics:
+            mae = np.mean(np.abs(test_data - predictions))
+        return EvaluationOutput(failed=False, error_message=None, mse=mse, mae=mae)
+
+    def log_geography_results(self, results: Dict[str, EvaluationOutput]):
+        """Log one run's summary of many per-geography fits."""
+        fitted = [result for result in results.values() if not result.failed]
+        mlflow.log_metric("geographies_fitted", len(fitted))
+        mlflow.log_metric("geographies_failed", len(results) - len(fitted))
+        for metric in ("mse", "mae"):
+            values = [getattr(result, metric) for result in fitted]
+            if values and all(value is not None for value in values):
+                mlflow.log_metric(metric, float(np.mean(values)))
+        mlflow.log_metric("successful_fit", bool(fitted))
+
+    def combine(self, results: List[EvaluationOutput]) -> EvaluationOutput:
+        """Mean errors over the results that fitted; failed when none did."""
+        fitted = [result for result in results if not result.failed]
+        if not fitted:
+            return EvaluationOutput(
+                failed=True,
+                error_message=results[0].error_message if results else None,
+            )
+        means = {}
+        for metric in ("mse", "mae"):
+            values = [getattr(result, metric) for result in fitted]
+            if all(value is not None for value in values):
+                means[metric] = float(np.mean(values))
+        return EvaluationOutput(failed=False, error_message=None, **means)
+
+    def log_fold_results(self, results: List[EvaluationOutput]) -> EvaluationOutput:
+        """Log one run's summary of its walk-forward folds."""
+        combined = self.combine(results)
+        fitted = sum(not result.failed for result in results)
+        mlflow.log_metric("folds_fitted", fitted)
+        mlflow.log_metric("folds_failed", len(results) - fitted)
+        for metric in ("mse", "mae"):
+            if getattr(combined, metric) is not None:
+                mlflow.log_metric(metric, getattr(combined, metric))
+        mlflow.log_metric("successful_fit", not combined.failed)
+        return combined
+
     def run(
         self, test_data: pd.DataFrame, predictions: np.ndarray, config: EvaluationConfig
     ):
         """Run the evaluation."""
 
-        mse = None
-        mae = None
+        evaluation = self.score(test_data, predictions, config)
+        mse = evaluation.mse
+        mae = evaluation.mae
 
         # Calculate the error
         if "mse" in config.metrics:
-            mse = np.mean((test_data - predictions) ** 2)
             mlflow.log_metric("mse", mse)
             print(f"Mean squared error: {mse}")
         if "mae" in config.metrics:
-            mae = np.mean(np.abs(test_data - predictions))
             mlflow.log_metric("mae", mae)
             print(f"Mean absolute error: {mae}")
 
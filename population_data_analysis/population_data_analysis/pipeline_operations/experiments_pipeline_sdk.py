@@ -2,36 +2,67 @@
 
 import base64
 import zlib
-from typing import Union
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Union
 
 import mlflow
+import pandas as pd
 
 from population_data_analysis.common import BasePydanticForRepo
-from population_data_analysis.pipeline_operations.data_transformations.data_transformations_sdk import \
-    DataTransformationsSDK
-from population_data_analysis.pipeline_operations.ml_models.ml_models_sdk import MLModelsSDK
-
+from population_data_analysis.pipeline_operations.data_quality.data_quality_config_objects import (
+    DataQualityOptions,
+)
+from population_data_analysis.pipeline_operations.data_quality.data_quality_modules.quality_checks import (
+    DataQualityError,
+)
+from population_data_analysis.pipeline_operations.data_quality.data_quality_sdk import (
+    DataQualitySDK,
+)
 from population_data_analysis.pipeline_operations.data_transformations.data_transformation_config_objects import (
     AvailableDataTransformationOperations,
     DataTransformationOptions,
+    SplitCacheSettings,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.split_cache import (
+    TransformedSplitCache,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_sdk import (
+    DataTransformationsSDK,
 )
 from population_data_analysis.pipeline_operations.evaluation.evaluation_config_objects import (
     AvailableEvaluationOperations,
     EvaluationConfig,
     EvaluationOutput,
+    EvaluationUnits,
 )
 from population_data_analysis.pipeline_operations.evaluation.evaluation_sdk import (
     TrainingProcedureSDK,
 )
+from population_data_analysis.pipeline_operations.feasibility.feasibility_config_objects import (
+    FeasibilityOptions,
+)
+from population_data_analysis.pipeline_operations.feasibility.feasibility_modules.screens import (
+    InfeasibleConfigError,
+)
+from population_data_analysis.pipeline_operations.feasibility.feasibility_sdk import (
+    FeasibilitySDK,
+)
 from population_data_analysis.pipeline_operations.ml_models.ml_models_config_objects import (
     AvailableMLOperations,
     VARHyperparameters,
     VARMAXHyperparameters,
 )
-from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import \
-    AvailableDataRetrivalOperations, RetrivalParameters
-
-
+from population_data_analysis.pipeline_operations.ml_models.ml_models_sdk import (
+    MLModelsSDK,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
+    AvailableDataRetrivalOperations,
+    RetrivalParameters,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.partitioned_store import (
+    PartitionedParquetStore,
+)
 from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_sdk import (
     RawDataLoaderSDK,
 )
@@ -52,6 +83,8 @@ class ExperimentRunConfig(BasePydanticForRepo):
     evaluation_operation_name: AvailableEvaluationOperations
     evaluation_config: EvaluationConfig
 
+    data_quality_config: DataQualityOptions = DataQualityOptions()
+
     def dump_to_params(self):
         """Dump to params."""
         return {
@@ -63,6 +96,7 @@ class ExperimentRunConfig(BasePydanticForRepo):
             "ml_model_config": self.ml_model_config.model_dump(),
             "evaluation_operation_name": self.evaluation_operation_name,
             "evaluation_config": self.evaluation_config.model_dump(),
+            "data_quality_config": self.data_quality_config.model_dump(),
         }
 
     def dump_to_tags(self):
@@ -77,7 +111,16 @@ class ExperimentRunConfig(BasePydanticForRepo):
     def dump_to_name(self) -> str:
         """Generate a compressed string representation of the model's values."""
         # Serialize the model's data to a JSON-formatted string
-        json_data = self.model_dump_json()
+        exclude = {
+            "data_transformation_config": (
+                self.data_transformation_config.fields_left_out_of_run_name()
+            ),
+            "evaluation_config": self.evaluation_config.fields_left_out_of_run_name(),
+        }
+        # Added after sweeps were first logged, so left out while at its default
+        if self.data_quality_config == DataQualityOptions():
+            exclude["data_quality_config"] = True
+        json_data = self.model_dump_json(exclude=exclude)
 
         # Compress the JSON string using zlib
         compressed_data = zlib.compress(json_data.encode("utf-8"))
@@ -88,13 +131,112 @@ class ExperimentRunConfig(BasePydanticForRepo):
         return base64_encoded_data
 
 
+def score_walk_forward(
+    data_transformation_sdk: DataTransformationsSDK,
+    feasibility_sdk: FeasibilitySDK,
+    config: ExperimentRunConfig,
+    data: pd.DataFrame,
+) -> List[EvaluationOutput]:
+    """Fit and score one model per walk-forward fold, without logging to MLflow.
+
+    Raises when the folds cannot be built or one is too short to fit.
+    """
+    folds = data_transformation_sdk.walk_forward(
+        data, config.data_transformation_config, config.evaluation_config.walk_forward
+    )
+    if folds is None:
+        raise ValueError("Data transformation failed.")
+    for fold in folds:
+        feasibility_sdk.check_training_data(config, fold.train_data)
+    results = []
+    for fold in folds:
+        try:
+            predictions = MLModelsSDK().run(
+                fold.train_data,
+                len(fold.test_data),
+                config.ml_model_operation_name,
+                config.ml_model_config,
+                log_model=False,
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            results.append(EvaluationOutput(failed=True, error_message=str(e)))
+            continue
+        test_data, predictions = data_transformation_sdk.to_scoring_space(
+            fold.test_data,
+            predictions,
+            original_units=config.evaluation_config.units == EvaluationUnits.original,
+            fold=fold,
+        )
+        results.append(
+            TrainingProcedureSDK().score(
+                test_data, predictions, config.evaluation_config
+            )
+        )
+    return results
+
+
+def run_geography_experiment(
+    store_root: str,
+    geography: str,
+    config: ExperimentRunConfig,
+    feasibility_options: Optional[FeasibilityOptions] = None,
+) -> EvaluationOutput:
+    """Run the pipeline on one stored geography, in a worker process and without MLflow."""
+    data = PartitionedParquetStore(store_root).read_partition(geography)
+    feasibility_sdk = FeasibilitySDK(feasibility_options)
+    try:
+        data = DataQualitySDK().run(
+            data, config.data_quality_config, config.data_transformation_config
+        )
+        feasibility_sdk.check_data(config, data)
+        # One transformation per worker, so hold a single copy of the data
+        # rather than memoizing steps or caching the split in memory
+        data_transformation_sdk = DataTransformationsSDK(
+            split_cache=TransformedSplitCache(
+                max_bytes=0, directory=SplitCacheSettings().directory
+            ),
+            in_place=True,
+        )
+        if config.evaluation_config.walk_forward is not None:
+            return TrainingProcedureSDK().combine(
+                score_walk_forward(
+                    data_transformation_sdk, feasibility_sdk, config, data
+                )
+            )
+        train_data, test_data = data_transformation_sdk.run(
+            data, config.data_transformation_config
+        )
+        if train_data is None:
+            raise ValueError("Data transformation failed.")
+        feasibility_sdk.check_training_data(config, train_data)
+        predictions = MLModelsSDK().run(
+            train_data,
+            len(test_data),
+            config.ml_model_operation_name,
+            config.ml_model_config,
+            log_model=False,
+        )
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return EvaluationOutput(failed=True, error_message=str(e))
+    test_data, predictions = data_transformation_sdk.to_scoring_space(
+        test_data,
+        predictions,
+        original_units=config.evaluation_config.units == EvaluationUnits.original,
+    )
+    return TrainingProcedureSDK().score(
+        test_data, predictions, config.evaluation_config
+    )
+
+
 class ExperimentsSDK:
     """Experiments SDK to run full training and evaluation pipelines."""
 
-    def __init__(self):
+    def __init__(self, feasibility_options: Optional[FeasibilityOptions] = None):
         """Initialize the class."""
 
         self.raw_data_loader_sdk = RawDataLoaderSDK()
+        self.data_quality_sdk = DataQualitySDK()
+        self.feasibility_sdk = FeasibilitySDK(feasibility_options)
         self.ml_models_sdk = MLModelsSDK()
         self.data_transformation_sdk = DataTransformationsSDK()
         self.evaluations_sdk = TrainingProcedureSDK()
@@ -107,18 +249,76 @@ class ExperimentsSDK:
         for tag_name, tag_value in run_tags.items():
             mlflow.set_tag(tag_name, tag_value)
 
+    def fail_run(self, error: Exception) -> EvaluationOutput:
+        """Log a run that stopped before fitting and report it as failed."""
+        self.evaluations_sdk.log_failed_run(str(error))
+        return EvaluationOutput(failed=True, error_message=str(error))
+
+    def prefetch_raw_data(
+        self, configs: Iterable[ExperimentRunConfig], max_workers: int = 4
+    ):
+        """Warm the raw data cache for every distinct loader config concurrently."""
+        self.raw_data_loader_sdk.prefetch(
+            (
+                (config.raw_data_loader_operation_name, config.raw_data_loader_config)
+                for config in configs
+            ),
+            max_workers=max_workers,
+        )
+
     def run_experiment(self, config: ExperimentRunConfig) -> EvaluationOutput:
         """Run an experiment."""
 
         self.log_new_run_to_mlflow(config)
 
+        # Rule out doomed configs before loading, transforming or fitting
+        try:
+            self.feasibility_sdk.check_config(config)
+        except InfeasibleConfigError as e:
+            return self.fail_run(e)
         data = self.raw_data_loader_sdk.run(
             retrival_parameters=config.raw_data_loader_config,
             operation=config.raw_data_loader_operation_name,
         )
+        # Fail in milliseconds on data that would only break the fit minutes later
+        try:
+            data = self.data_quality_sdk.run(
+                data, config.data_quality_config, config.data_transformation_config
+            )
+            self.feasibility_sdk.check_data(config, data)
+        except (DataQualityError, InfeasibleConfigError) as e:
+            return self.fail_run(e)
+        finally:
+            self.data_quality_sdk.log_last_report()
+        if config.evaluation_config.walk_forward is not None:
+            return self.evaluate_walk_forward(config, data)
+        return self.evaluate_split(config, data)
+
+    def evaluate_walk_forward(
+        self, config: ExperimentRunConfig, data: pd.DataFrame
+    ) -> EvaluationOutput:
+        """Fit and score one model per walk-forward fold and log their mean errors."""
+        try:
+            results = score_walk_forward(
+                self.data_transformation_sdk, self.feasibility_sdk, config, data
+            )
+        except ValueError as e:
+            return self.fail_run(e)
+        return self.evaluations_sdk.log_fold_results(results)
+
+    def evaluate_split(
+        self, config: ExperimentRunConfig, data: pd.DataFrame
+    ) -> EvaluationOutput:
+        """Fit on the training rows and score the forecast of the test rows."""
         train_data, test_data = self.data_transformation_sdk.run(
             data, config.data_transformation_config
         )
+        if train_data is None:
+            return self.fail_run(ValueError("Data transformation failed."))
+        try:
+            self.feasibility_sdk.check_training_data(config, train_data)
+        except InfeasibleConfigError as e:
+            return self.fail_run(e)
         try:
             predictions = self.ml_models_sdk.run(
                 train_data,
@@ -132,7 +332,43 @@ class ExperimentsSDK:
                 failed=False,
                 error_message=str(e),
             )
+        test_data, predictions = self.data_transformation_sdk.to_scoring_space(
+            test_data,
+            predictions,
+            original_units=config.evaluation_config.units == EvaluationUnits.original,
+        )
         evaluation = self.evaluations_sdk.run(
             test_data, predictions, config.evaluation_config
         )
         return evaluation
+
+    def run_per_geography_experiment(
+        self,
+        config: ExperimentRunConfig,
+        store_root: str,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, EvaluationOutput]:
+        """Fit one model per stored geography across local processes.
+
+        Workers read their own partition from disk, so the parent never holds
+        more than the per-geography results.
+        """
+        self.log_new_run_to_mlflow(config)
+        try:
+            self.feasibility_sdk.check_config(config)
+        except InfeasibleConfigError as e:
+            self.fail_run(e)
+            return {}
+        geographies = PartitionedParquetStore(store_root).select_geographies(
+            config.raw_data_loader_config
+        )
+        worker = partial(
+            run_geography_experiment,
+            store_root,
+            config=config,
+            feasibility_options=self.feasibility_sdk.options,
+        )
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = dict(zip(geographies, executor.map(worker, geographies)))
+        self.evaluations_sdk.log_geography_results(results)
+        return results
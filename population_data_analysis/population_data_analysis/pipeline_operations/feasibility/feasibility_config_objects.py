@@ -0,0 +1,55 @@
+"""Config objects for the experiment feasibility pre-screen."""
+
+from enum import Enum
+from typing import List
+
+from population_data_analysis.common import BasePydanticForRepo
+
+
+class FeasibilityCheck(str, Enum):
+    """Reasons a config cannot produce a meaningful fit."""
+
+    conflicting_state_selection = "conflicting_state_selection"
+    empty_split = "empty_split"
+    invalid_model_order = "invalid_model_order"
+    too_few_rows_for_lags = "too_few_rows_for_lags"
+    non_stationary_without_differencing = "non_stationary_without_differencing"
+
+
+class FeasibilityOptions(BasePydanticForRepo):
+    """Options for the feasibility pre-screen."""
+
+    enabled: bool = True
+    # Fits need at least this many residual degrees of freedom per equation
+    min_residual_degrees_of_freedom: int = 1
+    # Off by default, as configs it rules out could still be fitted. When on and
+    # difference is never, reject when more than max_non_stationary_share of
+    # the columns fail an ADF test at stationarity_p_value
+    check_stationarity: bool = False
+    max_non_stationary_share: float = 0.5
+    stationarity_p_value: float = 0.05
+
+
+class FeasibilityIssue(BasePydanticForRepo):
+    """One reason a config was screened out."""
+
+    check: FeasibilityCheck
+    detail: str
+
+
+class FeasibilityReport(BasePydanticForRepo):
+    """Everything the pre-screen found wrong with a config."""
+
+    issues: List[FeasibilityIssue] = []
+
+    @property
+    def passed(self) -> bool:
+        """Whether the config can go ahead."""
+        return not self.issues
+
+    def __str__(self):
+        if self.passed:
+            return "Config is feasible."
+        return "; ".join(
+            f"{issue.check.value}: {issue.detail}" for issue in self.issues
+        )
@@ -0,0 +1,182 @@
+"""Cheap checks that rule out configs before data is loaded or a model is fitted."""
+
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from population_data_analysis.pipeline_operations.data_quality.data_quality_modules.quality_checks import (
+    measure_columns,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.batched_adf import (
+    adf_p_values,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.matrix_normalization import (
+    log_matrix,
+)
+from population_data_analysis.pipeline_operations.feasibility.feasibility_config_objects import (
+    FeasibilityCheck,
+    FeasibilityIssue,
+    FeasibilityOptions,
+    FeasibilityReport,
+)
+from population_data_analysis.pipeline_operations.ml_models.ml_models_config_objects import (
+    AvailableMLOperations,
+)
+
+
+class InfeasibleConfigError(ValueError):
+    """Raised when the pre-screen rules a config out."""
+
+    def __init__(self, report: FeasibilityReport):
+        super().__init__(f"Config screened out before fitting: {report}")
+        self.report = report
+
+
+def model_orders(config: "ExperimentRunConfig") -> Tuple[int, int]:
+    """AR and MA orders of the configured model."""
+    if config.ml_model_operation_name == AvailableMLOperations.varmax:
+        return config.ml_model_config.p, config.ml_model_config.q
+    return config.ml_model_config.p, 0
+
+
+def residual_degrees_of_freedom(n_obs: int, n_vars: int, p: int, q: int = 0) -> int:
+    """Rows left per equation once the lags and the constant are estimated, as in VAR.fit."""
+    return n_obs - max(p, q) - (n_vars * (p + q) + 1)
+
+
+def allowed_max_lag(n_obs: int, n_vars: int, min_dof: int = 1) -> int:
+    """Largest VAR lag order leaving min_dof residual degrees of freedom, or 0.
+
+    With min_dof=1 this is VARModelAnalyzer.compute_allowed_maxlags in closed form.
+    """
+    return max(0, (n_obs - 1 - min_dof) // (n_vars + 1))
+
+
+def static_issues(config: "ExperimentRunConfig") -> List[FeasibilityIssue]:
+    """Problems visible in the config alone."""
+    issues = []
+    retrival_parameters = config.raw_data_loader_config
+    if (
+        retrival_parameters.specific_states
+        and retrival_parameters.random_sample_n_states
+    ):
+        issues.append(
+            FeasibilityIssue(
+                check=FeasibilityCheck.conflicting_state_selection,
+                detail="random_sample_n_states is ignored when specific_states is set, "
+                "so this repeats the specific_states config",
+            )
+        )
+    split = config.data_transformation_config.train_test_split
+    if not 0 < split < 1:
+        issues.append(
+            FeasibilityIssue(
+                check=FeasibilityCheck.empty_split,
+                detail=f"train_test_split={split} leaves the train or test set empty",
+            )
+        )
+    p, q = model_orders(config)
+    if (
+        p < 0
+        or q < 0
+        or (
+            config.ml_model_operation_name == AvailableMLOperations.varmax
+            and p == q == 0
+        )
+    ):
+        issues.append(
+            FeasibilityIssue(
+                check=FeasibilityCheck.invalid_model_order,
+                detail=f"p={p}, q={q} is not a valid order for "
+                f"{config.ml_model_operation_name.value}",
+            )
+        )
+    return issues
+
+
+def row_issues(
+    config: "ExperimentRunConfig", n_rows: int, options: FeasibilityOptions
+) -> List[FeasibilityIssue]:
+    """Problems visible from the row count, whatever columns survive transformation."""
+    # Transformation always gives up the first row
+    n_obs = n_rows - 1
+    n_train = int(n_obs * config.data_transformation_config.train_test_split)
+    if n_train < 1 or n_obs - n_train < 1:
+        return [
+            FeasibilityIssue(
+                check=FeasibilityCheck.empty_split,
+                detail=f"{n_rows} rows give {n_train} training and "
+                f"{n_obs - n_train} test rows",
+            )
+        ]
+    p, q = model_orders(config)
+    # A single variable is the most any fit could be left with
+    if (
+        residual_degrees_of_freedom(n_train, 1, p, q)
+        < options.min_residual_degrees_of_freedom
+    ):
+        return [
+            FeasibilityIssue(
+                check=FeasibilityCheck.too_few_rows_for_lags,
+                detail=f"{n_train} training rows cannot fit p={p}, q={q} "
+                "even for a single variable",
+            )
+        ]
+    return []
+
+
+def stationarity_issues(
+    data: pd.DataFrame,
+    transformation_options: "DataTransformationOptions",
+    options: FeasibilityOptions,
+) -> List[FeasibilityIssue]:
+    """Flag configs that leave mostly non-stationary series undifferenced, when asked to."""
+    if not options.check_stationarity or transformation_options.difference != "never":
+        return []
+    values = data[measure_columns(data)].to_numpy(dtype=np.float64, copy=True)
+    # Only columns the batched ADF test accepts are judged
+    usable = np.isfinite(values).all(axis=0)
+    usable[usable] = values[:, usable].max(axis=0) > values[:, usable].min(axis=0)
+    values = np.asfortranarray(values[:, usable])
+    if not values.shape[1]:
+        return []
+    log_matrix(values, transformation_options.log)
+    try:
+        p_values = adf_p_values(values)
+    except ValueError:
+        # Too few rows for the test, which row_issues deals with
+        return []
+    non_stationary = int((p_values > options.stationarity_p_value).sum())
+    if non_stationary > options.max_non_stationary_share * len(p_values):
+        return [
+            FeasibilityIssue(
+                check=FeasibilityCheck.non_stationary_without_differencing,
+                detail=f"{non_stationary} of {len(p_values)} columns are "
+                "non-stationary and difference is never",
+            )
+        ]
+    return []
+
+
+def fit_issues(
+    config: "ExperimentRunConfig",
+    train_data: pd.DataFrame,
+    options: FeasibilityOptions,
+) -> List[FeasibilityIssue]:
+    """Degrees-of-freedom check on the training data the model would be fitted on."""
+    n_obs, n_vars = train_data.shape
+    p, q = model_orders(config)
+    if residual_degrees_of_freedom(n_obs, n_vars, p, q) >= (
+        options.min_residual_degrees_of_freedom
+    ):
+        return []
+    detail = f"{n_obs} training rows of {n_vars} variables cannot fit p={p}, q={q}"
+    if q == 0:
+        max_lag = allowed_max_lag(
+            n_obs, n_vars, options.min_residual_degrees_of_freedom
+        )
+        detail += f"; the largest lag they allow is {max_lag}"
+    return [
+        FeasibilityIssue(check=FeasibilityCheck.too_few_rows_for_lags, detail=detail)
+    ]
@@ -0,0 +1,61 @@
+"""Feasibility sdk."""
+
+from typing import Optional
+
+import pandas as pd
+
+from population_data_analysis.pipeline_operations.feasibility.feasibility_config_objects import (
+    FeasibilityOptions,
+    FeasibilityReport,
+)
+from population_data_analysis.pipeline_operations.feasibility.feasibility_modules.screens import (
+    InfeasibleConfigError,
+    fit_issues,
+    row_issues,
+    static_issues,
+    stationarity_issues,
+)
+
+
+class FeasibilitySDK:
+    """Feasibility sdk, screening configs out at the earliest stage that shows they cannot work."""
+
+    def __init__(self, options: Optional[FeasibilityOptions] = None):
+        """Initialize the class."""
+        self.options = options or FeasibilityOptions()
+
+    def config_report(self, config: "ExperimentRunConfig") -> FeasibilityReport:
+        """Screen a config without loading anything."""
+        if not self.options.enabled:
+            return FeasibilityReport()
+        return FeasibilityReport(issues=static_issues(config))
+
+    def _raise_on(self, report: FeasibilityReport):
+        """Raise if the report found anything."""
+        if not report.passed:
+            raise InfeasibleConfigError(report)
+
+    def check_config(self, config: "ExperimentRunConfig"):
+        """Reject a config that cannot work on any data, before it is loaded."""
+        self._raise_on(self.config_report(config))
+
+    def check_data(self, config: "ExperimentRunConfig", data: pd.DataFrame):
+        """Reject a config whose loaded data is too short or unsuited, before transforming it."""
+        if not self.options.enabled:
+            return
+        issues = row_issues(config, len(data), self.options)
+        if not issues:
+            issues = stationarity_issues(
+                data, config.data_transformation_config, self.options
+            )
+        self._raise_on(FeasibilityReport(issues=issues))
+
+    def check_training_data(
+        self, config: "ExperimentRunConfig", train_data: pd.DataFrame
+    ):
+        """Reject a fit the training data has too few degrees of freedom for."""
+        if not self.options.enabled:
+            return
+        self._raise_on(
+            FeasibilityReport(issues=fit_issues(config, train_data, self.options))
+        )
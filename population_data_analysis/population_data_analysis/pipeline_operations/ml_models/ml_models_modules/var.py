@@ -20,18 +20,21 @@ class VARMLModelContainer:
         self.training_data = None
         self.p = hyperparameters.p
 
-    def fit_forecast(self, data: pd.DataFrame, steps: int) -> np.ndarray:
-        """Train the model."""
+    def fit_forecast(
+        self, data: pd.DataFrame, steps: int, log_model: bool = True
+    ) -> np.ndarray:
+        """Train the model, logging it to the active MLflow run unless disabled."""
         self.model = VAR(data)
         self.fit_model = self.model.fit(self.p)
         self.training_data = data
         forecast = self.fit_model.forecast(
             self.training_data.values[-1 * self.p :], steps=steps
         )
-        signature = mlflow.models.infer_signature(data, forecast)
-        mlflow.statsmodels.log_model(
-            self.fit_model, "statsmodels_model", signature=signature
-        )
+        if log_model:
+            signature = mlflow.models.infer_signature(data, forecast)
+            mlflow.statsmodels.log_model(
+                self.fit_model, "statsmodels_model", signature=signature
+            )
         return forecast
 
     def generate_confidence_bounds(self, steps: int):
@@ -23,13 +23,16 @@ class VARMAXMLModelContainer:
         # Use the provided trend or default to a constant trend.
         self.trend = hyperparameters.trend
 
-    def fit_forecast(self, data: pd.DataFrame, steps: int) -> np.ndarray:
+    def fit_forecast(
+        self, data: pd.DataFrame, steps: int, log_model: bool = True
+    ) -> np.ndarray:
         """
         Fit the VARMAX model and generate an out-of-sample forecast.
 
         Parameters:
             data (pd.DataFrame): The training time series data.
             steps (int): Number of steps to forecast ahead.
+            log_model (bool): Log the fitted model to the active MLflow run.
 
         Returns:
             np.ndarray: The forecasted values.
@@ -43,10 +46,11 @@ class VARMAXMLModelContainer:
         forecast_results = self.fit_model.get_forecast(steps=steps)
         forecast = forecast_results.predicted_mean
         # Infer the model signature and log the fitted model using MLflow's statsmodels flavor.
-        signature = mlflow.models.infer_signature(data, forecast)
-        mlflow.statsmodels.log_model(
-            self.fit_model, "statsmodels_model", signature=signature
-        )
+        if log_model:
+            signature = mlflow.models.infer_signature(data, forecast)
+            mlflow.statsmodels.log_model(
+                self.fit_model, "statsmodels_model", signature=signature
+            )
         return forecast
 
     def generate_confidence_bounds(self, steps: int, alpha: float = 0.05):
@@ -27,6 +27,7 @@ class MLModelsSDK:
         steps: int,
         operation: AvailableMLOperations,
         hyperparameters: Union[VARHyperparameters, VARMAXHyperparameters],
+        log_model: bool = True,
     ) -> np.ndarray:
         """Run an operation."""
         if operation == AvailableMLOperations.var:
@@ -35,5 +36,7 @@ class MLModelsSDK:
             model = VARMAXMLModelContainer(hyperparameters)
         else:
             raise ValueError("Operation not found.")
-        forecasted_values = model.fit_forecast(train_data, steps=steps)
+        forecasted_values = model.fit_forecast(
+            train_data, steps=steps, log_model=log_model
+        )
         return forecasted_values
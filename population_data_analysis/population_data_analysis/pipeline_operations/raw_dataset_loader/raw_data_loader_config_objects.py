@@ -3,6 +3,8 @@
 from enum import Enum
 from typing import List, Optional
 
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
 from population_data_analysis.common import BasePydanticForRepo
 
 
@@ -18,3 +20,51 @@ class RetrivalParameters(BasePydanticForRepo):
 
     specific_states: Optional[List[str]] = None
     random_sample_n_states: Optional[int] = None
+
+
+class RawDataBackend(str, Enum):
+    """Where raw data queries are answered."""
+
+    snowflake = "snowflake"
+    local_seeds = "local_seeds"
+
+
+class SqlDialect(str, Enum):
+    """SQL dialect spoken by a raw data backend."""
+
+    snowflake = "snowflake"
+    duckdb = "duckdb"
+
+
+class LoadedDataDtypes(str, Enum):
+    """Column types used for loaded datasets."""
+
+    standard = "standard"
+    compact = "compact"
+
+
+class RawDataBackendSettings(BaseSettings):
+    """Settings choosing the raw data backend, read from the environment."""
+
+    model_config = SettingsConfigDict(env_prefix="POP_PREDICTION_RAW_DATA_")
+
+    backend: RawDataBackend = RawDataBackend.snowflake
+    local_database_path: Optional[str] = None
+    dbt_project_dir: Optional[str] = None
+    dtypes: LoadedDataDtypes = LoadedDataDtypes.standard
+    log_telemetry_to_mlflow: bool = False
+
+
+class QueryCacheSettings(BaseSettings):
+    """Settings for the on-disk query result cache, read from the environment."""
+
+    model_config = SettingsConfigDict(env_prefix="POP_PREDICTION_QUERY_CACHE_")
+
+    directory: Optional[str] = None
+    ttl_seconds: Optional[float] = None
+    offline: bool = False
+    dbt_manifest_path: Optional[str] = None
+    # Snowflake tables whose last-altered time also invalidates entries
+    version_tables: Optional[List[str]] = None
+    version_database: str = "POP_PREDICTION"
+    version_schema: str = "DEV"
@@ -0,0 +1,62 @@
+"""Arrow-native result fetching for warehouse queries."""
+
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+
+IDENTIFIER_COLUMNS = ("YEAR", "STATE_NAME")
+
+
+def fetch_arrow_table(cursor) -> Optional[pa.Table]:
+    """Fetch the whole result set as an Arrow table, or None if the driver cannot."""
+    if hasattr(cursor, "fetch_arrow_all"):
+        # Snowflake returns None instead of an empty table for empty results
+        table = cursor.fetch_arrow_all()
+        if table is None:
+            table = pa.table(
+                {desc[0]: pa.array([], pa.null()) for desc in cursor.description}
+            )
+        return table
+    if hasattr(cursor, "fetch_arrow_table"):
+        return cursor.fetch_arrow_table()
+    return None
+
+
+def _target_type(name: str, arrow_type: pa.DataType) -> pa.DataType:
+    """Pick the column type the rest of the pipeline expects."""
+    if name == "STATE_NAME":
+        return arrow_type
+    if name == "YEAR":
+        if pa.types.is_decimal(arrow_type) and arrow_type.scale == 0:
+            return pa.int64()
+        return arrow_type
+    if (
+        pa.types.is_integer(arrow_type)
+        or pa.types.is_decimal(arrow_type)
+        or pa.types.is_floating(arrow_type)
+        or pa.types.is_null(arrow_type)
+    ):
+        return pa.float64()
+    return arrow_type
+
+
+def coerce_schema(table: pa.Table) -> pa.Table:
+    """Cast every measure column to float64 in one schema-level cast."""
+    target_schema = pa.schema(
+        [
+            pa.field(field.name, _target_type(field.name, field.type))
+            for field in table.schema
+        ]
+    )
+    if target_schema.equals(table.schema):
+        return table
+    return table.cast(target_schema)
+
+
+def arrow_table_to_frame(table: pa.Table) -> pd.DataFrame:
+    """Convert a fetched Arrow table into a typed DataFrame."""
+    table = coerce_schema(table)
+    # self_destruct releases Arrow buffers as columns are converted, which
+    # keeps peak memory close to one copy of the result
+    return table.to_pandas(self_destruct=True, split_blocks=False)
@@ -0,0 +1,33 @@
+"""The averaged-across-states dataset derived in memory from the training table."""
+
+from typing import Dict
+
+import pandas as pd
+
+# Training view column -> name pop_prediction_training_avg_across_state gives its average
+AVERAGED_COLUMN_NAMES: Dict[str, str] = {
+    "NUM_HOUSING_UNITS": "AVG_HOUSING_UNITS",
+    "OUTFLOW_MIGRATION_NUMBER_OF_INDIVIDUALS": "AVG_OUTFLOW_MIGRATION",
+    "INFLOW_MIGRATION_NUMBER_OF_INDIVIDUALS": "AVG_INFLOW_MIGRATION",
+}
+
+
+def averaged_column_name(column: str) -> str:
+    """Name of a column's per-year average in the SQL view."""
+    return AVERAGED_COLUMN_NAMES.get(column, f"AVG_{column}")
+
+
+def average_across_states(
+    df: pd.DataFrame, index: str = "YEAR", columns: str = "STATE_NAME"
+) -> pd.DataFrame:
+    """Per-year mean of every measure, laid out like the SQL view.
+
+    Missing values are skipped the way SQL AVG skips NULLs, and rows come
+    back ordered by year.
+    """
+    measures = [col for col in df.columns if col not in (index, columns)]
+    averages = df.groupby(index, sort=True)[measures].mean().reset_index()
+    ordered = [col for col in df.columns if col != columns]
+    return averages[ordered].rename(
+        columns={col: averaged_column_name(col) for col in measures}
+    )
@@ -0,0 +1,206 @@
+"""Pooled, reusable warehouse connections for the raw data loader and experiments."""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, List, Optional
+
+import snowflake.connector
+
+from population_data_analysis.common import BasePydanticForRepo
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
+    SqlDialect,
+)
+
+
+def snowflake_connection_factory():
+    """Open a new connection to the population prediction warehouse."""
+    return snowflake.connector.connect(
+        user=os.getenv("dbt_user"),
+        password=os.getenv("dbt_password"),
+        account=os.getenv("dbt_account"),
+        warehouse="COMPUTE_WH",
+        database="POP_PREDICTION",
+        schema="DEV",  # Change to "dev" if needed
+        role="transform",
+        # Bind server side so statements with different values share one plan
+        paramstyle="qmark",
+    )
+
+
+def is_open_health_check(connection) -> bool:
+    """Treat a connection as healthy unless it reports itself closed."""
+    is_closed = getattr(connection, "is_closed", None)
+    if is_closed is None:
+        return True
+    return not is_closed()
+
+
+def ping_health_check(connection) -> bool:
+    """Round trip a trivial query to confirm the connection still works."""
+    try:
+        cur = connection.cursor()
+        try:
+            cur.execute("select 1")
+            cur.fetchall()
+        finally:
+            cur.close()
+    except Exception:  # pylint: disable=broad-exception-caught
+        return False
+    return True
+
+
+class ConnectionPoolStatistics(BasePydanticForRepo):
+    """Counters describing how a connection pool has been used."""
+
+    connections_opened: int = 0
+    connections_reused: int = 0
+    connections_discarded: int = 0
+    # A running total rather than per-connection times, so a long-lived pool
+    # does not grow with every reconnect
+    total_connect_seconds: float = 0.0
+
+
+class _PooledConnection:
+    """A live connection together with the time it was last returned."""
+
+    def __init__(self, connection: Any):
+        self.connection = connection
+        self.last_released = time.monotonic()
+
+
+class ConnectionPool:
+    """Bounded pool of warehouse connections with health checks and idle expiry."""
+
+    def __init__(
+        self,
+        connection_factory: Callable[[], Any] = snowflake_connection_factory,
+        max_size: int = 4,
+        max_idle_seconds: Optional[float] = 300.0,
+        health_check: Callable[[Any], bool] = is_open_health_check,
+        acquire_timeout: Optional[float] = None,
+        *,
+        dialect: SqlDialect = SqlDialect.snowflake,
+    ):
+        """Initialize the class; dialect is the SQL the connections speak."""
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self.connection_factory = connection_factory
+        self.max_size = max_size
+        self.max_idle_seconds = max_idle_seconds
+        self.health_check = health_check
+        self.acquire_timeout = acquire_timeout
+        self.dialect = dialect
+        self.statistics = ConnectionPoolStatistics()
+        self._idle: List[_PooledConnection] = []
+        self._open_count = 0
+        self._condition = threading.Condition()
+
+    def _close_quietly(self, connection):
+        """Close a connection, ignoring errors from already broken ones."""
+        try:
+            connection.close()
+        except Exception:  # pylint: disable=broad-exception-caught
+            pass
+
+    def _discard(self, connection):
+        """Drop a connection from the pool. Caller must hold the lock."""
+        self._open_count -= 1
+        self.statistics.connections_discarded += 1
+        self._close_quietly(connection)
+        self._condition.notify()
+
+    def _is_expired(self, pooled: _PooledConnection) -> bool:
+        """Check whether an idle connection has been unused for too long."""
+        if self.max_idle_seconds is None:
+            return False
+        return time.monotonic() - pooled.last_released > self.max_idle_seconds
+
+    def _open_new(self):
+        """Open a new connection, releasing the reserved slot on failure."""
+        start = time.perf_counter()
+        try:
+            connection = self.connection_factory()
+        except Exception:
+            with self._condition:
+                self._open_count -= 1
+                self._condition.notify()
+            raise
+        elapsed = time.perf_counter() - start
+        with self._condition:
+            self.statistics.connections_opened += 1
+            self.statistics.total_connect_seconds += elapsed
+        return connection
+
+    def acquire(self):
+        """Check a connection out of the pool, opening one if needed."""
+        deadline = (
+            None
+            if self.acquire_timeout is None
+            else time.monotonic() + self.acquire_timeout
+        )
+        with self._condition:
+            while True:
+                while self._idle:
+                    pooled = self._idle.pop()
+                    if self._is_expired(pooled) or not self.health_check(
+                        pooled.connection
+                    ):
+                        self._discard(pooled.connection)
+                        continue
+                    self.statistics.connections_reused += 1
+                    return pooled.connection
+                if self._open_count < self.max_size:
+                    self._open_count += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(
+                        f"No connection available after {self.acquire_timeout} seconds."
+                    )
+                self._condition.wait(remaining)
+        return self._open_new()
+
+    def release(self, connection, discard: bool = False):
+        """Return a connection to the pool, or drop it if it is no longer usable."""
+        with self._condition:
+            if discard or not self.health_check(connection):
+                self._discard(connection)
+                return
+            self._idle.append(_PooledConnection(connection))
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with block.
+
+        A block that raises may have left the connection mid-statement or
+        broken, so it is discarded rather than handed to the next caller.
+        """
+        connection = self.acquire()
+        try:
+            yield connection
+        except BaseException:
+            self.release(connection, discard=True)
+            raise
+        self.release(connection)
+
+    def close_all(self):
+        """Close every idle connection held by the pool."""
+        with self._condition:
+            while self._idle:
+                self._discard(self._idle.pop().connection)
+
+
+_default_pool: Optional[ConnectionPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_connection_pool() -> ConnectionPool:
+    """Return the process-wide pool shared by loaders and SDKs that are not given one."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ConnectionPool()
+        return _default_pool
@@ -0,0 +1,55 @@
+"""Column types applied to loaded datasets."""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
+    LoadedDataDtypes,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.arrow_fetch import (
+    IDENTIFIER_COLUMNS,
+)
+
+MEASURE_DTYPES = {
+    LoadedDataDtypes.standard: np.dtype(np.float64),
+    LoadedDataDtypes.compact: np.dtype(np.float32),
+}
+
+# Identifier types only change in compact mode; standard keeps what the warehouse returned
+COMPACT_IDENTIFIER_DTYPES = {
+    "YEAR": np.dtype(np.int16),
+    "STATE_NAME": pd.CategoricalDtype(),
+}
+
+
+def measure_dtype(dtypes: LoadedDataDtypes) -> np.dtype:
+    """Float type used for measure columns."""
+    return MEASURE_DTYPES[dtypes]
+
+
+def target_dtypes(df: pd.DataFrame, dtypes: LoadedDataDtypes) -> Dict[str, object]:
+    """Columns whose type differs from the schema, mapped to the type they should have."""
+    to_cast = {}
+    for col, dtype in df.dtypes.items():
+        if col in IDENTIFIER_COLUMNS:
+            if dtypes == LoadedDataDtypes.compact:
+                target = COMPACT_IDENTIFIER_DTYPES[col]
+                if isinstance(target, pd.CategoricalDtype):
+                    if not isinstance(dtype, pd.CategoricalDtype):
+                        to_cast[col] = "category"
+                elif dtype != target:
+                    to_cast[col] = target
+            continue
+        if dtype != measure_dtype(dtypes):
+            to_cast[col] = measure_dtype(dtypes)
+    return to_cast
+
+
+def apply_dtypes(df: pd.DataFrame, dtypes: LoadedDataDtypes) -> pd.DataFrame:
+    """Cast a loaded frame to the schema in a single astype call."""
+    to_cast = target_dtypes(df, dtypes)
+    if not to_cast:
+        return df
+    return df.astype(to_cast)
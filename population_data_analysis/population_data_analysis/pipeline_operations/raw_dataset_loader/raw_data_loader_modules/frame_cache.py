@@ -0,0 +1,124 @@
+"""Thread-safe, single-flight, byte-bounded cache for loaded frames."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+import pandas as pd
+
+from population_data_analysis.common import BasePydanticForRepo
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Memory held by a frame, including object columns and the index."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def copy_on_write_enabled() -> bool:
+    """Check whether pandas protects shallow copies from each other's writes."""
+    if int(pd.__version__.split(".", maxsplit=1)[0]) >= 3:
+        return True
+    return pd.get_option("mode.copy_on_write") is True
+
+
+class FrameCacheStatistics(BasePydanticForRepo):
+    """Counters describing how a frame cache has been used."""
+
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    current_bytes: int = 0
+
+
+class _InFlightLoad:
+    """A load that other callers for the same key can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.frame: Optional[pd.DataFrame] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlightFrameCache:
+    """LRU cache of frames bounded by total bytes, merging concurrent loads of a key."""
+
+    def __init__(self, max_bytes: int = 1024**3):
+        """Initialize the class."""
+        self.max_bytes = max_bytes
+        self.statistics = FrameCacheStatistics()
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _hand_out(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Give each caller its own frame so in-place edits cannot leak between them."""
+        return frame.copy(deep=not copy_on_write_enabled())
+
+    def _store(self, key: Hashable, frame: pd.DataFrame):
+        """Insert a frame and evict least recently used entries. Caller holds the lock."""
+        nbytes = frame_nbytes(frame)
+        if nbytes > self.max_bytes:
+            return
+        self._entries[key] = (frame, nbytes)
+        self.statistics.current_bytes += nbytes
+        while self.statistics.current_bytes > self.max_bytes:
+            _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+            self.statistics.current_bytes -= evicted_nbytes
+            self.statistics.evictions += 1
+
+    def get_or_load(
+        self, key: Hashable, load: Callable[[], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """Return the cached frame for a key, loading it at most once at a time."""
+        return self._hand_out(self._shared_frame(key, load))
+
+    def warm(self, key: Hashable, load: Callable[[], pd.DataFrame]):
+        """Load a key into the cache, if it is not there already, without handing it out."""
+        self._shared_frame(key, load)
+
+    def _shared_frame(
+        self, key: Hashable, load: Callable[[], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """The frame every caller of a key shares, loading it at most once at a time."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.statistics.hits += 1
+                return self._entries[key][0]
+            in_flight = self._in_flight.get(key)
+            is_leader = in_flight is None
+            if is_leader:
+                in_flight = _InFlightLoad()
+                self._in_flight[key] = in_flight
+                self.statistics.misses += 1
+            else:
+                self.statistics.coalesced += 1
+
+        if not is_leader:
+            in_flight.done.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.frame
+
+        try:
+            frame = load()
+        except BaseException as error:
+            with self._lock:
+                del self._in_flight[key]
+            in_flight.error = error
+            in_flight.done.set()
+            raise
+
+        with self._lock:
+            self._store(key, frame)
+            del self._in_flight[key]
+        in_flight.frame = frame
+        in_flight.done.set()
+        return frame
+
+    def clear(self):
+        """Drop every cached frame."""
+        with self._lock:
+            self._entries.clear()
+            self.statistics.current_bytes = 0
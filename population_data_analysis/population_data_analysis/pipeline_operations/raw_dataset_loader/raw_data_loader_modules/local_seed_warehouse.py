@@ -0,0 +1,281 @@
+"""Local embedded warehouse that materializes the dbt models from the seed CSVs."""
+
+import hashlib
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
+    SqlDialect,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.connection_pool import (
+    ConnectionPool,
+)
+
+DEFAULT_DBT_PROJECT_DIR = (
+    Path(__file__).resolve().parents[5]
+    / "population_analysis_dbt"
+    / "population_analysis_dbt"
+)
+
+DATABASE_NAME = "pop_prediction"
+SCHEMA_NAME = "dev"
+BUILD_INFO_TABLE = f"{DATABASE_NAME}.{SCHEMA_NAME}.local_seed_build_info"
+
+_REF_PATTERN = re.compile(r"\{\{\s*ref\(\s*'([^']+)'\s*\)\s*\}\}")
+_QUALIFIED_NAME_PATTERN = re.compile(
+    rf"{DATABASE_NAME}\.{SCHEMA_NAME}\.(\w+)", flags=re.IGNORECASE
+)
+# Snowflake accepts `SELECT 2010 YEAR`, DuckDB needs an explicit AS
+_BARE_YEAR_ALIAS_PATTERN = re.compile(r"SELECT\s+(\d{4})\s+YEAR\s*,", re.IGNORECASE)
+# Snowflake's NUMERIC defaults to NUMBER(38, 0); DuckDB's to DECIMAL(18, 3)
+_NUMERIC_CAST_PATTERN = re.compile(r"AS\s+NUMERIC\s*\)", re.IGNORECASE)
+_UNQUOTED_IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_$]*$")
+
+
+def snowflake_column_name(name: str) -> str:
+    """Upper-case names that could only have come from unquoted identifiers."""
+    if _UNQUOTED_IDENTIFIER_PATTERN.match(name):
+        return name.upper()
+    return name
+
+
+def read_seed_csv(path: Path) -> pd.DataFrame:
+    """Read a seed the way dbt does: numbers with separators, dates, then text."""
+    frame = pd.read_csv(path, dtype=str)
+    for col in frame.columns:
+        values = frame[col]
+        numeric = pd.to_numeric(
+            values.str.replace(",", "", regex=False).str.rstrip("%"), errors="coerce"
+        )
+        if numeric.notna().sum() == values.notna().sum():
+            frame[col] = numeric
+            continue
+        try:
+            frame[col] = pd.to_datetime(values, format="ISO8601")
+        except (ValueError, TypeError):
+            pass
+    # Unquoted identifiers are upper case in Snowflake
+    frame.columns = [col.upper() for col in frame.columns]
+    return frame
+
+
+def translate_model_sql(sql: str) -> str:
+    """Render a dbt model's Jinja refs and smooth over Snowflake-only syntax."""
+    sql = _REF_PATTERN.sub(
+        lambda match: f'{DATABASE_NAME}.{SCHEMA_NAME}."{match.group(1)}"', sql
+    )
+    sql = _BARE_YEAR_ALIAS_PATTERN.sub(r"SELECT \1 AS YEAR,", sql)
+    sql = _NUMERIC_CAST_PATTERN.sub("AS DECIMAL(38, 0))", sql)
+    return sql
+
+
+class LocalSeedCursor:
+    """DB-API cursor that reports column names the way Snowflake does."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    @property
+    def description(self):
+        """Column descriptions with upper-cased names."""
+        if self._cursor.description is None:
+            return None
+        return [
+            (snowflake_column_name(desc[0]),) + tuple(desc[1:])
+            for desc in self._cursor.description
+        ]
+
+    def execute(self, query, params=None):
+        """Execute a query."""
+        if params is None:
+            self._cursor.execute(query)
+        else:
+            self._cursor.execute(query, params)
+        return self
+
+    def fetchall(self):
+        """Fetch all rows."""
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size=None):
+        """Fetch the next batch of rows."""
+        if size is None:
+            return self._cursor.fetchmany()
+        return self._cursor.fetchmany(size)
+
+    def fetch_arrow_table(self):
+        """Fetch the whole result set as an Arrow table."""
+        table = self._cursor.fetch_arrow_table()
+        return table.rename_columns(
+            [snowflake_column_name(name) for name in table.column_names]
+        )
+
+    def fetch_record_batch(self, rows_per_batch: int):
+        """Stream the result set as Arrow record batches."""
+        reader = self._cursor.fetch_record_batch(rows_per_batch)
+        names = [snowflake_column_name(name) for name in reader.schema.names]
+        for batch in reader:
+            yield pa.RecordBatch.from_arrays(batch.columns, names=names)
+
+    def close(self):
+        """Close the cursor."""
+        self._cursor.close()
+
+
+class LocalSeedConnection:
+    """DB-API connection to the local seed warehouse."""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self):
+        """Open a cursor."""
+        return LocalSeedCursor(self._connection.cursor())
+
+    def close(self):
+        """Close the connection."""
+        self._connection.close()
+
+
+class LocalSeedWarehouse:
+    """Builds the dbt project's seeds and models into an embedded DuckDB database."""
+
+    def __init__(
+        self,
+        dbt_project_dir: Optional[str] = None,
+        database_path: Optional[str] = None,
+    ):
+        """Initialize the class."""
+        self.dbt_project_dir = Path(dbt_project_dir or DEFAULT_DBT_PROJECT_DIR)
+        self.database_path = database_path
+        self._connection = None
+        self._lock = threading.Lock()
+
+    @property
+    def seed_paths(self) -> Dict[str, Path]:
+        """Seed CSVs keyed by the table name dbt gives them."""
+        return {
+            path.stem: path
+            for path in sorted((self.dbt_project_dir / "seeds").rglob("*.csv"))
+        }
+
+    @property
+    def model_sql(self) -> Dict[str, str]:
+        """Model SQL keyed by model name."""
+        return {
+            path.stem: path.read_text()
+            for path in sorted((self.dbt_project_dir / "models").rglob("*.sql"))
+        }
+
+    def source_fingerprint(self) -> str:
+        """Hash of every seed and model, used to decide whether a rebuild is needed."""
+        digest = hashlib.sha256()
+        for path in list(self.seed_paths.values()) + sorted(
+            (self.dbt_project_dir / "models").rglob("*.sql")
+        ):
+            digest.update(str(path.relative_to(self.dbt_project_dir)).encode("utf-8"))
+            digest.update(path.read_bytes())
+        return digest.hexdigest()
+
+    def _model_dependencies(self, sql: str, model_names: Dict[str, str]) -> list:
+        """Models referenced through ref() or a fully qualified table name."""
+        dependencies = [
+            name for name in _REF_PATTERN.findall(sql) if name in model_names.values()
+        ]
+        for name in _QUALIFIED_NAME_PATTERN.findall(sql):
+            if name.lower() in model_names:
+                dependencies.append(model_names[name.lower()])
+        return dependencies
+
+    def _load_seeds(self, connection):
+        """Create one table per seed CSV."""
+        for table_name, path in self.seed_paths.items():
+            connection.register("seed_frame", read_seed_csv(path))
+            connection.execute(
+                f'create or replace table {DATABASE_NAME}.{SCHEMA_NAME}."{table_name}" '
+                "as select * from seed_frame"
+            )
+            connection.unregister("seed_frame")
+
+    def _build_models(self, connection):
+        """Materialize every model as a table, dependencies first."""
+        models = self.model_sql
+        model_names = {name.lower(): name for name in models}
+        built = set()
+
+        def build(name):
+            if name in built:
+                return
+            built.add(name)
+            for dependency in self._model_dependencies(models[name], model_names):
+                build(dependency)
+            connection.execute(
+                f"create or replace table {DATABASE_NAME}.{SCHEMA_NAME}.{name} as "
+                f"{translate_model_sql(models[name])}"
+            )
+
+        for name in models:
+            build(name)
+
+    def _is_current(self, connection, fingerprint: str) -> bool:
+        """Check whether the attached database was built from the current sources."""
+        try:
+            stored = connection.execute(
+                f"select fingerprint from {BUILD_INFO_TABLE}"
+            ).fetchone()
+        except duckdb.CatalogException:
+            return False
+        return stored is not None and stored[0] == fingerprint
+
+    def build(self, force: bool = False):
+        """Open the database, rebuilding seeds and models if they are out of date."""
+        with self._lock:
+            if self._connection is not None:
+                if not force:
+                    return self._connection
+                self._connection.close()
+            connection = duckdb.connect()
+            connection.execute(
+                f"attach '{self.database_path or ':memory:'}' as {DATABASE_NAME}"
+            )
+            connection.execute(
+                f"create schema if not exists {DATABASE_NAME}.{SCHEMA_NAME}"
+            )
+            fingerprint = self.source_fingerprint()
+            if force or not self._is_current(connection, fingerprint):
+                self._load_seeds(connection)
+                self._build_models(connection)
+                connection.execute(
+                    f"create or replace table {BUILD_INFO_TABLE} as "
+                    "select ? as fingerprint",
+                    [fingerprint],
+                )
+            self._connection = connection
+            return connection
+
+    def connect(self) -> LocalSeedConnection:
+        """Open a new connection; the database is built on first use."""
+        return LocalSeedConnection(self.build().cursor())
+
+
+def local_seed_connection_pool(
+    dbt_project_dir: Optional[str] = None,
+    database_path: Optional[str] = None,
+    max_size: int = 4,
+) -> ConnectionPool:
+    """Connection pool backed by a local seed warehouse instead of Snowflake."""
+    warehouse = LocalSeedWarehouse(
+        dbt_project_dir=dbt_project_dir, database_path=database_path
+    )
+    return ConnectionPool(
+        connection_factory=warehouse.connect,
+        max_size=max_size,
+        dialect=SqlDialect.duckdb,
+        max_idle_seconds=None,
+    )
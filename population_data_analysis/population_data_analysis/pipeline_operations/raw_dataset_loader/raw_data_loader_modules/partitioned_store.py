@@ -0,0 +1,146 @@
+"""Training data stored as Parquet partitioned by geography, for out-of-core processing."""
+
+import itertools
+import random
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+from urllib.parse import quote, unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
+    RetrivalParameters,
+)
+
+# Written into every store, so only directories the store made are ever replaced
+STORE_MARKER = "_PARTITIONED_STORE"
+
+
+class PartitionedParquetStore:
+    """One directory of Parquet files per geography, each readable on its own."""
+
+    def __init__(self, root: str, geography_column: str = "STATE_NAME"):
+        """Initialize the class."""
+        self.root = Path(root)
+        self.geography_column = geography_column
+
+    def partition_path(self, geography: str) -> Path:
+        """Directory holding one geography's rows."""
+        return self.root / quote(str(geography), safe="")
+
+    def geographies(self) -> List[str]:
+        """Every geography with at least one stored file, sorted."""
+        if not self.root.exists():
+            return []
+        return sorted(
+            unquote(path.name)
+            for path in self.root.iterdir()
+            if path.is_dir() and any(path.glob("*.parquet"))
+        )
+
+    def select_geographies(self, retrival_parameters: RetrivalParameters) -> List[str]:
+        """Apply the specific_states / random_sample_n_states subset semantics."""
+        available = self.geographies()
+        if retrival_parameters.specific_states:
+            missing = set(retrival_parameters.specific_states) - set(available)
+            if missing:
+                raise ValueError(f"Unknown geographies: {sorted(missing)}")
+            return sorted(set(retrival_parameters.specific_states))
+        if retrival_parameters.random_sample_n_states:
+            return sorted(
+                random.sample(available, retrival_parameters.random_sample_n_states)
+            )
+        return available
+
+    def read_partition(self, geography: str) -> pd.DataFrame:
+        """Long rows for one geography, ordered by year."""
+        files = sorted(self.partition_path(geography).glob("*.parquet"))
+        if not files:
+            raise ValueError(f"Unknown geography: {geography}")
+        table = pa.concat_tables(pq.read_table(path) for path in files)
+        return (
+            table.to_pandas(self_destruct=True)
+            .sort_values("YEAR", kind="stable")
+            .reset_index(drop=True)
+        )
+
+    def iter_partitions(
+        self, geographies: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Yield one geography's rows at a time, so only one is in memory."""
+        for geography in geographies or self.geographies():
+            yield self.read_partition(geography)
+
+    def is_store(self) -> bool:
+        """Whether the root was written as a partitioned store."""
+        return (self.root / STORE_MARKER).is_file()
+
+    def check_replaceable(self):
+        """Refuse to touch a root that holds anything other than a store."""
+        if not self.root.exists() or self.is_store():
+            return
+        if not self.root.is_dir() or any(self.root.iterdir()):
+            raise ValueError(
+                f"{self.root} is not empty and is not a partitioned store; "
+                "refusing to replace it."
+            )
+
+    def clear(self):
+        """Remove every stored partition."""
+        self.check_replaceable()
+        if self.root.exists():
+            shutil.rmtree(self.root)
+
+    @contextmanager
+    def staged_replacement(self) -> Iterator["PartitionedParquetStore"]:
+        """Build a new store beside this one and swap it in only once complete.
+
+        A failed build leaves the existing store as it was.
+        """
+        self.check_replaceable()
+        self.root.parent.mkdir(parents=True, exist_ok=True)
+        staging = PartitionedParquetStore(
+            tempfile.mkdtemp(prefix=f".{self.root.name}-", dir=self.root.parent),
+            geography_column=self.geography_column,
+        )
+        try:
+            (staging.root / STORE_MARKER).touch()
+            yield staging
+        except BaseException:
+            shutil.rmtree(staging.root, ignore_errors=True)
+            raise
+        self.clear()
+        staging.root.rename(self.root)
+
+
+class PartitionWriter:
+    """Incremental builder that appends each fetched batch to its geographies' partitions."""
+
+    def __init__(self, store: PartitionedParquetStore):
+        """Initialize the class."""
+        self.store = store
+        self._batch_numbers = itertools.count()
+        self.rows_written = 0
+
+    def add_batch(self, df: pd.DataFrame):
+        """Split a batch by geography and write one file per geography."""
+        batch_number = next(self._batch_numbers)
+        for geography, rows in df.groupby(
+            self.store.geography_column, sort=False, observed=True
+        ):
+            path = self.store.partition_path(geography)
+            path.mkdir(parents=True, exist_ok=True)
+            pq.write_table(
+                pa.Table.from_pandas(rows, preserve_index=False),
+                path / f"part-{batch_number:06d}.parquet",
+            )
+        self.rows_written += len(df)
+
+    def finish(self) -> PartitionedParquetStore:
+        """Return the store that was written."""
+        return self.store
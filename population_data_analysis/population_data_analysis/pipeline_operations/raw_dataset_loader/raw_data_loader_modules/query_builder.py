@@ -0,0 +1,86 @@
+"""Parameterized queries against the training views."""
+
+import json
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
+    SqlDialect,
+)
+
+TRAINING_VIEW = "POP_PREDICTION.DEV.POP_PREDICTION_TRAINING"
+AVERAGED_TRAINING_VIEW = "POP_PREDICTION.DEV.POP_PREDICTION_TRAINING_AVG_ACROSS_STATE"
+
+
+class BoundQuery(NamedTuple):
+    """Statement text and the values bound to its placeholders."""
+
+    sql: str
+    params: Optional[List[Any]] = None
+
+
+# Filters on a single bound array of state names, whatever its length
+STATE_LIST_PREDICATES = {
+    SqlDialect.snowflake: (
+        "state_name in "
+        "(select value::varchar from table(flatten(input => parse_json(?))))"
+    ),
+    SqlDialect.duckdb: "state_name = any(?::varchar[])",
+}
+
+
+def bind_state_list(dialect: SqlDialect, states: Sequence[str]) -> Any:
+    """Pass a state list as one array value in the form the dialect accepts."""
+    if dialect == SqlDialect.snowflake:
+        return json.dumps(list(states))
+    return list(states)
+
+
+class TrainingViewQueryBuilder:
+    """Builds fixed-text statements so the warehouse can reuse their compiled plans.
+
+    Neither driver exposes prepared-statement handles that outlive a cursor, so
+    rather than caching prepared statements per connection, each statement's text
+    is fixed once per builder and its values are bound. Identical text is what
+    lets the warehouse reuse a compiled plan.
+    """
+
+    def __init__(
+        self,
+        dialect: SqlDialect = SqlDialect.snowflake,
+        training_view: str = TRAINING_VIEW,
+        averaged_training_view: str = AVERAGED_TRAINING_VIEW,
+    ):
+        """Initialize the class."""
+        self.dialect = dialect
+        self.training_view = training_view
+        self.averaged_training_view = averaged_training_view
+        # Built once, so every subset load sends byte-identical statement text
+        self._states_subset_sql = (
+            f"select * from {training_view} "
+            f"where {STATE_LIST_PREDICATES[dialect]} "
+            "order by year, state_name"
+        )
+
+    def full_table(self) -> BoundQuery:
+        """Every row of the training view."""
+        return BoundQuery(
+            f"select * from {self.training_view} order by year, state_name"
+        )
+
+    def states_subset(self, states: Sequence[str]) -> BoundQuery:
+        """Rows of the training view for any number of states."""
+        return BoundQuery(
+            self._states_subset_sql, [bind_state_list(self.dialect, states)]
+        )
+
+    def distinct_states(self) -> BoundQuery:
+        """Every state in the training view."""
+        return BoundQuery(f"select distinct state_name from {self.training_view}")
+
+    def columns(self) -> BoundQuery:
+        """No rows, only the training view's columns."""
+        return BoundQuery(f"select * from {self.training_view} limit 0")
+
+    def averaged_across_states(self) -> BoundQuery:
+        """The per-year training view averaged across states."""
+        return BoundQuery(f"select * from {self.averaged_training_view} order by year")
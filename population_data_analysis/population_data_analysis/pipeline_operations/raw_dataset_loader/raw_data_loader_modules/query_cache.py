@@ -0,0 +1,224 @@
+"""Persistent on-disk Parquet cache for warehouse query results."""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
+    QueryCacheSettings,
+)
+
+# Schema metadata key holding an entry's creation time and version token
+CACHE_METADATA_KEY = b"query_cache"
+
+
+class OfflineCacheMissError(RuntimeError):
+    """Raised when offline mode is asked for a query that is not cached."""
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and trailing semicolons so equivalent queries share a key."""
+    return " ".join(query.split()).rstrip(";").strip()
+
+
+def dbt_manifest_version_token(manifest_path: str) -> Callable[[], str]:
+    """Build a version token from the hash of a dbt manifest.json."""
+
+    def version_token() -> str:
+        return hashlib.sha256(Path(manifest_path).read_bytes()).hexdigest()
+
+    return version_token
+
+
+def table_last_altered_version_token(
+    run_query: Callable[[str, Any], pd.DataFrame],
+    table_names: Iterable[str],
+    database: str = "POP_PREDICTION",
+    schema: str = "DEV",
+) -> Callable[[], str]:
+    """Build a version token from the warehouse's last-altered time of the given tables.
+
+    Snowflake only: information_schema.tables has no last_altered column in duckdb.
+    """
+    # The database is an identifier and cannot be bound; the schema and the
+    # table list are bound like the training view's state list
+    query = (
+        f"select max(last_altered) as LAST_ALTERED from {database}.information_schema.tables "
+        "where table_schema = ? and table_name in "
+        "(select value::varchar from table(flatten(input => parse_json(?))))"
+    )
+    params = [schema.upper(), json.dumps([name.upper() for name in table_names])]
+
+    def version_token() -> str:
+        return str(run_query(query, params).iloc[0, 0])
+
+    return version_token
+
+
+def _joined_version_token(providers: List[Callable[[], str]]) -> Callable[[], str]:
+    """Combine several version tokens so a change in any of them invalidates entries."""
+
+    def version_token() -> str:
+        return "/".join(provider() for provider in providers)
+
+    return version_token
+
+
+class ParquetQueryCache:
+    """Query results stored as Parquet files, invalidated by TTL or a source-version token."""
+
+    def __init__(
+        self,
+        directory: str,
+        ttl_seconds: Optional[float] = None,
+        version_token_provider: Optional[Callable[[], str]] = None,
+        offline: bool = False,
+    ):
+        """Initialize the class."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.version_token_provider = version_token_provider
+        self.offline = offline
+        self._version_token = None
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: QueryCacheSettings,
+        run_query: Optional[Callable[[str, Any], pd.DataFrame]] = None,
+    ) -> Optional["ParquetQueryCache"]:
+        """Build a cache from settings, or None when no cache directory is configured.
+
+        run_query answers the last-altered lookup when settings.version_tables is set.
+        """
+        if settings.directory is None:
+            return None
+        providers = []
+        if settings.dbt_manifest_path is not None:
+            providers.append(dbt_manifest_version_token(settings.dbt_manifest_path))
+        if settings.version_tables:
+            if run_query is None:
+                raise ValueError("version_tables needs a run_query to look them up")
+            providers.append(
+                table_last_altered_version_token(
+                    run_query,
+                    settings.version_tables,
+                    database=settings.version_database,
+                    schema=settings.version_schema,
+                )
+            )
+        version_token_provider = None
+        if len(providers) == 1:
+            version_token_provider = providers[0]
+        elif providers:
+            version_token_provider = _joined_version_token(providers)
+        return cls(
+            directory=settings.directory,
+            ttl_seconds=settings.ttl_seconds,
+            version_token_provider=version_token_provider,
+            offline=settings.offline,
+        )
+
+    @property
+    def version_token(self) -> Optional[str]:
+        """Current source-version token, computed once per cache instance."""
+        if self.version_token_provider is None:
+            return None
+        if self._version_token is None:
+            self._version_token = self.version_token_provider()
+        return self._version_token
+
+    def refresh_version_token(self):
+        """Forget the memoized version token so the next lookup recomputes it."""
+        self._version_token = None
+
+    def cache_key(self, query: str, params: Optional[Any] = None) -> str:
+        """Hash the normalized query text together with its bind parameters."""
+        payload = json.dumps(
+            {"query": normalize_query(query), "params": params},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        """Location of the Parquet file holding a key's frame and metadata."""
+        return self.directory / f"{key}.parquet"
+
+    def _is_fresh(self, metadata: dict) -> bool:
+        """Check an entry against the TTL and the current version token."""
+        if self.ttl_seconds is not None:
+            if time.time() - metadata["created_at"] > self.ttl_seconds:
+                return False
+        if self.version_token_provider is not None:
+            if metadata.get("version_token") != self.version_token:
+                return False
+        return True
+
+    def get(self, query: str, params: Optional[Any] = None) -> Optional[pd.DataFrame]:
+        """Return the cached frame for a query, or None if it is missing or stale."""
+        path = self._path(self.cache_key(query, params))
+        if not path.exists():
+            return None
+        schema_metadata = pq.read_schema(path).metadata or {}
+        if CACHE_METADATA_KEY not in schema_metadata:
+            return None
+        metadata = json.loads(schema_metadata[CACHE_METADATA_KEY])
+        # Offline mode has no way to refresh, so anything on disk is served
+        if not self.offline and not self._is_fresh(metadata):
+            return None
+        return pd.read_parquet(path)
+
+    def put(self, query: str, params: Optional[Any], df: pd.DataFrame):
+        """Store a query result, replacing any previous entry atomically.
+
+        The metadata travels in the Parquet schema metadata, so each entry is a
+        single file swapped in by one os.replace.
+        """
+        path = self._path(self.cache_key(query, params))
+        metadata = {
+            "query": normalize_query(query),
+            "created_at": time.time(),
+            "version_token": self.version_token,
+        }
+        table = pa.Table.from_pandas(df)
+        table = table.replace_schema_metadata(
+            {
+                **(table.schema.metadata or {}),
+                CACHE_METADATA_KEY: json.dumps(metadata).encode("utf-8"),
+            }
+        )
+        temporary_path = path.with_suffix(f".{os.getpid()}.tmp")
+        pq.write_table(table, temporary_path)
+        os.replace(temporary_path, path)
+
+    def get_or_load(
+        self,
+        query: str,
+        params: Optional[Any],
+        load: Callable[[], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """Serve a query from disk, running it against the warehouse only on a miss."""
+        df = self.get(query, params)
+        if df is not None:
+            return df
+        if self.offline:
+            raise OfflineCacheMissError(
+                f"Query is not cached and offline mode is enabled: {normalize_query(query)}"
+            )
+        df = load()
+        self.put(query, params, df)
+        return df
+
+    def clear(self):
+        """Remove every cached entry."""
+        for path in self.directory.glob("*.parquet"):
+            path.unlink()
@@ -0,0 +1,146 @@
+"""Per-query I/O timings and sizes recorded by the raw data loader."""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+import mlflow
+
+from population_data_analysis.common import BasePydanticForRepo
+
+TIMED_STAGES = ("connect", "execute", "fetch", "frame")
+
+
+class QueryTelemetryRecord(BasePydanticForRepo):
+    """Where the time went for a single query."""
+
+    query: str
+    started_at: float
+    connect_seconds: float = 0.0
+    execute_seconds: float = 0.0
+    fetch_seconds: float = 0.0
+    frame_seconds: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    # None when no on-disk cache is configured
+    cache_hit: Optional[bool] = None
+    streamed: bool = False
+
+    @property
+    def total_seconds(self) -> float:
+        """Time across every stage."""
+        return sum(getattr(self, f"{stage}_seconds") for stage in TIMED_STAGES)
+
+    def as_metrics(self, prefix: str = "raw_data_query") -> Dict[str, float]:
+        """Flatten into MLflow metric names and values."""
+        metrics = {
+            f"{prefix}_{stage}_seconds": getattr(self, f"{stage}_seconds")
+            for stage in TIMED_STAGES
+        }
+        metrics[f"{prefix}_rows"] = float(self.rows)
+        metrics[f"{prefix}_bytes"] = float(self.bytes)
+        if self.cache_hit is not None:
+            metrics[f"{prefix}_cache_hit"] = float(self.cache_hit)
+        return metrics
+
+
+class QueryTelemetrySummary(BasePydanticForRepo):
+    """Totals over a set of queries, e.g. one sweep."""
+
+    queries: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    streamed_queries: int = 0
+    rows: int = 0
+    bytes: int = 0
+    connect_seconds: float = 0.0
+    execute_seconds: float = 0.0
+    fetch_seconds: float = 0.0
+    frame_seconds: float = 0.0
+
+    @property
+    def total_seconds(self) -> float:
+        """Time across every stage."""
+        return sum(getattr(self, f"{stage}_seconds") for stage in TIMED_STAGES)
+
+    def as_metrics(self, prefix: str = "raw_data") -> Dict[str, float]:
+        """Flatten into MLflow metric names and values."""
+        return {
+            f"{prefix}_{name}": float(value)
+            for name, value in self.model_dump().items()
+        }
+
+    def describe(self) -> str:
+        """One line for logs."""
+        return (
+            f"{self.queries} queries, {self.cache_hits} cache hits, "
+            f"{self.rows} rows, {self.bytes / 1e6:.1f} MB, "
+            f"{self.total_seconds:.2f}s (connect {self.connect_seconds:.2f}s, "
+            f"execute {self.execute_seconds:.2f}s, fetch {self.fetch_seconds:.2f}s, "
+            f"frame {self.frame_seconds:.2f}s)"
+        )
+
+
+class QueryTelemetry:
+    """Thread-safe collector of query records, optionally mirrored to MLflow."""
+
+    def __init__(self, log_to_mlflow: bool = False):
+        """Initialize the class."""
+        self.log_to_mlflow = log_to_mlflow
+        self._records: List[QueryTelemetryRecord] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def start(query: str) -> QueryTelemetryRecord:
+        """Open a record for a query about to run."""
+        return QueryTelemetryRecord(
+            query=" ".join(query.split()), started_at=time.time()
+        )
+
+    def add(self, record: QueryTelemetryRecord):
+        """Keep a finished record, logging it on the active MLflow run if enabled."""
+        with self._lock:
+            self._records.append(record)
+            step = len(self._records) - 1
+        if self.log_to_mlflow and mlflow.active_run() is not None:
+            mlflow.log_metrics(record.as_metrics(), step=step)
+
+    @property
+    def records(self) -> List[QueryTelemetryRecord]:
+        """Every record collected so far."""
+        with self._lock:
+            return list(self._records)
+
+    def summary(self) -> QueryTelemetrySummary:
+        """Totals over every record collected so far."""
+        summary = QueryTelemetrySummary()
+        for record in self.records:
+            summary.queries += 1
+            summary.cache_hits += record.cache_hit is True
+            summary.cache_misses += record.cache_hit is False
+            summary.streamed_queries += record.streamed
+            summary.rows += record.rows
+            summary.bytes += record.bytes
+            for stage in TIMED_STAGES:
+                setattr(
+                    summary,
+                    f"{stage}_seconds",
+                    getattr(summary, f"{stage}_seconds")
+                    + getattr(record, f"{stage}_seconds"),
+                )
+        return summary
+
+    def log_to_active_run(self):
+        """Log the summary and every record on the active MLflow run.
+
+        Loads that happen outside any run, such as a sweep's prefetch, are
+        only recorded here, so this is how they reach MLflow.
+        """
+        mlflow.log_metrics(self.summary().as_metrics())
+        for step, record in enumerate(self.records):
+            mlflow.log_metrics(record.as_metrics(), step=step)
+
+    def clear(self):
+        """Forget every record, e.g. at the start of a sweep."""
+        with self._lock:
+            self._records.clear()
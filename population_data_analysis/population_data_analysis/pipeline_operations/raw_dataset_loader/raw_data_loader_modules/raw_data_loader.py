@@ -1,54 +1,224 @@
 """Get all possible run configurations for all sweep experiments."""
 
-import os
+import threading
+import time
+from typing import Any, List, Optional, Tuple
 
 import pandas as pd
-import snowflake.connector
 
 from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
     AvailableDataRetrivalOperations,
+    LoadedDataDtypes,
     RetrivalParameters,
+    SqlDialect,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.arrow_fetch import (
+    IDENTIFIER_COLUMNS,
+    arrow_table_to_frame,
+    fetch_arrow_table,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.averaged_view import (
+    average_across_states,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.connection_pool import (
+    ConnectionPool,
+    get_default_connection_pool,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.dtype_schema import (
+    apply_dtypes,
+    measure_dtype,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.frame_cache import (
+    frame_nbytes,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.partitioned_store import (
+    PartitionedParquetStore,
+    PartitionWriter,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.query_builder import (
+    BoundQuery,
+    TrainingViewQueryBuilder,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.query_cache import (
+    ParquetQueryCache,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.query_telemetry import (
+    QueryTelemetry,
+    QueryTelemetryRecord,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.state_index import (
+    StateIndexedTable,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.streaming_fetch import (
+    DEFAULT_BATCH_ROWS,
+    LongFrameBuilder,
+    iter_frame_batches,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.wide_format import (
+    IncrementalWideBuilder,
+    build_pivot_query,
+    long_to_wide,
 )
 
 
+def _lap(started: float) -> Tuple[float, float]:
+    """Seconds since started, and the new start for the next stage."""
+    now = time.perf_counter()
+    return now - started, now
+
+
 class RawDataLoader:
     """Class for loading raw data."""
 
-    def run_query(self, query):
-        """Run a query."""
-
-        # Define connection parameters
-        conn = snowflake.connector.connect(
-            user=os.getenv("dbt_user"),
-            password=os.getenv("dbt_password"),
-            account=os.getenv("dbt_account"),
-            warehouse="COMPUTE_WH",
-            database="POP_PREDICTION",
-            schema="DEV",  # Change to "dev" if needed
-            role="transform",
-        )
+    def __init__(
+        self,
+        connection_pool: Optional[ConnectionPool] = None,
+        *,
+        use_arrow: bool = True,
+        query_cache: Optional[ParquetQueryCache] = None,
+        pivot_in_sql: bool = False,
+        fetch_once: bool = True,
+        dtypes: LoadedDataDtypes = LoadedDataDtypes.standard,
+        stream_batch_rows: Optional[int] = None,
+        dialect: Optional[SqlDialect] = None,
+        telemetry: Optional[QueryTelemetry] = None,
+    ):
+        """Initialize the class; dialect defaults to the one the pool's connections speak."""
+        self.connection_pool = connection_pool or get_default_connection_pool()
+        if dialect is None:
+            dialect = self.connection_pool.dialect
+        self.use_arrow = use_arrow
+        self.query_cache = query_cache
+        self.pivot_in_sql = pivot_in_sql
+        self.fetch_once = fetch_once
+        self.dtypes = dtypes
+        self.stream_batch_rows = stream_batch_rows
+        self.queries = TrainingViewQueryBuilder(dialect)
+        self.telemetry = telemetry or QueryTelemetry()
+        self._state_index: Optional[StateIndexedTable] = None
+        self._state_index_lock = threading.Lock()
 
-        # Create a cursor object
-        cur = conn.cursor()
+    def run_query(self, query, params: Optional[Any] = None):
+        """Run a query, serving it from the on-disk cache when one is configured."""
+        if self.query_cache is None:
+            return self.run_warehouse_query(query, params)
 
-        # Execute a query
-        cur.execute(query)
+        misses = []
 
-        # Fetch all results into a pandas DataFrame
-        df = pd.DataFrame(cur.fetchall(), columns=[desc[0] for desc in cur.description])
+        def load():
+            df, record = self._execute_and_fetch(query, params)
+            misses.append(record)
+            return df
 
-        # Close the cursor and connection
-        cur.close()
-        conn.close()
+        started = time.perf_counter()
+        df = self.query_cache.get_or_load(query, params, load)
+        if misses:
+            record = misses[0]
+            record.cache_hit = False
+        else:
+            # Reading the Parquet file stands in for the whole fetch
+            record = self.telemetry.start(query)
+            record.fetch_seconds = time.perf_counter() - started
+            record.rows, record.bytes = len(df), frame_nbytes(df)
+            record.cache_hit = True
+        self.telemetry.add(record)
+        return df
 
+    def run_warehouse_query(self, query, params: Optional[Any] = None):
+        """Run a query against the warehouse."""
+        df, record = self._execute_and_fetch(query, params)
+        self.telemetry.add(record)
         return df
 
+    def _execute_and_fetch(
+        self, query, params: Optional[Any] = None
+    ) -> Tuple[pd.DataFrame, QueryTelemetryRecord]:
+        """Run a query against the warehouse, timing each stage."""
+        record = self.telemetry.start(query)
+        started = time.perf_counter()
+
+        # Borrow a pooled connection instead of opening one per query
+        with self.connection_pool.connection() as conn:
+            record.connect_seconds, started = _lap(started)
+            cur = conn.cursor()
+            try:
+                if params is None:
+                    cur.execute(query)
+                else:
+                    cur.execute(query, params)
+                record.execute_seconds, started = _lap(started)
+
+                # Prefer columnar batches; fall back to row tuples for plain DB-API drivers
+                table = fetch_arrow_table(cur) if self.use_arrow else None
+                if table is not None:
+                    record.fetch_seconds, started = _lap(started)
+                    df = arrow_table_to_frame(table)
+                else:
+                    rows = cur.fetchall()
+                    record.fetch_seconds, started = _lap(started)
+                    df = pd.DataFrame(
+                        rows, columns=[desc[0] for desc in cur.description]
+                    )
+                record.frame_seconds, started = _lap(started)
+            finally:
+                cur.close()
+
+        record.rows, record.bytes = len(df), frame_nbytes(df)
+        return df, record
+
+    @property
+    def streaming(self) -> bool:
+        """Whether large pulls are consumed batch by batch.
+
+        The on-disk cache stores whole results, so it takes precedence.
+        """
+        return self.stream_batch_rows is not None and self.query_cache is None
+
+    def stream_query(
+        self,
+        query,
+        builder,
+        params: Optional[Any] = None,
+        batch_rows: Optional[int] = None,
+    ):
+        """Run a query, feeding its result to an incremental builder batch by batch."""
+        record = self.telemetry.start(query)
+        record.streamed = True
+        started = time.perf_counter()
+        with self.connection_pool.connection() as conn:
+            record.connect_seconds, started = _lap(started)
+            cur = conn.cursor()
+            try:
+                if params is None:
+                    cur.execute(query)
+                else:
+                    cur.execute(query, params)
+                record.execute_seconds, started = _lap(started)
+                batches = iter_frame_batches(
+                    cur,
+                    batch_rows or self.stream_batch_rows or DEFAULT_BATCH_ROWS,
+                    use_arrow=self.use_arrow,
+                )
+                for batch in batches:
+                    fetch_seconds, started = _lap(started)
+                    record.fetch_seconds += fetch_seconds
+                    record.rows += len(batch)
+                    record.bytes += frame_nbytes(batch)
+                    builder.add_batch(self.standardize_data_types(batch))
+                    frame_seconds, started = _lap(started)
+                    record.frame_seconds += frame_seconds
+                fetch_seconds, started = _lap(started)
+                record.fetch_seconds += fetch_seconds
+            finally:
+                cur.close()
+        result = builder.finish()
+        record.frame_seconds += _lap(started)[0]
+        self.telemetry.add(record)
+        return result
+
     def standardize_data_types(self, df: pd.DataFrame) -> pd.DataFrame:
         """Standardize the data types."""
-        for col in df.columns:
-            if col not in ["YEAR", "STATE_NAME"]:
-                df[col] = df[col].astype(float)
-        return df
+        return apply_dtypes(df, self.dtypes)
 
     def get_database_averaged_across_state(
         self, retrival_parameters: RetrivalParameters
@@ -56,52 +226,128 @@ class RawDataLoader:
         """Get the database averaged across the state."""
         del retrival_parameters
         # retrival paramters are just passed in so that template works
-        query = "select * from POP_PREDICTION.DEV.pop_prediction_training_avg_across_state order by year"
-        raw_data = self.run_query(query)
+        if self.fetch_once:
+            # Same joins as the training view, so average the rows already fetched
+            raw_data = average_across_states(self.get_state_index().table)
+            return self.standardize_data_types(raw_data)
+        raw_data = self.run_query(*self.queries.averaged_across_states())
         raw_data = self.standardize_data_types(raw_data)
         return raw_data
 
+    def get_wide_pivot_query(self, states: Optional[List[str]]) -> BoundQuery:
+        """Build a query that returns the training view already pivoted to wide format."""
+        if states is None:
+            states = self.run_query(*self.queries.distinct_states()).STATE_NAME.tolist()
+        columns = self.run_query(*self.queries.columns()).columns
+        features = [col for col in columns if col not in IDENTIFIER_COLUMNS]
+        return build_pivot_query(
+            self.queries.training_view, states, features, self.queries.dialect
+        )
+
+    def get_state_index(self) -> StateIndexedTable:
+        """Fetch the whole training view once and index it by state."""
+        with self._state_index_lock:
+            if self._state_index is None:
+                query = self.queries.full_table()
+                if self.streaming:
+                    df = self.stream_query(query.sql, LongFrameBuilder(), query.params)
+                else:
+                    df = self.run_query(*query)
+                self._state_index = StateIndexedTable(
+                    self.standardize_data_types(df),
+                    dtype=measure_dtype(self.dtypes),
+                )
+            return self._state_index
+
+    def refresh_state_index(self):
+        """Drop the fetched training view so the next request reads it again."""
+        with self._state_index_lock:
+            self._state_index = None
+
+    def get_full_database_from_state_index(self, subset_options: RetrivalParameters):
+        """Answer a full_database request by slicing the once-fetched training view."""
+        state_index = self.get_state_index()
+        if subset_options.specific_states:
+            states = list(subset_options.specific_states)
+        elif subset_options.random_sample_n_states:
+            states = state_index.sample_states(subset_options.random_sample_n_states)
+        else:
+            return state_index.wide_frame()
+        if len(states) == 1:
+            return state_index.long_rows(states)
+        return state_index.wide_frame(states)
+
     def get_full_database(self, subset_options: RetrivalParameters):
         """Get the full database."""
+        if self.fetch_once and not self.pivot_in_sql:
+            return self.get_full_database_from_state_index(subset_options)
+
+        states = None
         if subset_options.specific_states:
-            query = f"select * from POP_PREDICTION.DEV.POP_PREDICTION_TRAINING where state_name in {tuple(subset_options.specific_states)} order by year, state_name"
+            states = list(subset_options.specific_states)
         elif subset_options.random_sample_n_states:
             # query to get full list of all available states
-            query = "select distinct state_name from POP_PREDICTION.DEV.POP_PREDICTION_TRAINING"
-            df = self.run_query(query)
+            df = self.run_query(*self.queries.distinct_states())
             # get random sample of n states
             states = df.sample(
                 n=subset_options.random_sample_n_states
             ).STATE_NAME.tolist()
-            if len(states) == 1:
-                query = f"select * from POP_PREDICTION.DEV.POP_PREDICTION_TRAINING where state_name = '{states[0]}' order by year, state_name"
-            else:
-                query = f"select * from POP_PREDICTION.DEV.POP_PREDICTION_TRAINING where state_name in {tuple(states)} order by year, state_name"
+        # One statement for any number of states, with the list bound as a value
+        if states is None:
+            query = self.queries.full_table()
         else:
-            query = "select * from POP_PREDICTION.DEV.POP_PREDICTION_TRAINING order by year, state_name "
-
-        df = self.run_query(query)
+            query = self.queries.states_subset(states)
 
-        if (
+        single_state = (
             subset_options.random_sample_n_states is not None
             and subset_options.random_sample_n_states == 1
         ) or (
             subset_options.specific_states is not None
             and len(subset_options.specific_states) == 1
-        ):
+        )
+
+        if self.pivot_in_sql and not single_state:
+            df_final = self.run_query(*self.get_wide_pivot_query(states))
+            return self.standardize_data_types(df_final)
+
+        if self.streaming:
+            if single_state:
+                df = self.stream_query(query.sql, LongFrameBuilder(), query.params)
+                return self.standardize_data_types(df)
+            # The long rows are dropped batch by batch as they are scattered
+            builder = IncrementalWideBuilder(dtype=measure_dtype(self.dtypes))
+            return self.stream_query(query.sql, builder, query.params).to_frame()
+
+        df = self.run_query(*query)
+
+        if single_state:
             df_final = self.standardize_data_types(df)
             return df_final
 
-        df_pivoted = df.pivot(
-            index="YEAR",
-            columns="STATE_NAME",
-            values=[el for el in df.columns if el not in ("STATE_NAME", "YEAR")],
-        )
-        df_pivoted.columns = [f"{state}/{col}" for col, state in df_pivoted.columns]
-        df_final = df_pivoted.reset_index(drop=False)
-        df_final = self.standardize_data_types(df_final)
+        # Scatter straight into one float matrix instead of pivoting each column
+        df = self.standardize_data_types(df)
+        df_final = long_to_wide(
+            df, index="YEAR", columns="STATE_NAME", dtype=measure_dtype(self.dtypes)
+        ).to_frame()
         return df_final
 
+    def export_partitioned_store(
+        self, root: str, batch_rows: Optional[int] = None
+    ) -> PartitionedParquetStore:
+        """Stream the training view to disk partitioned by geography.
+
+        Only one fetched batch is held in memory at a time, whatever the row count.
+        An existing store at root is replaced once the new one is complete; any
+        other non-empty directory there is refused.
+        """
+        store = PartitionedParquetStore(root)
+        with store.staged_replacement() as staging:
+            query = self.queries.full_table()
+            self.stream_query(
+                query.sql, PartitionWriter(staging), query.params, batch_rows=batch_rows
+            )
+        return store
+
     def function_forwarder(
         self,
         chosen_function: AvailableDataRetrivalOperations,
@@ -0,0 +1,79 @@
+"""The full training table fetched once and indexed by state for in-memory subsetting."""
+
+import threading
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.wide_format import (
+    WideMatrix,
+    long_to_wide,
+)
+
+
+class StateIndexedTable:
+    """Long training table sorted by state, with the row range each state occupies."""
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        index: str = "YEAR",
+        columns: str = "STATE_NAME",
+        dtype=np.float64,
+    ):
+        """Initialize the class."""
+        self.index = index
+        self.columns = columns
+        self.dtype = dtype
+        order = np.lexsort((df[index].to_numpy(), df[columns].to_numpy()))
+        self.table = df.take(order).reset_index(drop=True)
+        state_codes, states = pd.factorize(self.table[columns], sort=True)
+        self.states = pd.Index(states, name=columns)
+        # state i lives in rows offsets[i]:offsets[i + 1]
+        self.offsets = np.searchsorted(state_codes, np.arange(len(states) + 1))
+        self._wide: Optional[WideMatrix] = None
+        self._lock = threading.Lock()
+
+    @property
+    def wide(self) -> WideMatrix:
+        """Wide matrix of every state, built the first time it is needed."""
+        with self._lock:
+            if self._wide is None:
+                self._wide = long_to_wide(
+                    self.table, index=self.index, columns=self.columns, dtype=self.dtype
+                )
+        return self._wide
+
+    def _state_positions(self, states: Sequence[str]) -> np.ndarray:
+        """Positions of the requested states, raising on any the table does not have."""
+        positions = self.states.get_indexer(list(states))
+        if (positions < 0).any():
+            missing = [state for state, pos in zip(states, positions) if pos < 0]
+            raise ValueError(f"Unknown states: {missing}")
+        return np.unique(positions)
+
+    def long_rows(self, states: Sequence[str]) -> pd.DataFrame:
+        """Long rows for the given states, ordered by year then state like the SQL query."""
+        positions = self._state_positions(states)
+        rows = np.concatenate(
+            [np.arange(self.offsets[pos], self.offsets[pos + 1]) for pos in positions]
+        )
+        subset = self.table.take(rows)
+        order = np.lexsort(
+            (subset[self.columns].to_numpy(), subset[self.index].to_numpy())
+        )
+        subset = subset.take(order).reset_index(drop=True)
+        if isinstance(subset[self.columns].dtype, pd.CategoricalDtype):
+            subset[self.columns] = subset[self.columns].cat.remove_unused_categories()
+        return subset
+
+    def wide_frame(self, states: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Wide frame for the given states, or for every state when none are given."""
+        if states is None:
+            return self.wide.to_frame()
+        return self.wide.select_states(states).to_frame()
+
+    def sample_states(self, n: int) -> List[str]:
+        """Draw n distinct states at random."""
+        return pd.Series(self.states).sample(n=n).tolist()
@@ -0,0 +1,68 @@
+"""Fetching query results in fixed-size batches and assembling them incrementally."""
+
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.arrow_fetch import (
+    arrow_table_to_frame,
+)
+
+DEFAULT_BATCH_ROWS = 100_000
+
+
+def iter_frame_batches(
+    cursor, batch_rows: int = DEFAULT_BATCH_ROWS, use_arrow: bool = True
+) -> Iterator[pd.DataFrame]:
+    """Yield an executed cursor's result as typed frames of at most batch_rows rows.
+
+    Snowflake streams its own result chunks, whose size the server decides.
+    """
+    if use_arrow and hasattr(cursor, "fetch_arrow_batches"):
+        for table in cursor.fetch_arrow_batches():
+            yield arrow_table_to_frame(table)
+        return
+    if use_arrow and hasattr(cursor, "fetch_record_batch"):
+        for batch in cursor.fetch_record_batch(batch_rows):
+            yield arrow_table_to_frame(pa.Table.from_batches([batch]))
+        return
+    columns = [desc[0] for desc in cursor.description]
+    while True:
+        rows = cursor.fetchmany(batch_rows)
+        if not rows:
+            return
+        yield pd.DataFrame(rows, columns=columns)
+
+
+class LongFrameBuilder:
+    """Collects batches column by column and concatenates them once at the end."""
+
+    def __init__(self, columns: Optional[List[str]] = None):
+        """Initialize the class."""
+        self.columns = columns
+        self._chunks: Dict[str, list] = {}
+        self._dtypes: Dict[str, object] = {}
+
+    def add_batch(self, df: pd.DataFrame):
+        """Keep a batch's column arrays, dropping the frame around them."""
+        if self.columns is None:
+            self.columns = list(df.columns)
+        for col in self.columns:
+            self._chunks.setdefault(col, []).append(df[col].to_numpy())
+            dtype = df[col].dtype
+            # Each batch infers its own categories, so rebuild them from all values
+            if isinstance(dtype, pd.CategoricalDtype):
+                dtype = "category"
+            self._dtypes.setdefault(col, dtype)
+
+    def finish(self) -> pd.DataFrame:
+        """Concatenate each column, releasing its chunks before moving on."""
+        data = {}
+        for col in self.columns or []:
+            chunks = self._chunks.pop(col, [])
+            values = np.concatenate(chunks) if chunks else np.array([])
+            del chunks
+            data[col] = pd.Series(values, dtype=self._dtypes.get(col), copy=False)
+        return pd.DataFrame(data, copy=False)
@@ -0,0 +1,263 @@
+"""Long-to-wide reshaping of the training table into one (year x state/feature) matrix."""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
+    SqlDialect,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.query_builder import (
+    STATE_LIST_PREDICATES,
+    BoundQuery,
+    bind_state_list,
+)
+
+
+class WideMatrix:
+    """Wide training data kept as one float array with a structured column index."""
+
+    def __init__(
+        self,
+        years: pd.Index,
+        column_index: pd.MultiIndex,
+        values: np.ndarray,
+        index_name: str = "YEAR",
+        observed: Optional[np.ndarray] = None,
+    ):
+        """Initialize the class."""
+        self.years = years
+        self.column_index = column_index
+        self.values = values
+        self.index_name = index_name
+        # (year x state) mask of which rows existed in the long table
+        self.observed = observed
+
+    @property
+    def flat_column_names(self) -> pd.Index:
+        """Column names in the `state/feature` form used downstream."""
+        states = self.column_index.get_level_values("STATE_NAME").astype(str)
+        features = self.column_index.get_level_values("FEATURE").astype(str)
+        return states + "/" + features
+
+    @property
+    def states(self) -> pd.Index:
+        """States in column order."""
+        return self.column_index.get_level_values("STATE_NAME").unique()
+
+    def select_states(self, states: Sequence[str]) -> "WideMatrix":
+        """Slice out a subset of states, as if the pivot had only seen their rows."""
+        all_states = self.states
+        state_positions = all_states.get_indexer(list(states))
+        if (state_positions < 0).any():
+            missing = [s for s, p in zip(states, state_positions) if p < 0]
+            raise ValueError(f"Unknown states: {missing}")
+        state_positions = np.sort(np.unique(state_positions))
+        n_states = len(all_states)
+        n_features = self.values.shape[1] // n_states
+        columns = (
+            np.arange(n_features)[:, None] * n_states + state_positions[None, :]
+        ).ravel()
+        rows = np.arange(len(self.years))
+        observed = None
+        if self.observed is not None:
+            observed = self.observed[:, state_positions]
+            rows = np.flatnonzero(observed.any(axis=1))
+            observed = observed[rows]
+        return WideMatrix(
+            years=self.years[rows],
+            column_index=self.column_index[columns],
+            values=self.values[np.ix_(rows, columns)],
+            index_name=self.index_name,
+            observed=observed,
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """Flatten into the frame layout produced by the original pivot."""
+        frame = pd.DataFrame(self.values, columns=self.flat_column_names, copy=False)
+        frame.insert(0, self.index_name, np.asarray(self.years))
+        return frame
+
+
+def long_to_wide(
+    df: pd.DataFrame,
+    index: str = "YEAR",
+    columns: str = "STATE_NAME",
+    values: Optional[Sequence[str]] = None,
+    dtype=np.float64,
+) -> WideMatrix:
+    """Scatter a long (year, state, features...) table into a preallocated wide array.
+
+    Columns are ordered feature-major with states sorted, matching
+    `df.pivot(index, columns, values)`.
+    """
+    if values is None:
+        values = [col for col in df.columns if col not in (index, columns)]
+    values = list(values)
+    row_codes, row_labels = pd.factorize(df[index], sort=True)
+    state_codes, states = pd.factorize(df[columns], sort=True)
+    keep = (row_codes >= 0) & (state_codes >= 0)
+    row_codes, state_codes = row_codes[keep], state_codes[keep]
+
+    n_states = len(states)
+    cell_codes = row_codes * n_states + state_codes
+    if len(np.unique(cell_codes)) != len(cell_codes):
+        raise ValueError("Index contains duplicate entries, cannot reshape")
+
+    wide = np.full((len(row_labels), len(values) * n_states), np.nan, dtype=dtype)
+    block = df[values].to_numpy(dtype=dtype)[keep]
+    target_columns = np.arange(len(values))[None, :] * n_states + state_codes[:, None]
+    wide[row_codes[:, None], target_columns] = block
+    observed = np.zeros((len(row_labels), n_states), dtype=bool)
+    observed[row_codes, state_codes] = True
+
+    column_index = pd.MultiIndex.from_product(
+        [values, states], names=["FEATURE", "STATE_NAME"]
+    ).swaplevel()
+    return WideMatrix(
+        years=pd.Index(row_labels, name=index),
+        column_index=column_index,
+        values=wide,
+        index_name=index,
+        observed=observed,
+    )
+
+
+def _quote_literal(value: str) -> str:
+    """Quote a string literal for SQL."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def build_pivot_query(
+    source: str,
+    states: Sequence[str],
+    features: Sequence[str],
+    dialect: SqlDialect = SqlDialect.snowflake,
+    index: str = "YEAR",
+) -> BoundQuery:
+    """Push the long-to-wide pivot into SQL with one conditional aggregate per cell column.
+
+    The state filter is bound as one array value, as in TrainingViewQueryBuilder.
+    The state names still appear in the aggregates, since they become column
+    aliases, so the statement text is only reused for the same set of states.
+    """
+    sorted_states: List[str] = sorted(states)
+    aggregates = ",\n    ".join(
+        f"max(case when STATE_NAME = {_quote_literal(state)} then {feature} end) "
+        f'as "{state}/{feature}"'
+        for feature in features
+        for state in sorted_states
+    )
+    return BoundQuery(
+        f"select {index},\n    {aggregates}\n"
+        f"from {source}\n"
+        f"where {STATE_LIST_PREDICATES[dialect]}\n"
+        f"group by {index}\n"
+        f"order by {index}",
+        [bind_state_list(dialect, sorted_states)],
+    )
+
+
+class IncrementalWideBuilder:
+    """Builds a WideMatrix from long batches without keeping the long table around."""
+
+    def __init__(
+        self,
+        index: str = "YEAR",
+        columns: str = "STATE_NAME",
+        values: Optional[Sequence[str]] = None,
+        dtype=np.float64,
+    ):
+        """Initialize the class."""
+        self.index = index
+        self.columns = columns
+        self.values = list(values) if values is not None else None
+        self.dtype = dtype
+        self._row_positions: Dict[object, int] = {}
+        self._state_positions: Dict[object, int] = {}
+        self._row_dtype = None
+        # (row, state, feature) cells, grown by doubling as new labels appear
+        self._cube: Optional[np.ndarray] = None
+        self._observed: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _positions(labels: pd.Series, known: Dict[object, int]) -> np.ndarray:
+        """Map a batch's labels to stable positions, registering unseen labels."""
+        codes, uniques = pd.factorize(labels)
+        lookup = np.empty(len(uniques), dtype=np.intp)
+        for code, label in enumerate(uniques):
+            lookup[code] = known.setdefault(label, len(known))
+        positions = np.full(len(codes), -1, dtype=np.intp)
+        positions[codes >= 0] = lookup[codes[codes >= 0]]
+        return positions
+
+    def _ensure_capacity(self, n_rows: int, n_states: int, n_features: int):
+        """Grow the cell cube so it can hold n_rows x n_states."""
+        if self._cube is None:
+            self._cube = np.full((n_rows, n_states, n_features), np.nan, self.dtype)
+            self._observed = np.zeros((n_rows, n_states), dtype=bool)
+            return
+        rows, states, _ = self._cube.shape
+        if n_rows <= rows and n_states <= states:
+            return
+        new_rows = max(n_rows, 2 * rows) if n_rows > rows else rows
+        new_states = max(n_states, 2 * states) if n_states > states else states
+        cube = np.full((new_rows, new_states, n_features), np.nan, self.dtype)
+        cube[:rows, :states] = self._cube
+        observed = np.zeros((new_rows, new_states), dtype=bool)
+        observed[:rows, :states] = self._observed
+        self._cube, self._observed = cube, observed
+
+    def add_batch(self, df: pd.DataFrame):
+        """Scatter one batch of long rows into the cube."""
+        if self.values is None:
+            self.values = [
+                col for col in df.columns if col not in (self.index, self.columns)
+            ]
+            self._row_dtype = df[self.index].dtype
+        row_positions = self._positions(df[self.index], self._row_positions)
+        state_positions = self._positions(df[self.columns], self._state_positions)
+        keep = (row_positions >= 0) & (state_positions >= 0)
+        row_positions, state_positions = row_positions[keep], state_positions[keep]
+        self._ensure_capacity(
+            len(self._row_positions), len(self._state_positions), len(self.values)
+        )
+        cells = row_positions * self._observed.shape[1] + state_positions
+        if (
+            len(np.unique(cells)) != len(cells)
+            or self._observed[row_positions, state_positions].any()
+        ):
+            raise ValueError("Index contains duplicate entries, cannot reshape")
+        self._cube[row_positions, state_positions] = df[self.values].to_numpy(
+            dtype=self.dtype
+        )[keep]
+        self._observed[row_positions, state_positions] = True
+
+    def finish(self) -> WideMatrix:
+        """Sort the collected rows and states into the layout long_to_wide produces."""
+        values = self.values or []
+        row_labels = pd.Index(list(self._row_positions), dtype=self._row_dtype)
+        states = pd.Index(list(self._state_positions))
+        row_order = row_labels.argsort()
+        state_order = states.argsort()
+        if self._cube is None:
+            wide = np.empty((0, 0), dtype=self.dtype)
+            observed = np.zeros((0, 0), dtype=bool)
+        else:
+            # One gather straight into (row, feature, state) order
+            wide = self._cube.transpose(0, 2, 1)[
+                np.ix_(row_order, np.arange(len(values)), state_order)
+            ].reshape(len(row_order), len(values) * len(state_order))
+            observed = self._observed[np.ix_(row_order, state_order)]
+        self._cube = self._observed = None
+        column_index = pd.MultiIndex.from_product(
+            [values, states[state_order]], names=["FEATURE", "STATE_NAME"]
+        ).swaplevel()
+        return WideMatrix(
+            years=pd.Index(row_labels[row_order], name=self.index),
+            column_index=column_index,
+            values=wide,
+            index_name=self.index,
+            observed=observed,
+        )
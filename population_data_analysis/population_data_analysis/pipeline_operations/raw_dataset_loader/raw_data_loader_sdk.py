@@ -1,32 +1,108 @@
 """Data loader sdk."""
 
-from cachetools import LRUCache, cached
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional, Tuple
 
 from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
     AvailableDataRetrivalOperations,
+    QueryCacheSettings,
+    RawDataBackend,
+    RawDataBackendSettings,
     RetrivalParameters,
 )
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.connection_pool import (
+    ConnectionPool,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.frame_cache import (
+    SingleFlightFrameCache,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.query_cache import (
+    ParquetQueryCache,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.query_telemetry import (
+    QueryTelemetry,
+)
 from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.raw_data_loader import (
     RawDataLoader,
 )
 
-cache = LRUCache(maxsize=100)
-
 
 class RawDataLoaderSDK:
     """Data loader sdk."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        connection_pool: Optional[ConnectionPool] = None,
+        query_cache: Optional[ParquetQueryCache] = None,
+        frame_cache: Optional[SingleFlightFrameCache] = None,
+    ):
         """Initialize the class."""
-        self.data_loader = RawDataLoader()
+        backend_settings = RawDataBackendSettings()
+        if connection_pool is None:
+            if backend_settings.backend == RawDataBackend.local_seeds:
+                # Imported here so the Snowflake backend never needs duckdb
+                from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.local_seed_warehouse import (  # pylint: disable=import-outside-toplevel
+                    local_seed_connection_pool,
+                )
+
+                connection_pool = local_seed_connection_pool(
+                    dbt_project_dir=backend_settings.dbt_project_dir,
+                    database_path=backend_settings.local_database_path,
+                )
+        self.data_loader = RawDataLoader(
+            connection_pool=connection_pool,
+            query_cache=query_cache,
+            dtypes=backend_settings.dtypes,
+            telemetry=QueryTelemetry(
+                log_to_mlflow=backend_settings.log_telemetry_to_mlflow
+            ),
+        )
+        if query_cache is None:
+            # Attached after the loader, which answers the last-altered lookup
+            self.data_loader.query_cache = ParquetQueryCache.from_settings(
+                QueryCacheSettings(), run_query=self.data_loader.run_warehouse_query
+            )
+        self.frame_cache = frame_cache or SingleFlightFrameCache()
 
-    @cached(cache)
     def run(
         self,
         retrival_parameters: RetrivalParameters,
         operation: AvailableDataRetrivalOperations,
     ):
         """Run the data loader."""
+        return self.frame_cache.get_or_load(
+            (operation, retrival_parameters),
+            lambda: self.load(retrival_parameters, operation),
+        )
+
+    def prefetch(
+        self,
+        requests: Iterable[Tuple[AvailableDataRetrivalOperations, RetrivalParameters]],
+        max_workers: int = 4,
+    ):
+        """Warm the frame cache with every distinct (operation, parameters) pair.
+
+        Nothing is returned, so the frames stay subject to the cache's byte
+        bound and callers still read them through run().
+        """
+        distinct_requests = list(dict.fromkeys(requests))
+        if not distinct_requests:
+            return
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for _ in executor.map(
+                lambda request: self.frame_cache.warm(
+                    request, lambda: self.load(request[1], request[0])
+                ),
+                distinct_requests,
+            ):
+                pass
+
+    def load(
+        self,
+        retrival_parameters: RetrivalParameters,
+        operation: AvailableDataRetrivalOperations,
+    ):
+        """Load data without going through the in-process cache."""
         if operation == AvailableDataRetrivalOperations.averaged_across_states:
             return self.data_loader.get_database_averaged_across_state(
                 retrival_parameters
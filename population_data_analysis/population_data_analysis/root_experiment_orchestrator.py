@@ -1,5 +1,7 @@
 """Orchestrates all experiments."""
 
+import logging
+
 import mlflow
 from mlflow.tracking import MlflowClient
 
@@ -9,9 +11,14 @@ from population_data_analysis.generate_all_experiment_run_configs import (
 from population_data_analysis.pipeline_operations.experiments_pipeline_sdk import (
     ExperimentsSDK,
 )
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
+    AvailableDataRetrivalOperations,
+)
 
 mlflow.set_tracking_uri(uri="http://127.0.0.1:8080")
 
+logger = logging.getLogger(__name__)
+
 
 class RootExperimentOrchestrator:
     """Orchestrates all experiments."""
@@ -32,7 +39,23 @@ class RootExperimentOrchestrator:
             except Exception:  # pylint: disable=broad-except
                 pass
 
-    def run_full_sweep(self, upsert_all_previous_runs=False):
+    def pending_runs(
+        self, experiment_name, experiment_configs, upsert_all_previous_runs
+    ):
+        """Name each config's run and keep those not yet run, with any earlier runs."""
+        pending_runs = []
+        for experiment_config in experiment_configs:
+
+            run_name = experiment_name + experiment_config.dump_to_name()
+
+            filter_string = f"tags.mlflow.runName = '{run_name}'"
+            runs = mlflow.search_runs(filter_string=filter_string)
+
+            if runs.empty or upsert_all_previous_runs:
+                pending_runs.append((run_name, experiment_config, runs))
+        return pending_runs
+
+    def run_full_sweep(self, upsert_all_previous_runs=False, prefetch_workers=4):
         """Run all experiments."""
         all_experiment_configs = self.model_seep_generator.generate_basic_var_sweep()
 
@@ -40,25 +63,100 @@ class RootExperimentOrchestrator:
 
         mlflow.set_experiment(all_experiment_configs.experiment_name)
 
-        for experiment_config in all_experiment_configs.experiment_run_configs:
-
-            run_name = (
-                all_experiment_configs.experiment_name
-                + experiment_config.dump_to_name()
+        telemetry = self.experiment_sdk.raw_data_loader_sdk.data_loader.telemetry
+        telemetry.clear()
+
+        pending_runs = self.pending_runs(
+            all_experiment_configs.experiment_name,
+            all_experiment_configs.experiment_run_configs,
+            upsert_all_previous_runs,
+        )
+
+        # Warm the frame cache with every distinct dataset up front so fitting
+        # never waits on the warehouse. Configs the pre-screen rules out fail
+        # their run without needing data.
+        feasibility_sdk = self.experiment_sdk.feasibility_sdk
+        self.experiment_sdk.prefetch_raw_data(
+            [
+                experiment_config
+                for _, experiment_config, _ in pending_runs
+                if feasibility_sdk.config_report(experiment_config).passed
+            ],
+            max_workers=prefetch_workers,
+        )
+
+        for run_name, experiment_config, runs in pending_runs:
+            if not runs.empty:
+                for run_id in runs.run_id:
+                    self.ml_flow_client.delete_run(run_id)
+            with mlflow.start_run(run_name=run_name):
+                mlflow.set_tag("mlflow.runName", run_name)
+                self.experiment_sdk.run_experiment(experiment_config)
+
+        # The loads ran in the prefetch, before any run was active
+        if telemetry.log_to_mlflow:
+            io_run_name = all_experiment_configs.experiment_name + "_raw_data_io"
+            # One I/O run per experiment, replaced by each sweep like the model runs
+            earlier_runs = mlflow.search_runs(
+                filter_string=f"tags.mlflow.runName = '{io_run_name}'"
             )
-
-            filter_string = f"tags.mlflow.runName = '{run_name}'"
-            runs = mlflow.search_runs(filter_string=filter_string)
-
-            if runs.empty or upsert_all_previous_runs:
-                if not runs.empty:
-                    for run_id in runs.run_id:
-                        self.ml_flow_client.delete_run(run_id)
-                with mlflow.start_run(run_name=run_name):
-                    mlflow.set_tag("mlflow.runName", run_name)
-                    self.experiment_sdk.run_experiment(experiment_config)
+            if not earlier_runs.empty:
+                for run_id in earlier_runs.run_id:
+                    self.ml_flow_client.delete_run(run_id)
+            with mlflow.start_run(run_name=io_run_name):
+                mlflow.set_tag("mlflow.runName", io_run_name)
+                telemetry.log_to_active_run()
+
+        summary = telemetry.summary()
+        logger.info(
+            "Raw data I/O for %s: %s",
+            all_experiment_configs.experiment_name,
+            summary.describe(),
+        )
+        return summary
+
+    def run_per_geography_sweep(
+        self, store_root, upsert_all_previous_runs=False, max_workers=None
+    ):
+        """Fit one model per geography for every full-database config of the sweep.
+
+        The training view is exported to a store partitioned by geography at
+        store_root first, replacing an earlier export there.
+        """
+        all_experiment_configs = self.model_seep_generator.generate_basic_var_sweep()
+        experiment_name = all_experiment_configs.experiment_name + "_per_geography"
+
+        self.restore_experiment(experiment_name)
+
+        mlflow.set_experiment(experiment_name)
+
+        self.experiment_sdk.raw_data_loader_sdk.data_loader.export_partitioned_store(
+            store_root
+        )
+
+        pending_runs = self.pending_runs(
+            experiment_name,
+            [
+                experiment_config
+                for experiment_config in all_experiment_configs.experiment_run_configs
+                if experiment_config.raw_data_loader_operation_name
+                == AvailableDataRetrivalOperations.full_database
+            ],
+            upsert_all_previous_runs,
+        )
+
+        for run_name, experiment_config, runs in pending_runs:
+            if not runs.empty:
+                for run_id in runs.run_id:
+                    self.ml_flow_client.delete_run(run_id)
+            with mlflow.start_run(run_name=run_name):
+                mlflow.set_tag("mlflow.runName", run_name)
+                self.experiment_sdk.run_per_geography_experiment(
+                    experiment_config, store_root, max_workers=max_workers
+                )
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     orchestrator = RootExperimentOrchestrator()
     orchestrator.run_full_sweep(upsert_all_previous_runs=True)
@@ -0,0 +1,16 @@
+import pytest
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.local_seed_warehouse import (
+    local_seed_connection_pool,
+)
+
+
+@pytest.fixture(scope="session")
+def seed_pool(tmp_path_factory):
+    """Pool onto the dbt seeds and models, built once for the whole session."""
+    database_path = tmp_path_factory.mktemp("seed_warehouse") / "pop_local.duckdb"
+    pool = local_seed_connection_pool(database_path=str(database_path))
+    with pool.connection():
+        pass
+    yield pool
+    pool.close_all()
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.stattools import adfuller
+
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.batched_adf import (
+    adf_p_values_for_frame,
+    adf_statistics,
+    mackinnon_p_values,
+)
+
+
+def panel(seed, n_rows, n_columns):
+    """Mix of random walks, trending and stationary series."""
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(size=(n_rows, n_columns))
+    walks = noise.cumsum(axis=0)
+    trend = np.arange(n_rows)[:, None] * rng.uniform(0, 2, size=n_columns)
+    kind = np.arange(n_columns) % 3
+    return np.where(kind == 0, walks, np.where(kind == 1, trend + noise, noise))
+
+
+@pytest.mark.parametrize(
+    ("seed", "n_rows", "n_columns"), [(0, 20, 6), (1, 45, 9), (2, 120, 5)]
+)
+def test_batched_adf_matches_adfuller(seed, n_rows, n_columns):
+    """Statistic, chosen lag and p-value agree with adfuller column by column."""
+    values = panel(seed, n_rows, n_columns)
+    statistics, lags = adf_statistics(values)
+    p_values = mackinnon_p_values(statistics)
+    for col in range(n_columns):
+        expected = adfuller(values[:, col])
+        assert lags[col] == expected[2]
+        np.testing.assert_allclose(statistics[col], expected[0], rtol=1e-9)
+        np.testing.assert_allclose(p_values[col], expected[1], rtol=1e-9, atol=1e-12)
+
+
+def test_columns_with_gaps_are_tested_on_their_rows():
+    """A column with missing values gets adfuller's p-value for its non-null rows."""
+    df = pd.DataFrame(panel(3, 40, 4), columns=list("abcd"))
+    df.loc[:4, "c"] = np.nan
+    p_values = adf_p_values_for_frame(df)
+    for col in df.columns:
+        np.testing.assert_allclose(
+            p_values[col], adfuller(df[col].dropna())[1], rtol=1e-9, atol=1e-12
+        )
+
+
+def test_constant_column_is_rejected_like_adfuller():
+    """A constant column raises the same error adfuller does."""
+    values = panel(4, 30, 3)
+    values[:, 1] = 2.0
+    with pytest.raises(ValueError, match="constant"):
+        adfuller(values[:, 1])
+    with pytest.raises(ValueError, match="constant"):
+        adf_statistics(values)
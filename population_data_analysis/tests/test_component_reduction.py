@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from population_data_analysis.pipeline_operations.data_transformations.data_transformation_config_objects import (
+    DataTransformationOptions,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.component_reduction import (
+    principal_components,
+    randomized_svd,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_sdk import (
+    DataTransformationsSDK,
+)
+
+
+def low_rank_frame(seed=0, n_rows=40, n_columns=8, rank=3, noise=0.0):
+    """Frame whose columns mix a few latent series, plus optional noise."""
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(n_rows, rank)) @ rng.normal(size=(rank, n_columns))
+    values += noise * rng.normal(size=values.shape)
+    return pd.DataFrame(values, columns=[f"c{i}" for i in range(n_columns)])
+
+
+@pytest.mark.parametrize("fit_rows", [None, 30])
+def test_full_rank_components_reconstruct_every_row(fit_rows):
+    """With as many components as columns, expanding the scores gives back the frame."""
+    df = low_rank_frame(rank=8)
+    scores, reduction = principal_components(df, n_components=8, fit_rows=fit_rows)
+    np.testing.assert_allclose(reduction.expand(scores.to_numpy()), df.to_numpy())
+    np.testing.assert_allclose(
+        reduction.loadings @ reduction.loadings.T, np.eye(8), atol=1e-12
+    )
+
+
+def test_leading_components_capture_a_low_rank_frame():
+    """A rank-3 frame is reconstructed by 3 components, which explain all its variance."""
+    df = low_rank_frame(rank=3)
+    scores, reduction = principal_components(df, n_components=3)
+    np.testing.assert_allclose(
+        reduction.expand(scores.to_numpy()), df.to_numpy(), atol=1e-10
+    )
+    np.testing.assert_allclose(reduction.explained_variance_ratio.sum(), 1.0)
+
+
+def test_components_are_fitted_on_training_rows_only():
+    """Changing the rows after fit_rows changes their scores but not the components."""
+    df = low_rank_frame(noise=0.1)
+    changed = df.copy()
+    changed.iloc[30:] *= 10.0
+    scores, reduction = principal_components(df, n_components=3, fit_rows=30)
+    changed_scores, changed_reduction = principal_components(
+        changed, n_components=3, fit_rows=30
+    )
+    np.testing.assert_array_equal(reduction.loadings, changed_reduction.loadings)
+    np.testing.assert_array_equal(reduction.center, changed_reduction.center)
+    pd.testing.assert_frame_equal(scores.iloc[:30], changed_scores.iloc[:30])
+    np.testing.assert_allclose(reduction.center, df.iloc[:30].mean().to_numpy())
+
+
+def test_loading_signs_are_fixed():
+    """Each loading's largest entry is positive, whatever signs the SVD picked."""
+    _, reduction = principal_components(low_rank_frame(noise=0.1), n_components=3)
+    largest = reduction.loadings[
+        np.arange(3), np.abs(reduction.loadings).argmax(axis=1)
+    ]
+    assert (largest > 0).all()
+
+
+@pytest.mark.parametrize("n_components", [2, 5])
+def test_randomized_svd_matches_full_svd(n_components):
+    """The sketched SVD finds the leading singular values and subspace of the full one."""
+    values = low_rank_frame(n_rows=200, n_columns=60, rank=5, noise=1e-3).to_numpy()
+    u, s, vt = randomized_svd(values, n_components)
+    _, expected_s, expected_vt = np.linalg.svd(values, full_matrices=False)
+    np.testing.assert_allclose(s, expected_s[:n_components], rtol=1e-8)
+    np.testing.assert_allclose(
+        np.abs(vt @ expected_vt[:n_components].T), np.eye(n_components), atol=1e-6
+    )
+    np.testing.assert_allclose(u.T @ u, np.eye(n_components), atol=1e-12)
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_component_forecasts_score_in_the_unreduced_columns():
+    """Perfect component forecasts expand to the test rows of the pre-reduction columns."""
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(
+        rng.normal(size=(40, 4)).cumsum(axis=0) + 100.0,
+        columns=["Utah/A", "Utah/B", "Idaho/A", "Idaho/B"],
+    )
+    options = DataTransformationOptions(
+        jitter=0.0, dimensionality_reduction="pca", n_components=4
+    )
+    sdk = DataTransformationsSDK()
+    _, test_data = sdk.run(df, options)
+    actual, expanded = sdk.to_scoring_space(test_data, test_data)
+    assert list(test_data.columns) == [f"component_{i}" for i in range(1, 5)]
+    assert list(actual.columns) == list(df.columns)
+    np.testing.assert_allclose(expanded, actual.to_numpy(), atol=1e-10)
+    restored_actual, restored = sdk.to_scoring_space(
+        test_data, test_data, original_units=True
+    )
+    np.testing.assert_allclose(restored, restored_actual.to_numpy())
@@ -0,0 +1,146 @@
+import threading
+import time
+
+import pytest
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.connection_pool import (
+    ConnectionPool,
+)
+
+
+class FakeConnection:
+    """Connection that only records whether it was closed."""
+
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+
+    def is_closed(self):
+        """Report whether close was called."""
+        return self.closed
+
+    def close(self):
+        """Mark the connection closed."""
+        self.closed = True
+
+
+class FakeFactory:
+    """Connection factory numbering the connections it opens."""
+
+    def __init__(self, failures=0):
+        self.opened = []
+        self.failures = failures
+
+    def __call__(self):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("warehouse unavailable")
+        connection = FakeConnection(len(self.opened))
+        self.opened.append(connection)
+        return connection
+
+
+def test_released_connection_is_reused():
+    """A returned connection is handed out again instead of opening another."""
+    factory = FakeFactory()
+    pool = ConnectionPool(factory, max_size=2)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+    assert len(factory.opened) == 1
+    statistics = pool.statistics
+    assert (statistics.connections_opened, statistics.connections_reused) == (1, 1)
+    assert statistics.total_connect_seconds >= 0.0
+
+
+def test_acquire_times_out_when_the_pool_is_full():
+    """With max_size connections checked out, acquire gives up after acquire_timeout."""
+    pool = ConnectionPool(FakeFactory(), max_size=1, acquire_timeout=0.05)
+    connection = pool.acquire()
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+    assert time.monotonic() - started >= 0.05
+    pool.release(connection)
+    assert pool.acquire() is connection
+
+
+def test_full_pool_blocks_until_a_connection_is_released():
+    """A waiting caller gets the connection another caller returns."""
+    factory = FakeFactory()
+    pool = ConnectionPool(factory, max_size=1)
+    connection = pool.acquire()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    waiter.join(0.05)
+    assert waiter.is_alive()
+    pool.release(connection)
+    waiter.join(5)
+    assert acquired == [connection]
+    assert len(factory.opened) == 1
+
+
+def test_idle_connections_expire():
+    """A connection idle longer than max_idle_seconds is closed and replaced."""
+    factory = FakeFactory()
+    pool = ConnectionPool(factory, max_idle_seconds=0.01)
+    with pool.connection() as first:
+        pass
+    time.sleep(0.02)
+    with pool.connection() as second:
+        assert second is not first
+    assert first.closed
+    assert pool.statistics.connections_discarded == 1
+
+
+def test_unhealthy_connections_are_discarded():
+    """Failing the health check on acquire or release drops the connection."""
+    factory = FakeFactory()
+    pool = ConnectionPool(factory, max_size=1)
+    with pool.connection() as first:
+        pass
+    first.closed = True
+    with pool.connection() as second:
+        assert second is not first
+        second.closed = True
+    with pool.connection() as third:
+        assert third not in (first, second)
+    assert pool.statistics.connections_discarded == 2
+    assert pool.statistics.connections_opened == 3
+
+
+def test_connection_is_discarded_when_the_block_raises():
+    """A block that raises closes its connection instead of returning it."""
+    factory = FakeFactory()
+    pool = ConnectionPool(factory, max_size=1)
+    with pytest.raises(RuntimeError):
+        with pool.connection() as broken:
+            raise RuntimeError("statement failed")
+    assert broken.closed
+    with pool.connection() as connection:
+        assert connection is not broken
+    assert pool.statistics.connections_discarded == 1
+
+
+def test_failed_connect_frees_its_slot():
+    """A factory error does not use up one of the max_size slots."""
+    factory = FakeFactory(failures=1)
+    pool = ConnectionPool(factory, max_size=1, acquire_timeout=0.05)
+    with pytest.raises(ConnectionError):
+        pool.acquire()
+    assert pool.acquire() is factory.opened[0]
+    assert pool.statistics.connections_opened == 1
+
+
+def test_close_all_closes_idle_connections():
+    """Idle connections are closed; the next acquire opens a fresh one."""
+    factory = FakeFactory()
+    pool = ConnectionPool(factory, max_size=2)
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(first)
+    pool.release(second)
+    pool.close_all()
+    assert first.closed and second.closed
+    assert pool.acquire() is factory.opened[2]
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.correlation_pruning import (
+    correlated_column_mask,
+    correlated_mask_approximate,
+    correlated_mask_exact,
+)
+
+
+def correlated_panel(seed, n_rows=30, n_groups=12, group_size=4):
+    """Groups of near-copies of one series, some negated, plus a constant column."""
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(n_rows, n_groups))
+    noise_scale = rng.choice([1e-3, 0.05, 0.5], size=(n_groups, group_size))
+    columns = [
+        (1 - 2 * (member % 2)) * base[:, group]
+        + noise_scale[group, member] * rng.normal(size=n_rows)
+        for group in range(n_groups)
+        for member in range(group_size)
+    ]
+    values = np.column_stack(columns + [np.full(n_rows, 3.0)])
+    order = rng.permutation(values.shape[1])
+    return pd.DataFrame(values[:, order], columns=[f"c{i}" for i in order])
+
+
+def dense_mask(df, threshold):
+    """The dense correlation matrix check the pruning replaced."""
+    corr_matrix = df.corr().abs().to_numpy()
+    return (np.triu(corr_matrix, k=1) > threshold).any(axis=0)
+
+
+@pytest.mark.parametrize(
+    ("seed", "threshold", "block_size"),
+    [(0, 0.99, 1024), (1, 0.99, 7), (2, 0.9, 5), (3, 0.5, 16)],
+)
+def test_exact_mask_matches_dense_corr(seed, threshold, block_size):
+    """The blocked scan drops exactly the columns the dense matrix does."""
+    df = correlated_panel(seed)
+    expected = dense_mask(df, threshold)
+    assert expected.any() and not expected.all()
+    np.testing.assert_array_equal(
+        correlated_mask_exact(df.to_numpy(), threshold, block_size), expected
+    )
+    np.testing.assert_array_equal(correlated_column_mask(df, threshold), expected)
+
+
+def test_threshold_ties_are_settled_like_dense_corr():
+    """A pair exactly at the threshold is kept, as pandas rounds it."""
+    x = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+    df = pd.DataFrame({"a": x, "b": 2 * x + 1, "c": x[::-1]})
+    threshold = df.corr().abs().iloc[0, 1]
+    np.testing.assert_array_equal(
+        correlated_column_mask(df, threshold), dense_mask(df, threshold)
+    )
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_approximate_mask_never_drops_more_than_exact(seed):
+    """The hashed pre-filter only misses pairs, so it drops a subset of the exact mask."""
+    df = correlated_panel(seed)
+    exact = correlated_mask_exact(df.to_numpy(), 0.99)
+    approximate = correlated_mask_approximate(df.to_numpy(), 0.99)
+    assert not (approximate & ~exact).any()
+
+
+def test_columns_with_gaps_use_pairwise_complete_corr():
+    """Frames with missing values fall back to the dense pandas computation."""
+    df = correlated_panel(4)
+    df.iloc[:3, 5] = np.nan
+    np.testing.assert_array_equal(
+        correlated_column_mask(df, 0.99), dense_mask(df, 0.99)
+    )
@@ -0,0 +1,180 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from population_data_analysis.pipeline_operations.data_transformations.data_transformation_config_objects import (
+    DataTransformationOptions,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.data_normalization_logic import (
+    DataTransformer,
+    apply_difference,
+    apply_log,
+    drop_highly_correlated,
+    drop_near_constant,
+    standardize_series,
+)
+
+OPTION_CHOICES = {
+    "log": ["always", "never", "conditional"],
+    "difference": ["always", "never", "conditional"],
+    "z_normalize": ["always", "never"],
+    "drop_near_constant_columns": ["always", "never"],
+    "drop_correlated_columns": ["always", "never"],
+}
+# Jitter is left out so results can be compared
+OPTION_GRID = [
+    dict(zip(OPTION_CHOICES, choices), jitter=0.0)
+    for choices in itertools.product(*OPTION_CHOICES.values())
+]
+
+
+def wide_frame(seed=0, n_rows=40):
+    """Wide training frame with trending, skewed, signed, stepped and duplicated columns."""
+    rng = np.random.default_rng(seed)
+    years = np.arange(1980, 1980 + n_rows)
+    trend = 1e5 * np.exp(np.linspace(0, 1, n_rows)) + rng.normal(0, 100, n_rows)
+    return pd.DataFrame(
+        {
+            "YEAR": years,
+            "Utah/POPULATION": trend,
+            "Utah/BIRTHS": trend * 1.001 + rng.normal(0, 1, n_rows),
+            "Idaho/POPULATION": 5e4 + rng.normal(0, 50, n_rows).cumsum(),
+            "Idaho/BIRTHS": rng.lognormal(0, 1.5, n_rows),
+            "Idaho/MIGRATION": rng.normal(0, 10, n_rows),
+            "Idaho/STEPS": np.repeat([1.0, 2.0, 3.0, 4.0], n_rows // 4),
+        }
+    )
+
+
+def per_column_reference(df, options):
+    """The column-at-a-time normalization the stepwise transformer replaced."""
+    original_length = len(df)
+    if options.drop_near_constant_columns == "always":
+        df, _ = drop_near_constant(df, min_unique_ratio=0.5)
+    transformed_cols = {}
+    rules = {}
+    for col in df.columns:
+        if col in ["YEAR", "STATE_NAME"]:
+            continue
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        series = df[col].copy()
+        col_rules = {}
+        series, step_rules = apply_log(series, options.log)
+        col_rules.update(step_rules)
+        series, step_rules = apply_difference(series, options.difference)
+        col_rules.update(step_rules)
+        series, step_rules = standardize_series(series, options.z_normalize)
+        col_rules.update(step_rules)
+        if len(series) == original_length:
+            series = series[1:]
+        transformed_cols[col] = series
+        rules[col] = col_rules
+    transformed_df = pd.DataFrame(transformed_cols)
+    if options.drop_correlated_columns == "always":
+        transformed_df, dropped_corr = drop_highly_correlated(
+            transformed_df, options.correlation_threshold
+        )
+        for col_rules in rules.values():
+            col_rules["dropped_due_to_correlation"] = dropped_corr
+    return transformed_df, rules
+
+
+def assert_rules_match(rules, expected):
+    """Same columns and rule names, with numeric rules equal up to rounding."""
+    assert list(rules) == list(expected)
+    for col, col_rules in expected.items():
+        assert set(rules[col]) == set(col_rules)
+        for name, value in col_rules.items():
+            if isinstance(value, (list, bool)) or value is None:
+                assert rules[col][name] == value
+            else:
+                np.testing.assert_allclose(rules[col][name], value, rtol=1e-12)
+
+
+def assert_matches_reference(transformer, df, options):
+    """normalize_data gives the per-column reference's frame and rules."""
+    expected, expected_rules = per_column_reference(df, options)
+    result = transformer.normalize_data(df, options)
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-12, atol=1e-12)
+    assert_rules_match(
+        transformer.restorative_values["operation_rules"], expected_rules
+    )
+    assert transformer.restorative_values["remaining_columns"] == list(expected.columns)
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("options", OPTION_GRID)
+def test_stepwise_normalize_matches_per_column_reference(options):
+    """The matrix steps reproduce the column-at-a-time transformation."""
+    assert_matches_reference(
+        DataTransformer(), wide_frame(), DataTransformationOptions(**options)
+    )
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("memo_max_bytes", [0, 20_000, 256 * 1024**2])
+def test_memoized_steps_are_reused_within_the_byte_bound(memo_max_bytes):
+    """One transformer across the grid reuses shared steps and never exceeds its bound."""
+    transformer = DataTransformer(memo_max_bytes=memo_max_bytes)
+    df = wide_frame()
+    for options in OPTION_GRID:
+        assert_matches_reference(transformer, df, DataTransformationOptions(**options))
+        assert transformer.memo.current_bytes <= memo_max_bytes
+    if memo_max_bytes == 0:
+        assert transformer.memo.current_bytes == 0
+    elif memo_max_bytes < 256 * 1024**2:
+        assert transformer.memo.evictions > 0
+    else:
+        assert transformer.memo.hits > transformer.memo.misses
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_memo_is_keyed_by_the_input_frame():
+    """A different frame with the same options is transformed afresh."""
+    transformer = DataTransformer()
+    options = DataTransformationOptions(jitter=0.0)
+    for seed in (0, 1, 0):
+        assert_matches_reference(transformer, wide_frame(seed), options)
+    assert transformer.memo.hits == 3
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("options", OPTION_GRID)
+def test_in_place_normalize_matches_per_column_reference(options):
+    """Transforming in one buffer gives the same frame and rules as the reference."""
+    assert_matches_reference(
+        DataTransformer(in_place=True),
+        wide_frame(),
+        DataTransformationOptions(**options),
+    )
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_in_place_result_is_a_view_of_one_buffer():
+    """The in-place result shares memory with a single buffer and memoizes nothing."""
+    transformer = DataTransformer(in_place=True)
+    result = transformer.normalize_data(
+        wide_frame(), DataTransformationOptions(jitter=0.0)
+    )
+    values = result.to_numpy()
+    assert values.base is not None
+    assert transformer.memo.misses == 0
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("column", ["Idaho/MIGRATION", "Utah/BIRTHS"])
+def test_in_place_falls_back_for_gaps_and_integer_columns(column):
+    """Frames the buffer cannot hold as floats without gaps take the stepwise path."""
+    df = wide_frame()
+    if column == "Idaho/MIGRATION":
+        df.loc[3, column] = np.nan
+    else:
+        df[column] = df[column].round().astype(np.int64)
+    options = DataTransformationOptions(jitter=0.0)
+    transformer = DataTransformer(in_place=True)
+    result = transformer.normalize_data(df, options)
+    pd.testing.assert_frame_equal(result, DataTransformer().normalize_data(df, options))
+    assert transformer.memo.misses > 0
@@ -0,0 +1,211 @@
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.api import VAR
+
+from population_data_analysis.pipeline_operations.data_transformations.data_transformation_config_objects import (
+    AvailableDataTransformationOperations,
+    DataTransformationOptions,
+)
+from population_data_analysis.pipeline_operations.evaluation.evaluation_config_objects import (
+    AvailableEvaluationOperations,
+    EvaluationConfig,
+)
+from population_data_analysis.pipeline_operations.experiments_pipeline_sdk import (
+    ExperimentRunConfig,
+)
+from population_data_analysis.pipeline_operations.feasibility.feasibility_config_objects import (
+    FeasibilityCheck,
+    FeasibilityOptions,
+)
+from population_data_analysis.pipeline_operations.feasibility.feasibility_modules.screens import (
+    InfeasibleConfigError,
+    allowed_max_lag,
+    fit_issues,
+    residual_degrees_of_freedom,
+    row_issues,
+    static_issues,
+    stationarity_issues,
+)
+from population_data_analysis.pipeline_operations.feasibility.feasibility_sdk import (
+    FeasibilitySDK,
+)
+from population_data_analysis.pipeline_operations.ml_models.ml_models_config_objects import (
+    AvailableMLOperations,
+    VARHyperparameters,
+    VARMAXHyperparameters,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
+    AvailableDataRetrivalOperations,
+    RetrivalParameters,
+)
+
+
+def run_config(
+    retrival_parameters=None,
+    train_test_split=0.8,
+    difference="always",
+    model=AvailableMLOperations.var,
+    p=1,
+    q=1,
+):
+    """Experiment config with the parts the screens look at filled in."""
+    model_config = (
+        VARHyperparameters(p=p)
+        if model == AvailableMLOperations.var
+        else VARMAXHyperparameters(p=p, q=q)
+    )
+    return ExperimentRunConfig(
+        raw_data_loader_operation_name=AvailableDataRetrivalOperations.full_database,
+        raw_data_loader_config=retrival_parameters or RetrivalParameters(),
+        data_transformation_operation_name=AvailableDataTransformationOperations.data_transformation,
+        data_transformation_config=DataTransformationOptions(
+            train_test_split=train_test_split, difference=difference
+        ),
+        ml_model_operation_name=model,
+        ml_model_config=model_config,
+        evaluation_operation_name=AvailableEvaluationOperations.evaluate_model,
+        evaluation_config=EvaluationConfig(),
+    )
+
+
+def compute_allowed_maxlags(n_obs, n_vars):
+    """VARModelAnalyzer.compute_allowed_maxlags from the experiments package."""
+    allowed = 0
+    for lag in range(1, n_obs):
+        if n_obs - lag > lag * n_vars + 1:
+            allowed = lag
+        else:
+            break
+    return allowed
+
+
+def checks(issues):
+    """The checks a list of issues raised."""
+    return [issue.check for issue in issues]
+
+
+@pytest.mark.parametrize(("n_obs", "n_vars", "p"), [(20, 2, 1), (30, 4, 3), (12, 2, 2)])
+def test_residual_degrees_of_freedom_match_var_fit(n_obs, n_vars, p):
+    """The count matches the residual degrees of freedom statsmodels' VAR reports."""
+    data = np.random.default_rng(0).normal(size=(n_obs, n_vars))
+    results = VAR(data).fit(p)
+    assert residual_degrees_of_freedom(n_obs, n_vars, p) == results.df_resid
+
+
+def test_allowed_max_lag_matches_compute_allowed_maxlags():
+    """The closed form agrees with the experiments package's search."""
+    for n_obs in range(1, 80):
+        for n_vars in range(1, 12):
+            assert allowed_max_lag(n_obs, n_vars) == compute_allowed_maxlags(
+                n_obs, n_vars
+            )
+            lag = allowed_max_lag(n_obs, n_vars)
+            if lag:
+                assert residual_degrees_of_freedom(n_obs, n_vars, lag) >= 1
+            assert residual_degrees_of_freedom(n_obs, n_vars, lag + 1) < 1
+
+
+def test_conflicting_state_selection_is_rejected():
+    """Giving both specific states and a random sample count is ruled out."""
+    config = run_config(
+        RetrivalParameters(specific_states=["Utah"], random_sample_n_states=3)
+    )
+    assert checks(static_issues(config)) == [
+        FeasibilityCheck.conflicting_state_selection
+    ]
+    with pytest.raises(InfeasibleConfigError):
+        FeasibilitySDK().check_config(config)
+    for retrival_parameters in (
+        RetrivalParameters(specific_states=["Utah"]),
+        RetrivalParameters(random_sample_n_states=3),
+    ):
+        assert static_issues(run_config(retrival_parameters)) == []
+
+
+@pytest.mark.parametrize("train_test_split", [0.0, 1.0, 1.5])
+def test_split_without_train_or_test_rows_is_rejected(train_test_split):
+    """A split fraction outside (0, 1) is ruled out before loading."""
+    config = run_config(train_test_split=train_test_split)
+    assert checks(static_issues(config)) == [FeasibilityCheck.empty_split]
+
+
+@pytest.mark.parametrize(("n_rows", "train_test_split"), [(2, 0.8), (5, 0.1), (5, 1.0)])
+def test_too_few_rows_for_a_split_are_rejected(n_rows, train_test_split):
+    """Rows that leave the train or test split empty are ruled out after loading."""
+    config = run_config(train_test_split=train_test_split)
+    assert checks(row_issues(config, n_rows, FeasibilityOptions())) == [
+        FeasibilityCheck.empty_split
+    ]
+
+
+def test_invalid_varmax_order_is_rejected():
+    """VARMAX with p = q = 0 has nothing to fit."""
+    config = run_config(model=AvailableMLOperations.varmax, p=0, q=0)
+    assert checks(static_issues(config)) == [FeasibilityCheck.invalid_model_order]
+
+
+@pytest.mark.parametrize(
+    ("n_rows", "p", "expected"),
+    [(10, 3, []), (9, 3, [FeasibilityCheck.too_few_rows_for_lags])],
+)
+def test_row_count_must_fit_the_lags_for_one_variable(n_rows, p, expected):
+    """Rows are rejected only when even a single-variable fit would fail."""
+    config = run_config(p=p, train_test_split=1 - 1e-9)
+    # 10 rows give 9 observations, all but one of them for training
+    assert checks(row_issues(config, n_rows, FeasibilityOptions())) == expected
+
+
+def test_fit_issues_name_the_largest_lag_allowed():
+    """A fit with too few degrees of freedom is rejected with the lag that would fit."""
+    train_data = pd.DataFrame(np.zeros((20, 4)))
+    issues = fit_issues(run_config(p=4), train_data, FeasibilityOptions())
+    assert checks(issues) == [FeasibilityCheck.too_few_rows_for_lags]
+    assert issues[0].detail.endswith("the largest lag they allow is 3")
+    assert fit_issues(run_config(p=3), train_data, FeasibilityOptions()) == []
+
+
+def panel(differenced, n_rows=40, n_columns=6):
+    """Random walks with drift, or their differences."""
+    rng = np.random.default_rng(0)
+    values = (rng.normal(size=(n_rows, n_columns)) + 0.5).cumsum(axis=0) + 100.0
+    if differenced:
+        values = np.diff(values, axis=0)
+    return pd.DataFrame(values, columns=[f"S{i}/POPULATION" for i in range(n_columns)])
+
+
+@pytest.mark.parametrize(
+    ("differenced", "difference", "expected"),
+    [
+        (False, "never", [FeasibilityCheck.non_stationary_without_differencing]),
+        (True, "never", []),
+        (False, "always", []),
+        (False, "conditional", []),
+    ],
+)
+def test_stationarity_screen_when_enabled(differenced, difference, expected):
+    """Trending panels are rejected when never differenced; stationary ones are not."""
+    options = FeasibilityOptions(check_stationarity=True)
+    transformation_options = DataTransformationOptions(
+        difference=difference, log="never"
+    )
+    issues = stationarity_issues(panel(differenced), transformation_options, options)
+    assert checks(issues) == expected
+
+
+def test_stationarity_screen_is_off_by_default():
+    """By default a trending panel left undifferenced still goes ahead."""
+    config = run_config(difference="never")
+    FeasibilitySDK().check_data(config, panel(differenced=False))
+
+
+def test_disabled_screen_passes_everything():
+    """With the screen off, even impossible configs go ahead."""
+    sdk = FeasibilitySDK(FeasibilityOptions(enabled=False))
+    config = run_config(
+        RetrivalParameters(specific_states=["Utah"], random_sample_n_states=3),
+        train_test_split=0.0,
+    )
+    sdk.check_config(config)
+    sdk.check_data(config, panel(differenced=False).iloc[:2])
+    sdk.check_training_data(config, pd.DataFrame(np.zeros((2, 4))))
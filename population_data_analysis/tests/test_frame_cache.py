@@ -0,0 +1,93 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.frame_cache import (
+    SingleFlightFrameCache,
+    frame_nbytes,
+)
+
+
+def frame(n_rows=100):
+    """Small float frame of a known size."""
+    return pd.DataFrame({"a": np.arange(n_rows, dtype=float)})
+
+
+@pytest.mark.parametrize("n_callers", [2, 8])
+def test_concurrent_callers_share_one_load(n_callers):
+    """Callers asking for a key while it loads wait for that load instead of starting their own."""
+    cache = SingleFlightFrameCache()
+    loads = []
+    release = threading.Event()
+
+    def load():
+        loads.append(1)
+        release.wait()
+        return frame()
+
+    with ThreadPoolExecutor(max_workers=n_callers) as executor:
+        futures = [
+            executor.submit(cache.get_or_load, "key", load) for _ in range(n_callers)
+        ]
+        while cache.statistics.misses + cache.statistics.coalesced < n_callers:
+            time.sleep(0.001)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(loads) == 1
+    assert cache.statistics.coalesced == n_callers - 1
+    for result in results:
+        pd.testing.assert_frame_equal(result, frame())
+
+
+def test_handed_out_frames_are_independent():
+    """Editing a returned frame changes neither the cached frame nor later callers'."""
+    cache = SingleFlightFrameCache()
+    first = cache.get_or_load("key", frame)
+    first.loc[0, "a"] = -1.0
+    second = cache.get_or_load("key", frame)
+    assert second.loc[0, "a"] == 0.0
+    assert cache.statistics.hits == 1
+
+
+def test_failed_load_is_raised_and_not_cached():
+    """A failing load raises for its caller and the next caller loads again."""
+    cache = SingleFlightFrameCache()
+
+    def fail():
+        raise RuntimeError("warehouse down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("key", fail)
+    pd.testing.assert_frame_equal(cache.get_or_load("key", frame), frame())
+    assert cache.statistics.misses == 2
+
+
+def test_least_recently_used_frames_are_evicted_by_bytes():
+    """Past max_bytes the least recently used frame goes first."""
+    size = frame_nbytes(frame())
+    cache = SingleFlightFrameCache(max_bytes=2 * size)
+    cache.warm("a", frame)
+    cache.warm("b", frame)
+    cache.get_or_load("a", frame)
+    cache.warm("c", frame)
+
+    assert cache.statistics.evictions == 1
+    assert cache.statistics.current_bytes == 2 * size
+    loads = []
+    cache.get_or_load("a", lambda: loads.append("a") or frame())
+    cache.get_or_load("b", lambda: loads.append("b") or frame())
+    assert loads == ["b"]
+
+
+def test_frames_larger_than_the_bound_are_not_kept():
+    """A frame bigger than max_bytes is returned but never cached."""
+    cache = SingleFlightFrameCache(max_bytes=frame_nbytes(frame()) - 1)
+    pd.testing.assert_frame_equal(cache.get_or_load("key", frame), frame())
+    assert cache.statistics.current_bytes == 0
+    cache.get_or_load("key", frame)
+    assert cache.statistics.misses == 2
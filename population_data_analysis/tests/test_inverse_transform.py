@@ -0,0 +1,83 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from population_data_analysis.pipeline_operations.data_transformations.data_transformation_config_objects import (
+    DataTransformationOptions,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.data_normalization_logic import (
+    DataTransformer,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_sdk import (
+    DataTransformationsSDK,
+)
+
+OPTION_GRID = [
+    {"log": log, "difference": difference, "z_normalize": z_normalize, "jitter": 0.0}
+    for log, difference, z_normalize in itertools.product(
+        ["always", "never", "conditional"],
+        ["always", "never", "conditional"],
+        ["always", "never"],
+    )
+]
+
+
+def wide_frame(seed=0, n_rows=30):
+    """Wide frame with growing, signed and skewed columns."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "YEAR": np.arange(1990, 1990 + n_rows),
+            "Utah/POPULATION": 1e5 * np.exp(np.linspace(0, 1, n_rows))
+            + rng.normal(0, 100, n_rows),
+            "Idaho/MIGRATION": rng.normal(0, 10, n_rows),
+            "Idaho/BIRTHS": rng.lognormal(0, 1.5, n_rows),
+        }
+    )
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize(
+    ("options", "in_place"), list(itertools.product(OPTION_GRID, [False, True]))
+)
+def test_inverse_transform_restores_the_input_rows(options, in_place):
+    """Inverting the whole transformed frame from row 0 gives back the input's rows."""
+    df = wide_frame()
+    transformer = DataTransformer(in_place=in_place)
+    transformed = transformer.normalize_data(df, DataTransformationOptions(**options))
+    restored = transformer.inverse_transform(transformed, start_row=0)
+    expected = df[restored.columns].iloc[1:]
+    pd.testing.assert_frame_equal(restored, expected, rtol=1e-10)
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_stacked_forecasts_restart_from_their_own_rows():
+    """A stack of windows inverts like each window on its own."""
+    df = wide_frame(1)
+    transformer = DataTransformer()
+    transformed = transformer.normalize_data(df, DataTransformationOptions(jitter=0.0))
+    values = transformed.to_numpy()
+    starts = np.array([0, 7, 20])
+    windows = np.stack([values[start : start + 5] for start in starts])
+    stacked = transformer.inverse_transform(windows, start_row=starts)
+    for window, start in zip(stacked, starts):
+        np.testing.assert_allclose(
+            window, df[transformed.columns].iloc[start + 1 : start + 6].to_numpy()
+        )
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("options", OPTION_GRID[::4])
+def test_test_rows_score_against_the_input_in_original_units(options):
+    """to_scoring_space maps perfect test forecasts onto the input's test rows."""
+    df = wide_frame(2)
+    sdk = DataTransformationsSDK()
+    _, test_data = sdk.run(df, DataTransformationOptions(**options))
+    actual, restored = sdk.to_scoring_space(
+        test_data, test_data.to_numpy(), original_units=True
+    )
+    assert len(actual) == len(test_data)
+    pd.testing.assert_frame_equal(actual, df[test_data.columns].iloc[-len(test_data) :])
+    np.testing.assert_allclose(restored, actual.to_numpy())
@@ -0,0 +1,108 @@
+import pandas as pd
+import pytest
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
+    RetrivalParameters,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.local_seed_warehouse import (
+    LocalSeedWarehouse,
+    read_seed_csv,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.raw_data_loader import (
+    RawDataLoader,
+)
+
+MODEL_SQL = """select STATE_NAME, sum(POPULATION) as POPULATION
+from {{ ref('state_population') }}
+group by STATE_NAME"""
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_every_seed_is_loaded(seed_pool):
+    """Each seed CSV becomes a table with all of its rows."""
+    loader = RawDataLoader(connection_pool=seed_pool, fetch_once=False)
+    seed_paths = LocalSeedWarehouse().seed_paths
+    assert seed_paths
+    for table_name, path in seed_paths.items():
+        counted = loader.run_query(
+            f'select count(*) as N from pop_prediction.dev."{table_name}"'
+        )
+        assert counted.N.iloc[0] == len(read_seed_csv(path))
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_wide_frame_matches_a_pivot_of_the_sql_view(seed_pool):
+    """The loader's wide frame is the training view's rows pivoted by state."""
+    loader = RawDataLoader(connection_pool=seed_pool, fetch_once=False)
+    long_rows = loader.run_query(*loader.queries.full_table())
+    assert not long_rows.empty
+    # The reshape the experiments package did before the loader pivoted
+    pivoted = long_rows.pivot(index="YEAR", columns="STATE_NAME")
+    pivoted.columns = [f"{state}/{col}" for col, state in pivoted.columns]
+    expected = pivoted.reset_index().astype({col: "float64" for col in pivoted.columns})
+    for fetch_once in (False, True):
+        wide = RawDataLoader(
+            connection_pool=seed_pool, fetch_once=fetch_once
+        ).get_full_database(RetrivalParameters())
+        pd.testing.assert_frame_equal(wide, expected)
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_averaged_frame_matches_the_sql_averaged_view(seed_pool):
+    """Averaging the fetched rows in memory reproduces the averaged SQL view."""
+    from_view = RawDataLoader(
+        connection_pool=seed_pool, fetch_once=False
+    ).get_database_averaged_across_state(RetrivalParameters())
+    assert not from_view.empty
+    in_memory = RawDataLoader(
+        connection_pool=seed_pool, fetch_once=True
+    ).get_database_averaged_across_state(RetrivalParameters())
+    pd.testing.assert_frame_equal(in_memory, from_view)
+
+
+def write_project(project_dir, utah_population):
+    """Tiny dbt project: one seed and one model summing it."""
+    (project_dir / "seeds").mkdir(parents=True, exist_ok=True)
+    (project_dir / "models").mkdir(parents=True, exist_ok=True)
+    (project_dir / "seeds" / "state_population.csv").write_text(
+        "state_name,year,population\n"
+        f'Utah,2020,"{utah_population:,}"\n'
+        "Idaho,2020,1000\n"
+    )
+    (project_dir / "models" / "state_totals.sql").write_text(MODEL_SQL)
+
+
+def utah_total(project_dir, database_path):
+    """Utah's row of the model, from a fresh warehouse on database_path."""
+    connection = LocalSeedWarehouse(str(project_dir), database_path).build()
+    try:
+        return connection.execute(
+            "select POPULATION from pop_prediction.dev.state_totals "
+            "where STATE_NAME = 'Utah'"
+        ).fetchone()[0]
+    finally:
+        # DuckDB lets one connection per process attach a database file
+        connection.close()
+
+
+def test_changed_seed_rebuilds_the_database(tmp_path, monkeypatch):
+    """A database is reused while its sources match and rebuilt once a seed changes."""
+    project_dir = tmp_path / "dbt"
+    database_path = str(tmp_path / "local.duckdb")
+    write_project(project_dir, 3_000_000)
+    assert utah_total(project_dir, database_path) == 3_000_000
+
+    loads = []
+    original_load_seeds = LocalSeedWarehouse._load_seeds
+
+    def counting_load_seeds(self, connection):
+        loads.append(self.source_fingerprint())
+        original_load_seeds(self, connection)
+
+    monkeypatch.setattr(LocalSeedWarehouse, "_load_seeds", counting_load_seeds)
+    assert utah_total(project_dir, database_path) == 3_000_000
+    assert loads == []
+
+    write_project(project_dir, 3_500_000)
+    assert utah_total(project_dir, database_path) == 3_500_000
+    assert loads == [LocalSeedWarehouse(str(project_dir)).source_fingerprint()]
@@ -0,0 +1,103 @@
+import pandas as pd
+import pytest
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
+    RetrivalParameters,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.partitioned_store import (
+    STORE_MARKER,
+    PartitionedParquetStore,
+    PartitionWriter,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.raw_data_loader import (
+    RawDataLoader,
+)
+
+
+def long_rows(states, years=range(2000, 2004), value=1.0):
+    """Small long table with one measure."""
+    return pd.DataFrame(
+        [
+            {"YEAR": year, "STATE_NAME": state, "POPULATION": value + year}
+            for year in years
+            for state in states
+        ]
+    )
+
+
+def write_store(root, df):
+    """Write a store at root through a staged replacement."""
+    store = PartitionedParquetStore(root)
+    with store.staged_replacement() as staging:
+        PartitionWriter(staging).add_batch(df)
+    return store
+
+
+def test_non_store_directory_is_refused(tmp_path):
+    """A non-empty directory without the marker is never cleared or replaced."""
+    root = tmp_path / "data"
+    root.mkdir()
+    (root / "notes.txt").write_text("keep me")
+    store = PartitionedParquetStore(root)
+    with pytest.raises(ValueError):
+        store.clear()
+    with pytest.raises(ValueError):
+        with store.staged_replacement():
+            pass
+    assert (root / "notes.txt").read_text() == "keep me"
+    assert [path.name for path in tmp_path.iterdir()] == ["data"]
+
+
+@pytest.mark.parametrize("existing", ["missing", "empty"])
+def test_missing_or_empty_root_is_written(tmp_path, existing):
+    """A root that does not exist yet, or is empty, becomes a store."""
+    root = tmp_path / "store"
+    if existing == "empty":
+        root.mkdir()
+    store = write_store(root, long_rows(["Utah"]))
+    assert store.is_store()
+    assert store.geographies() == ["Utah"]
+
+
+def test_earlier_export_is_replaced(tmp_path):
+    """A second export replaces the first, leaving no staging directories behind."""
+    root = tmp_path / "store"
+    write_store(root, long_rows(["Utah", "Idaho"]))
+    store = write_store(root, long_rows(["Texas", "New York"], value=5.0))
+    assert store.geographies() == ["New York", "Texas"]
+    pd.testing.assert_frame_equal(
+        store.read_partition("Texas"), long_rows(["Texas"], value=5.0)
+    )
+    assert (root / STORE_MARKER).is_file()
+    assert [path.name for path in tmp_path.iterdir()] == ["store"]
+
+
+def test_failed_write_leaves_the_old_export(tmp_path):
+    """An error while writing the new store keeps the previous one as it was."""
+    root = tmp_path / "store"
+    store = write_store(root, long_rows(["Utah", "Idaho"]))
+    with pytest.raises(RuntimeError):
+        with store.staged_replacement() as staging:
+            PartitionWriter(staging).add_batch(long_rows(["Texas"]))
+            raise RuntimeError("warehouse dropped the connection")
+    assert store.geographies() == ["Idaho", "Utah"]
+    pd.testing.assert_frame_equal(store.read_partition("Utah"), long_rows(["Utah"]))
+    assert [path.name for path in tmp_path.iterdir()] == ["store"]
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_exported_partitions_match_the_loader(tmp_path, seed_pool):
+    """Each geography's partition reads back as the loader's rows for that state."""
+    loader = RawDataLoader(connection_pool=seed_pool)
+    store = loader.export_partitioned_store(str(tmp_path / "store"), batch_rows=97)
+    geographies = store.geographies()
+    assert geographies == list(loader.get_state_index().states)
+    for geography in geographies:
+        expected = loader.get_full_database(
+            RetrivalParameters(specific_states=[geography])
+        )
+        partition = store.read_partition(geography)
+        pd.testing.assert_frame_equal(
+            partition,
+            expected,
+        )
@@ -0,0 +1,90 @@
+import json
+
+import pandas as pd
+import pytest
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
+    RetrivalParameters,
+    SqlDialect,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.arrow_fetch import (
+    IDENTIFIER_COLUMNS,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.query_builder import (
+    STATE_LIST_PREDICATES,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.raw_data_loader import (
+    RawDataLoader,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.wide_format import (
+    build_pivot_query,
+)
+
+
+def f_string_pivot_query(source, states, features):
+    """The pivot as it was built before the state filter was bound."""
+    sorted_states = sorted(states)
+    state_list = ", ".join(
+        "'" + state.replace("'", "''") + "'" for state in sorted_states
+    )
+    aggregates = ",\n    ".join(
+        f"max(case when STATE_NAME = '{state}' then {feature} end) "
+        f'as "{state}/{feature}"'
+        for feature in features
+        for state in sorted_states
+    )
+    return (
+        f"select YEAR,\n    {aggregates}\n"
+        f"from {source}\n"
+        f"where STATE_NAME in ({state_list})\n"
+        "group by YEAR\n"
+        "order by YEAR"
+    )
+
+
+def loader_states_and_features(loader):
+    """Every state and measure in the seeded training view."""
+    states = sorted(loader.run_query(*loader.queries.distinct_states()).STATE_NAME)
+    columns = loader.run_query(*loader.queries.columns()).columns
+    return states, [col for col in columns if col not in IDENTIFIER_COLUMNS]
+
+
+@pytest.mark.parametrize("n_states", [1, 5, None])
+def test_duckdb_pivot_binds_states_and_matches_the_f_string_query(seed_pool, n_states):
+    """The bound pivot returns the same rows as the inlined one, for one or many states."""
+    loader = RawDataLoader(connection_pool=seed_pool, fetch_once=False)
+    all_states, features = loader_states_and_features(loader)
+    states = all_states[:n_states]
+    query = build_pivot_query(
+        loader.queries.training_view, states, features, SqlDialect.duckdb
+    )
+    assert STATE_LIST_PREDICATES[SqlDialect.duckdb] in query.sql
+    assert query.params == [states]
+    expected = loader.run_query(
+        f_string_pivot_query(loader.queries.training_view, states, features)
+    )
+    pd.testing.assert_frame_equal(loader.run_query(*query), expected)
+
+
+@pytest.mark.parametrize("states", [["Utah"], ["Utah", "Idaho", "Hawai'i"]])
+def test_snowflake_pivot_binds_states_as_one_json_array(states):
+    """Snowflake gets the flatten predicate and the sorted states as one JSON value."""
+    query = build_pivot_query("TRAINING", states, ["POPULATION"], SqlDialect.snowflake)
+    where = query.sql.split("\nwhere ")[1]
+    assert where.startswith(STATE_LIST_PREDICATES[SqlDialect.snowflake])
+    assert "Utah" not in where
+    assert query.params == [json.dumps(sorted(states))]
+    # The state names stay in the aggregates, where they become column aliases
+    assert f'as "{sorted(states)[-1]}/POPULATION"' in query.sql
+
+
+def test_loader_sql_pivot_matches_the_pandas_pivot(seed_pool):
+    """pivot_in_sql returns the same wide frame as pivoting the long rows locally."""
+    retrival_parameters = RetrivalParameters(specific_states=["Utah", "Idaho", "Texas"])
+    expected = RawDataLoader(
+        connection_pool=seed_pool, fetch_once=False
+    ).get_full_database(retrival_parameters)
+    pivoted = RawDataLoader(
+        connection_pool=seed_pool, fetch_once=False, pivot_in_sql=True
+    ).get_full_database(retrival_parameters)
+    pd.testing.assert_frame_equal(pivoted, expected)
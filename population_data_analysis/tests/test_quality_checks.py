@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from population_data_analysis.pipeline_operations.data_quality.data_quality_config_objects import (
+    DataQualityCheck,
+    DataQualityOptions,
+)
+from population_data_analysis.pipeline_operations.data_quality.data_quality_modules.quality_checks import (
+    DataQualityError,
+    enforce_data_quality,
+    repair,
+    scan,
+)
+
+
+def clean_frame(n_rows=12):
+    """Wide frame every check passes, with one int column."""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "YEAR": np.arange(2000, 2000 + n_rows),
+            "Utah/POPULATION": 1e5 + rng.normal(0, 100, n_rows).cumsum(),
+            "Utah/BIRTHS": np.arange(1, n_rows + 1, dtype=np.int64) * 7,
+            "Idaho/POPULATION": 5e4 + rng.normal(0, 50, n_rows).cumsum(),
+        }
+    )
+
+
+def flagged(report):
+    """Columns flagged by each check."""
+    return {issue.check: issue.columns for issue in report.issues}
+
+
+def test_clean_frame_passes_untouched():
+    """A frame without problems is returned as is in every mode."""
+    df = clean_frame()
+    for mode in ("reject", "repair"):
+        result, report = enforce_data_quality(
+            df, DataQualityOptions(mode=mode), log_applied=True
+        )
+        assert report.passed
+        assert result is df
+
+
+@pytest.mark.parametrize(
+    ("column", "bad_values", "log_applied", "check"),
+    [
+        ("Utah/POPULATION", {3: np.nan}, False, DataQualityCheck.non_finite),
+        (
+            "Utah/POPULATION",
+            {0: np.inf, 5: -np.inf},
+            False,
+            DataQualityCheck.non_finite,
+        ),
+        ("Utah/BIRTHS", {4: 0}, True, DataQualityCheck.non_positive_under_log),
+    ],
+)
+def test_bad_cells_are_flagged_and_interpolated(column, bad_values, log_applied, check):
+    """Bad cells are reported, rejected in reject mode and interpolated in repair mode."""
+    df = clean_frame()
+    if column == "Utah/BIRTHS":
+        df[column] = df[column].astype(np.float64)
+    for row, value in bad_values.items():
+        df.loc[row, column] = value
+
+    report = scan(df, log_applied, min_series_length=8)
+    assert flagged(report)[check] == [column]
+    assert report.issues[0].cells == len(bad_values)
+    with pytest.raises(DataQualityError):
+        enforce_data_quality(df, DataQualityOptions(mode="reject"), log_applied)
+
+    repaired, report = enforce_data_quality(
+        df, DataQualityOptions(mode="repair"), log_applied
+    )
+    assert report.repaired_columns == [column]
+    assert report.dropped_columns == []
+    expected = clean_frame()[column].astype(np.float64)
+    for row in bad_values:
+        expected[row] = np.nan
+    expected = expected.interpolate(limit_direction="both")
+    pd.testing.assert_series_equal(repaired[column], expected)
+    assert scan(repaired, log_applied, min_series_length=8).passed
+
+
+def test_non_positive_int_column_under_log_is_dropped():
+    """An int column with nothing positive to interpolate from is dropped, not cast."""
+    df = clean_frame()
+    df["Idaho/BIRTHS"] = np.zeros(len(df), dtype=np.int64) - 1
+    repaired, report = repair(df, log_applied=True, min_series_length=8)
+    assert report.dropped_columns == ["Idaho/BIRTHS"]
+    assert "Idaho/BIRTHS" not in repaired.columns
+
+
+def test_repaired_int_column_keeps_its_fractional_fill():
+    """Interpolating an int column gives floats rather than truncated ints."""
+    df = clean_frame()
+    df.loc[4, "Utah/BIRTHS"] = 36
+    df.loc[5, "Utah/BIRTHS"] = 0
+    repaired, _ = repair(df, log_applied=True, min_series_length=8)
+    assert repaired.loc[5, "Utah/BIRTHS"] == 42.5
+    # Columns without bad cells keep their dtype
+    assert repaired["YEAR"].dtype == np.int64
+
+
+def test_too_short_columns_are_dropped_by_repair():
+    """A column with fewer finite values than min_series_length is dropped."""
+    df = clean_frame()
+    df["Idaho/MIGRATION"] = np.nan
+    df.loc[:2, "Idaho/MIGRATION"] = [1.0, 2.0, 3.0]
+    report = scan(df, log_applied=False, min_series_length=8)
+    assert flagged(report)[DataQualityCheck.too_short] == ["Idaho/MIGRATION"]
+
+    # Interpolation only extends the edge values, which leaves the column constant
+    df.loc[:2, "Idaho/MIGRATION"] = np.nan
+    repaired, report = enforce_data_quality(
+        df, DataQualityOptions(mode="repair"), log_applied=False
+    )
+    assert report.dropped_columns == ["Idaho/MIGRATION"]
+    assert "Idaho/MIGRATION" not in repaired.columns
+
+
+def test_constant_and_duplicate_columns_are_reported_but_kept():
+    """Constant and duplicate columns are left to the transformation options."""
+    df = clean_frame()
+    df["Idaho/CONSTANT"] = 3.0
+    df["Idaho/COPY"] = df["Utah/POPULATION"]
+    report = scan(df, log_applied=False, min_series_length=8)
+    assert flagged(report) == {
+        DataQualityCheck.constant_column: ["Idaho/CONSTANT"],
+        DataQualityCheck.duplicate_column: ["Idaho/COPY"],
+    }
+    with pytest.raises(DataQualityError):
+        enforce_data_quality(df, DataQualityOptions(mode="reject"), False)
+    repaired, report = enforce_data_quality(
+        df, DataQualityOptions(mode="repair"), log_applied=False
+    )
+    assert report.dropped_columns == []
+    pd.testing.assert_frame_equal(repaired, df)
+
+
+def test_frames_shorter_than_min_series_length_are_rejected_even_in_repair_mode():
+    """No repair makes up missing years."""
+    df = clean_frame(n_rows=6)
+    with pytest.raises(DataQualityError) as error:
+        enforce_data_quality(df, DataQualityOptions(mode="repair"), False)
+    assert DataQualityCheck.too_short in flagged(error.value.report)
+
+
+def test_off_mode_skips_the_scan():
+    """With the gate off the frame is returned without a report."""
+    df = clean_frame()
+    df.loc[0, "Utah/POPULATION"] = np.nan
+    result, report = enforce_data_quality(df, DataQualityOptions(), True)
+    assert report is None
+    assert result is df
@@ -0,0 +1,156 @@
+import json
+import time
+
+import pandas as pd
+import pytest
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
+    QueryCacheSettings,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.query_cache import (
+    OfflineCacheMissError,
+    ParquetQueryCache,
+    table_last_altered_version_token,
+)
+
+QUERY = "select * from POP_PREDICTION.DEV.POP_PREDICTION_TRAINING where state_name = ?"
+PARAMS = ["Utah"]
+
+
+def frame(value=1.0):
+    """Small query result."""
+    return pd.DataFrame(
+        {"YEAR": [2000, 2001], "STATE_NAME": ["Utah", "Utah"], "POPULATION": value}
+    )
+
+
+def load_counter(df):
+    """Loader returning df, with a list recording each call."""
+    calls = []
+
+    def load():
+        calls.append(1)
+        return df
+
+    return load, calls
+
+
+def test_entry_is_one_file_and_round_trips(tmp_path):
+    """A stored result reads back unchanged from a single Parquet file."""
+    cache = ParquetQueryCache(str(tmp_path))
+    cache.put(QUERY, PARAMS, frame())
+    pd.testing.assert_frame_equal(cache.get(QUERY, PARAMS), frame())
+    assert [path.suffix for path in tmp_path.iterdir()] == [".parquet"]
+    assert cache.get(QUERY, ["Idaho"]) is None
+    assert cache.get("  " + QUERY + ";", PARAMS) is not None
+
+
+def test_file_without_metadata_is_a_miss(tmp_path):
+    """A Parquet file lacking the cache metadata is never served."""
+    cache = ParquetQueryCache(str(tmp_path))
+    frame().to_parquet(tmp_path / f"{cache.cache_key(QUERY, PARAMS)}.parquet")
+    assert cache.get(QUERY, PARAMS) is None
+
+
+def test_entries_expire_after_the_ttl(tmp_path, monkeypatch):
+    """An entry older than ttl_seconds is loaded again and rewritten."""
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    cache = ParquetQueryCache(str(tmp_path), ttl_seconds=60)
+    load, calls = load_counter(frame())
+    cache.get_or_load(QUERY, PARAMS, load)
+
+    monkeypatch.setattr(time, "time", lambda: now + 59)
+    cache.get_or_load(QUERY, PARAMS, load)
+    assert len(calls) == 1
+
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get(QUERY, PARAMS) is None
+    cache.get_or_load(QUERY, PARAMS, load)
+    assert len(calls) == 2
+    assert cache.get(QUERY, PARAMS) is not None
+
+
+def test_changed_version_token_invalidates_entries(tmp_path):
+    """Entries written under another version token are stale once it is refreshed."""
+    tokens = ["v1"]
+    cache = ParquetQueryCache(str(tmp_path), version_token_provider=lambda: tokens[-1])
+    cache.put(QUERY, PARAMS, frame())
+    tokens.append("v2")
+    # The token is memoized until refreshed
+    assert cache.get(QUERY, PARAMS) is not None
+    cache.refresh_version_token()
+    assert cache.get(QUERY, PARAMS) is None
+    cache.put(QUERY, PARAMS, frame(2.0))
+    pd.testing.assert_frame_equal(cache.get(QUERY, PARAMS), frame(2.0))
+
+
+def test_changed_dbt_manifest_invalidates_entries(tmp_path):
+    """The dbt manifest hash wired from settings invalidates entries when it changes."""
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps({"nodes": {}}))
+    settings = QueryCacheSettings(
+        directory=str(tmp_path / "cache"), dbt_manifest_path=str(manifest_path)
+    )
+    ParquetQueryCache.from_settings(settings).put(QUERY, PARAMS, frame())
+    assert ParquetQueryCache.from_settings(settings).get(QUERY, PARAMS) is not None
+    manifest_path.write_text(json.dumps({"nodes": {"model.new": {}}}))
+    assert ParquetQueryCache.from_settings(settings).get(QUERY, PARAMS) is None
+
+
+def test_offline_mode_serves_stale_entries_and_raises_on_a_miss(tmp_path):
+    """Offline, anything on disk is served and nothing is ever loaded."""
+    ParquetQueryCache(str(tmp_path), version_token_provider=lambda: "v1").put(
+        QUERY, PARAMS, frame()
+    )
+    cache = ParquetQueryCache(
+        str(tmp_path),
+        ttl_seconds=0,
+        version_token_provider=lambda: "v2",
+        offline=True,
+    )
+    load, calls = load_counter(frame(2.0))
+    pd.testing.assert_frame_equal(cache.get_or_load(QUERY, PARAMS, load), frame())
+    with pytest.raises(OfflineCacheMissError):
+        cache.get_or_load(QUERY, ["Idaho"], load)
+    assert calls == []
+
+
+def test_last_altered_token_binds_schema_and_tables():
+    """Table and schema names are bound values, never part of the statement text."""
+    calls = []
+
+    def run_query(query, params):
+        calls.append((query, params))
+        return pd.DataFrame({"LAST_ALTERED": ["2024-01-01 00:00:00"]})
+
+    token = table_last_altered_version_token(
+        run_query, ["pop_prediction_training", "o'brien"], schema="dev"
+    )
+    assert token() == "2024-01-01 00:00:00"
+    ((query, params),) = calls
+    assert "o'brien" not in query.lower() and "'dev'" not in query.lower()
+    assert params == ["DEV", json.dumps(["POP_PREDICTION_TRAINING", "O'BRIEN"])]
+
+
+def test_from_settings_wires_the_last_altered_token(tmp_path):
+    """version_tables adds the last-altered lookup, which needs a run_query."""
+    settings = QueryCacheSettings(
+        directory=str(tmp_path), version_tables=["POP_PREDICTION_TRAINING"]
+    )
+    with pytest.raises(ValueError):
+        ParquetQueryCache.from_settings(settings)
+    altered = ["t1"]
+
+    def run_query(query, params):
+        return pd.DataFrame({"LAST_ALTERED": [altered[-1]]})
+
+    ParquetQueryCache.from_settings(settings, run_query).put(QUERY, PARAMS, frame())
+    assert (
+        ParquetQueryCache.from_settings(settings, run_query).get(QUERY, PARAMS)
+        is not None
+    )
+    altered.append("t2")
+    assert (
+        ParquetQueryCache.from_settings(settings, run_query).get(QUERY, PARAMS) is None
+    )
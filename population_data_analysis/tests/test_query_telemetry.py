@@ -0,0 +1,144 @@
+import threading
+
+import pytest
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
+    RetrivalParameters,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules import (
+    query_telemetry,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.query_cache import (
+    ParquetQueryCache,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.query_telemetry import (
+    QueryTelemetry,
+    QueryTelemetryRecord,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.raw_data_loader import (
+    RawDataLoader,
+)
+
+
+def record(cache_hit=None, streamed=False, seconds=(0.1, 0.2, 0.3, 0.4), rows=10):
+    """Finished record with the given stage times."""
+    connect, execute, fetch, frame = seconds
+    return QueryTelemetryRecord(
+        query="select 1",
+        started_at=0.0,
+        connect_seconds=connect,
+        execute_seconds=execute,
+        fetch_seconds=fetch,
+        frame_seconds=frame,
+        rows=rows,
+        bytes=rows * 8,
+        cache_hit=cache_hit,
+        streamed=streamed,
+    )
+
+
+def test_start_collapses_query_whitespace():
+    """Records carry the query on one line."""
+    assert QueryTelemetry.start("select *\n  from t\n").query == "select * from t"
+
+
+def test_summary_totals_every_record():
+    """Counts, sizes and stage times add up across records."""
+    telemetry = QueryTelemetry()
+    telemetry.add(record(cache_hit=True, seconds=(0.0, 0.0, 0.5, 0.0), rows=3))
+    telemetry.add(record(cache_hit=False, streamed=True))
+    telemetry.add(record())
+    summary = telemetry.summary()
+    assert (summary.queries, summary.cache_hits, summary.cache_misses) == (3, 1, 1)
+    assert summary.streamed_queries == 1
+    assert (summary.rows, summary.bytes) == (23, 184)
+    assert summary.connect_seconds == pytest.approx(0.2)
+    assert summary.fetch_seconds == pytest.approx(1.1)
+    assert summary.total_seconds == pytest.approx(2.5)
+    assert summary.describe() == (
+        "3 queries, 1 cache hits, 23 rows, 0.0 MB, 2.50s (connect 0.20s, "
+        "execute 0.40s, fetch 1.10s, frame 0.80s)"
+    )
+    assert summary.as_metrics()["raw_data_cache_hits"] == 1.0
+
+
+def test_record_metrics_omit_cache_hit_without_a_cache():
+    """cache_hit is only logged when a cache was configured."""
+    assert "raw_data_query_cache_hit" not in record().as_metrics()
+    assert record(cache_hit=False).as_metrics()["raw_data_query_cache_hit"] == 0.0
+    assert record().total_seconds == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize(
+    ("log_to_mlflow", "active", "logged"),
+    [(True, True, True), (True, False, False), (False, True, False)],
+)
+def test_records_reach_mlflow_only_when_enabled_inside_a_run(
+    monkeypatch, log_to_mlflow, active, logged
+):
+    """add logs a record's metrics only with mirroring on and a run active."""
+    calls = []
+    monkeypatch.setattr(
+        query_telemetry.mlflow, "active_run", lambda: object() if active else None
+    )
+    monkeypatch.setattr(
+        query_telemetry.mlflow,
+        "log_metrics",
+        lambda metrics, step=None: calls.append((metrics, step)),
+    )
+    telemetry = QueryTelemetry(log_to_mlflow=log_to_mlflow)
+    telemetry.add(record())
+    telemetry.add(record())
+    assert [step for _, step in calls] == ([0, 1] if logged else [])
+
+
+def test_log_to_active_run_logs_the_summary_and_every_record(monkeypatch):
+    """Records made outside any run are logged with their step afterwards."""
+    calls = []
+    monkeypatch.setattr(
+        query_telemetry.mlflow,
+        "log_metrics",
+        lambda metrics, step=None: calls.append((metrics, step)),
+    )
+    telemetry = QueryTelemetry()
+    telemetry.add(record())
+    telemetry.add(record(cache_hit=True))
+    telemetry.log_to_active_run()
+    assert calls[0] == (telemetry.summary().as_metrics(), None)
+    assert [step for _, step in calls[1:]] == [0, 1]
+
+
+def test_concurrent_adds_are_all_kept_and_clear_forgets_them():
+    """Records added from many threads are all counted."""
+    telemetry = QueryTelemetry()
+    threads = [
+        threading.Thread(target=lambda: [telemetry.add(record()) for _ in range(50)])
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert telemetry.summary().queries == 400
+    telemetry.clear()
+    assert telemetry.records == []
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_loader_records_cache_misses_then_hits(tmp_path, seed_pool):
+    """The loader records each query, marking those served from the disk cache."""
+    telemetry = QueryTelemetry()
+    loader = RawDataLoader(
+        connection_pool=seed_pool,
+        query_cache=ParquetQueryCache(str(tmp_path)),
+        fetch_once=False,
+        telemetry=telemetry,
+    )
+    retrival_parameters = RetrivalParameters(specific_states=["Utah"])
+    df = loader.get_full_database(retrival_parameters)
+    loader.get_full_database(retrival_parameters)
+    first, second = telemetry.records
+    assert (first.cache_hit, second.cache_hit) == (False, True)
+    assert first.rows == second.rows == len(df)
+    assert first.execute_seconds > 0 and second.execute_seconds == 0
+    assert "state_name" in first.query
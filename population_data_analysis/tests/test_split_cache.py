@@ -0,0 +1,140 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from population_data_analysis.pipeline_operations.data_transformations.data_transformation_config_objects import (
+    DataTransformationOptions,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules import (
+    split_cache,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.split_cache import (
+    TransformedSplitCache,
+    split_cache_key,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_sdk import (
+    DataTransformationsSDK,
+)
+
+OPTIONS = DataTransformationOptions(jitter=0.0)
+
+
+def wide_frame(seed=0, n_rows=30):
+    """Wide frame with growing and noisy columns."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "YEAR": np.arange(1990, 1990 + n_rows),
+            "Utah/POPULATION": 1e5 * np.exp(np.linspace(0, 1, n_rows))
+            + rng.normal(0, 100, n_rows),
+            "Idaho/POPULATION": 5e4 + rng.normal(0, 50, n_rows).cumsum(),
+        }
+    )
+
+
+def fresh_split(df, options=OPTIONS):
+    """Transform without any cache."""
+    return DataTransformationsSDK(split_cache=TransformedSplitCache()).transform(
+        df, options
+    )
+
+
+def assert_same_split(split, expected):
+    """Same frames, break point and inversion inputs."""
+    pd.testing.assert_frame_equal(split.train_data, expected.train_data)
+    pd.testing.assert_frame_equal(split.test_data, expected.test_data)
+    assert split.test_start_row == expected.test_start_row
+    assert (
+        split.restorative_values["remaining_columns"]
+        == expected.restorative_values["remaining_columns"]
+    )
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("from_disk", [False, True])
+def test_hit_returns_the_fresh_transform(tmp_path, from_disk):
+    """A split served from memory or disk equals transforming again."""
+    df = wide_frame()
+    cache = TransformedSplitCache(directory=str(tmp_path))
+    key = split_cache_key(df, OPTIONS)
+    cache.get_or_transform(key, lambda: fresh_split(df))
+    if from_disk:
+        cache = TransformedSplitCache(directory=str(tmp_path))
+    split = cache.get_or_transform(key, lambda: pytest.fail("transformed again"))
+    assert cache.hits == 1
+    assert_same_split(split, fresh_split(df))
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_sdk_run_serves_cached_splits():
+    """Running the same data and options twice transforms once."""
+    df = wide_frame()
+    sdk = DataTransformationsSDK(split_cache=TransformedSplitCache())
+    first = sdk.run(df, OPTIONS)
+    first[0].iloc[0, 0] = np.nan
+    train_data, test_data = sdk.run(df, OPTIONS)
+    expected = fresh_split(df)
+    pd.testing.assert_frame_equal(train_data, expected.train_data)
+    pd.testing.assert_frame_equal(test_data, expected.test_data)
+    assert (sdk.split_cache.hits, sdk.split_cache.misses) == (1, 1)
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_byte_bound_evicts_the_least_recently_used_split():
+    """Past max_bytes the oldest split is dropped and transformed again on request."""
+    splits = {seed: fresh_split(wide_frame(seed)) for seed in range(3)}
+    size = splits[0].nbytes()
+    cache = TransformedSplitCache(max_bytes=2 * size)
+    for seed, split in splits.items():
+        assert cache.put(str(seed), split)
+    assert cache.get("0") is None
+    assert_same_split(cache.get("2"), splits[2])
+    assert not TransformedSplitCache(max_bytes=size - 1).put("0", splits[0])
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize(
+    "contents", [b"not a pickle", pickle.dumps({"train_data": None})]
+)
+def test_unreadable_pickle_is_discarded_and_reloaded(tmp_path, contents):
+    """A corrupt or foreign file on disk is removed and the split transformed again."""
+    df = wide_frame()
+    key = split_cache_key(df, OPTIONS)
+    (tmp_path / f"{key}.pkl").write_bytes(contents)
+    cache = TransformedSplitCache(directory=str(tmp_path))
+    assert cache.get(key) is None
+    assert not (tmp_path / f"{key}.pkl").exists()
+    assert_same_split(
+        cache.get_or_transform(key, lambda: fresh_split(df)), fresh_split(df)
+    )
+    with open(tmp_path / f"{key}.pkl", "rb") as file:
+        assert_same_split(pickle.load(file), fresh_split(df))
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("attribute", ["__version__", "TRANSFORM_SCHEMA_VERSION"])
+def test_splits_from_other_versions_are_not_served(tmp_path, monkeypatch, attribute):
+    """Changing the package or schema version changes every key."""
+    df = wide_frame()
+    cache = TransformedSplitCache(directory=str(tmp_path))
+    old_key = split_cache_key(df, OPTIONS)
+    cache.put(old_key, fresh_split(df))
+
+    monkeypatch.setattr(split_cache, attribute, "other")
+    new_key = split_cache_key(df, OPTIONS)
+    assert new_key != old_key
+    assert TransformedSplitCache(directory=str(tmp_path)).get(new_key) is None
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_every_option_and_value_changes_the_key():
+    """Different options or data give different keys; equal ones the same key."""
+    df = wide_frame()
+    key = split_cache_key(df, OPTIONS)
+    assert split_cache_key(df.copy(), OPTIONS.model_copy()) == key
+    assert split_cache_key(df, OPTIONS.model_copy(update={"log": "never"})) != key
+    changed = df.copy()
+    changed.iloc[3, 1] += 1.0
+    assert split_cache_key(changed, OPTIONS) != key
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
+    LoadedDataDtypes,
+    RetrivalParameters,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.raw_data_loader import (
+    RawDataLoader,
+)
+
+DTYPES = [LoadedDataDtypes.standard, LoadedDataDtypes.compact]
+
+
+def loaders(seed_pool, dtypes):
+    """A loader answering from the state index and one querying the views."""
+    return (
+        RawDataLoader(connection_pool=seed_pool, dtypes=dtypes, fetch_once=True),
+        RawDataLoader(connection_pool=seed_pool, dtypes=dtypes, fetch_once=False),
+    )
+
+
+def states_in(df):
+    """The states a loaded frame holds, long or wide."""
+    if "STATE_NAME" in df.columns:
+        return sorted(df["STATE_NAME"].unique())
+    return sorted({col.split("/")[0] for col in df.columns if col != "YEAR"})
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("dtypes", DTYPES)
+@pytest.mark.parametrize(
+    "states",
+    [["Utah"], ["Utah", "Idaho"], ["Wyoming", "Alabama", "Texas", "New York"]],
+)
+def test_subsets_match_the_sql_path(seed_pool, dtypes, states):
+    """One state gives its long rows and several their wide frame, as the SQL path does."""
+    indexed, queried = loaders(seed_pool, dtypes)
+    retrival_parameters = RetrivalParameters(specific_states=states)
+    pd.testing.assert_frame_equal(
+        indexed.get_full_database(retrival_parameters),
+        queried.get_full_database(retrival_parameters),
+    )
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("dtypes", DTYPES)
+def test_every_state_matches_the_sql_path(seed_pool, dtypes):
+    """With no subset both paths give the wide frame of every state."""
+    indexed, queried = loaders(seed_pool, dtypes)
+    pd.testing.assert_frame_equal(
+        indexed.get_full_database(RetrivalParameters()),
+        queried.get_full_database(RetrivalParameters()),
+    )
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("n_states", [1, 3, 8])
+def test_seeded_random_sample_matches_the_sql_path(seed_pool, n_states):
+    """A seeded sample is reproducible and equals querying the states it drew."""
+    indexed, queried = loaders(seed_pool, LoadedDataDtypes.standard)
+    retrival_parameters = RetrivalParameters(random_sample_n_states=n_states)
+    np.random.seed(7)
+    sampled = indexed.get_full_database(retrival_parameters)
+    np.random.seed(7)
+    pd.testing.assert_frame_equal(
+        indexed.get_full_database(retrival_parameters), sampled
+    )
+    states = states_in(sampled)
+    assert len(states) == n_states
+    pd.testing.assert_frame_equal(
+        sampled,
+        queried.get_full_database(RetrivalParameters(specific_states=states)),
+    )
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("dtypes", DTYPES)
+def test_averaged_frame_matches_the_sql_view(seed_pool, dtypes):
+    """The in-memory average of the indexed rows equals the averaged view."""
+    indexed, queried = loaders(seed_pool, dtypes)
+    pd.testing.assert_frame_equal(
+        indexed.get_database_averaged_across_state(RetrivalParameters()),
+        queried.get_database_averaged_across_state(RetrivalParameters()),
+    )
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_unknown_state_is_rejected(seed_pool):
+    """Asking the index for a state it does not have raises."""
+    indexed, _ = loaders(seed_pool, LoadedDataDtypes.standard)
+    with pytest.raises(ValueError):
+        indexed.get_full_database(RetrivalParameters(specific_states=["Atlantis"]))
@@ -0,0 +1,131 @@
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_config_objects import (
+    RetrivalParameters,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.arrow_fetch import (
+    arrow_table_to_frame,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.local_seed_warehouse import (
+    LocalSeedCursor,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.raw_data_loader import (
+    RawDataLoader,
+)
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.streaming_fetch import (
+    LongFrameBuilder,
+    iter_frame_batches,
+)
+
+N_ROWS = 103
+QUERY = "select * from long_rows order by YEAR, STATE_NAME"
+
+
+@pytest.fixture(name="cursor_factory")
+def fixture_cursor_factory():
+    """Open cursors that have run QUERY over a small shuffled long table."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "YEAR": np.arange(1990, 1990 + N_ROWS),
+            "STATE_NAME": rng.choice(["Utah", "Idaho", "Texas"], N_ROWS),
+            "POPULATION": rng.normal(1e5, 1e3, N_ROWS),
+            "BIRTHS": rng.integers(0, 1000, N_ROWS),
+        }
+    )
+    connection = duckdb.connect()
+    connection.register("long_rows_frame", df.sample(frac=1.0, random_state=0))
+    connection.execute("create table long_rows as select * from long_rows_frame")
+
+    def cursor_factory():
+        cursor = LocalSeedCursor(connection.cursor())
+        cursor.execute(QUERY)
+        return cursor
+
+    yield cursor_factory
+    connection.close()
+
+
+def single_fetch(cursor_factory):
+    """The whole result in one fetch."""
+    return arrow_table_to_frame(cursor_factory().fetch_arrow_table())
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("use_arrow", [True, False])
+@pytest.mark.parametrize("batch_rows", [1, 10, 25, N_ROWS, 1000])
+def test_batches_add_up_to_a_single_fetch(cursor_factory, use_arrow, batch_rows):
+    """Full batches of batch_rows then one partial batch, together the whole result."""
+    batches = list(
+        iter_frame_batches(cursor_factory(), batch_rows, use_arrow=use_arrow)
+    )
+    sizes = [len(batch) for batch in batches]
+    full, partial = divmod(N_ROWS, batch_rows)
+    assert sizes == [batch_rows] * full + ([partial] if partial else [])
+
+    builder = LongFrameBuilder()
+    for batch in batches:
+        builder.add_batch(batch)
+    expected = single_fetch(cursor_factory)
+    if not use_arrow:
+        # Row tuples carry the driver's Python values, not the Arrow casts
+        expected = expected.astype({"BIRTHS": np.int64})
+    pd.testing.assert_frame_equal(builder.finish(), expected)
+
+
+class ChunkedCursor:
+    """Cursor that streams server-sized Arrow chunks, like Snowflake's."""
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    def fetch_arrow_batches(self):
+        """Yield the chunks as they come."""
+        yield from self.tables
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_server_sized_chunks_are_passed_through(cursor_factory):
+    """Drivers that pick their own chunk size are not re-batched."""
+    table = cursor_factory().fetch_arrow_table()
+    chunks = [table.slice(0, 40), table.slice(40, 60), table.slice(100)]
+    batches = list(iter_frame_batches(ChunkedCursor(chunks), batch_rows=10))
+    assert [len(batch) for batch in batches] == [40, 60, 3]
+    builder = LongFrameBuilder()
+    for batch in batches:
+        builder.add_batch(batch)
+    pd.testing.assert_frame_equal(builder.finish(), single_fetch(cursor_factory))
+
+
+def test_categories_are_rebuilt_from_every_batch():
+    """Batches with different categories give one column holding all of them."""
+    builder = LongFrameBuilder()
+    builder.add_batch(pd.DataFrame({"STATE_NAME": pd.Categorical(["Utah", "Idaho"])}))
+    builder.add_batch(pd.DataFrame({"STATE_NAME": pd.Categorical(["Texas"])}))
+    states = builder.finish()["STATE_NAME"]
+    assert list(states) == ["Utah", "Idaho", "Texas"]
+    assert sorted(states.cat.categories) == ["Idaho", "Texas", "Utah"]
+
+
+def test_empty_result_keeps_no_rows():
+    """A builder that saw no batches finishes as an empty frame."""
+    assert LongFrameBuilder().finish().empty
+    assert list(LongFrameBuilder(["YEAR"]).finish().columns) == ["YEAR"]
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("batch_rows", [7, 500, 10**6])
+@pytest.mark.parametrize("states", [["Utah"], ["Utah", "Idaho", "Texas"]])
+def test_streamed_loads_match_a_single_fetch(seed_pool, batch_rows, states):
+    """The loader streams to the same frame it builds from one fetch."""
+    retrival_parameters = RetrivalParameters(specific_states=states)
+    expected = RawDataLoader(
+        connection_pool=seed_pool, fetch_once=False
+    ).get_full_database(retrival_parameters)
+    streamed = RawDataLoader(
+        connection_pool=seed_pool, fetch_once=False, stream_batch_rows=batch_rows
+    ).get_full_database(retrival_parameters)
+    pd.testing.assert_frame_equal(streamed, expected)
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from population_data_analysis.pipeline_operations.data_transformations.data_transformation_config_objects import (
+    DataTransformationOptions,
+    WalkForwardOptions,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_modules.walk_forward import (
+    WindowMoments,
+    fold_bounds,
+)
+from population_data_analysis.pipeline_operations.data_transformations.data_transformations_sdk import (
+    DataTransformationsSDK,
+)
+
+
+def wide_frame(seed=0, n_rows=30):
+    """Wide frame with growing, signed and skewed columns."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "YEAR": np.arange(1990, 1990 + n_rows),
+            "Utah/POPULATION": 1e5 * np.exp(np.linspace(0, 1, n_rows))
+            + rng.normal(0, 100, n_rows),
+            "Idaho/MIGRATION": rng.normal(0, 10, n_rows),
+            "Idaho/BIRTHS": rng.lognormal(0, 1.5, n_rows),
+        }
+    )
+
+
+def test_window_moments_match_pandas():
+    """Every window's means and stds agree with pandas, constant windows getting std 1."""
+    rng = np.random.default_rng(0)
+    values = np.column_stack(
+        [
+            1e6 + rng.normal(size=20),
+            np.repeat([2.0, 5.0], 10),
+            rng.normal(size=20),
+        ]
+    )
+    values[[3, 11], 2] = np.nan
+    moments = WindowMoments(values)
+    for start in range(0, 18):
+        for stop in range(start + 2, 21):
+            means, stds = moments.window(start, stop)
+            block = pd.DataFrame(values[start:stop])
+            expected_stds = block.std().to_numpy()
+            expected_stds = np.where(expected_stds != 0, expected_stds, 1.0)
+            np.testing.assert_allclose(means, block.mean().to_numpy(), rtol=1e-12)
+            np.testing.assert_allclose(stds, expected_stds, rtol=1e-7)
+
+
+@pytest.mark.parametrize(
+    ("train_test_split", "options", "expected"),
+    [
+        (0.8, WalkForwardOptions(), [(0, 8, 9), (0, 9, 10)]),
+        (
+            0.8,
+            WalkForwardOptions(window="rolling", train_rows=3, test_rows=2),
+            [(5, 8, 10)],
+        ),
+        (
+            0.6,
+            WalkForwardOptions(window="rolling", step=3),
+            [(0, 6, 7), (3, 9, 10)],
+        ),
+    ],
+)
+def test_fold_bounds(train_test_split, options, expected):
+    """Origins start at the split point and move by step while test rows remain."""
+    assert fold_bounds(10, train_test_split, options) == expected
+
+
+def test_fold_bounds_without_room_for_a_test_window():
+    """A split that leaves fewer rows than test_rows is rejected."""
+    with pytest.raises(ValueError):
+        fold_bounds(10, 0.8, WalkForwardOptions(test_rows=3))
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize(
+    "walk_forward_options",
+    [
+        WalkForwardOptions(test_rows=2),
+        WalkForwardOptions(window="rolling", step=2, test_rows=3),
+    ],
+)
+def test_folds_are_z_scored_by_their_own_training_rows(walk_forward_options):
+    """Each fold is the unscaled transformation standardized by its training rows."""
+    df = wide_frame()
+    options = DataTransformationOptions(jitter=0.0, train_test_split=0.6)
+    sdk = DataTransformationsSDK()
+    folds = sdk.walk_forward(df, options, walk_forward_options)
+    unscaled = sdk.data_transformer.normalize_data(
+        df, options.model_copy(update={"z_normalize": "never"})
+    )
+    assert len(folds) > 1
+    for fold in folds:
+        train = unscaled.iloc[fold.train_start_row : fold.test_start_row]
+        test = unscaled.iloc[
+            fold.test_start_row : fold.test_start_row + len(fold.test_data)
+        ]
+        pd.testing.assert_frame_equal(
+            fold.train_data, (train - train.mean()) / train.std(), rtol=1e-10
+        )
+        pd.testing.assert_frame_equal(
+            fold.test_data, (test - train.mean()) / train.std(), rtol=1e-10
+        )
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("log", ["always", "never"])
+def test_fold_forecasts_restore_to_the_input_rows(log):
+    """Perfect forecasts of each fold's test rows map back to the input's rows."""
+    df = wide_frame(1)
+    options = DataTransformationOptions(jitter=0.0, log=log)
+    sdk = DataTransformationsSDK()
+    folds = sdk.walk_forward(df, options, WalkForwardOptions(test_rows=2))
+    for fold in folds:
+        actual, restored = sdk.to_scoring_space(
+            fold.test_data,
+            fold.test_data.to_numpy(),
+            original_units=True,
+            fold=fold,
+        )
+        np.testing.assert_allclose(restored, actual.to_numpy(), rtol=1e-10)
+        pd.testing.assert_frame_equal(
+            actual,
+            df[fold.test_data.columns].iloc[
+                fold.test_start_row + 1 : fold.test_start_row + 3
+            ],
+        )
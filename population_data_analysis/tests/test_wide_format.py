@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from population_data_analysis.pipeline_operations.raw_dataset_loader.raw_data_loader_modules.wide_format import (
+    IncrementalWideBuilder,
+    long_to_wide,
+)
+
+STATES = ["Utah", "Idaho", "Alabama", "Texas"]
+FEATURES = ["POPULATION", "BIRTHS", "DEATHS"]
+
+
+def long_table(seed, missing=0):
+    """Shuffled long (year, state, features) table with missing (year, state) rows."""
+    rng = np.random.default_rng(seed)
+    years, states = np.meshgrid(np.arange(2000, 2012), STATES, indexing="ij")
+    df = pd.DataFrame({"YEAR": years.ravel(), "STATE_NAME": states.ravel()})
+    for feature in FEATURES:
+        df[feature] = rng.normal(size=len(df))
+    df = df.sample(frac=1.0, random_state=seed)
+    return df.iloc[missing:].reset_index(drop=True)
+
+
+def pivot_reference(df):
+    """The pivot the loader used before the wide matrix existed."""
+    pivoted = df.pivot(index="YEAR", columns="STATE_NAME", values=FEATURES)
+    pivoted.columns = [f"{state}/{feature}" for feature, state in pivoted.columns]
+    frame = pivoted.reset_index(drop=False)
+    for col in frame.columns:
+        if col != "YEAR":
+            frame[col] = frame[col].astype(float)
+    return frame
+
+
+def assert_matches_pivot(frame, df):
+    """Compare a flattened wide matrix against the pivot of the same rows."""
+    pd.testing.assert_frame_equal(
+        frame,
+        pivot_reference(df),
+        check_column_type=False,
+        check_index_type=False,
+    )
+
+
+@pytest.mark.parametrize(("seed", "missing"), [(0, 0), (1, 5), (2, 17)])
+def test_long_to_wide_matches_pivot(seed, missing):
+    """long_to_wide lays out values and gaps exactly as the pivot does."""
+    df = long_table(seed, missing)
+    assert_matches_pivot(long_to_wide(df).to_frame(), df)
+
+
+@pytest.mark.parametrize(("seed", "batch_size"), [(0, 1), (1, 7), (2, 100)])
+def test_incremental_builder_matches_pivot(seed, batch_size):
+    """Building from batches gives the same matrix as one long_to_wide call."""
+    df = long_table(seed, missing=3)
+    builder = IncrementalWideBuilder()
+    for start in range(0, len(df), batch_size):
+        builder.add_batch(df.iloc[start : start + batch_size])
+    wide = builder.finish()
+    assert_matches_pivot(wide.to_frame(), df)
+    np.testing.assert_array_equal(wide.observed, long_to_wide(df).observed)
+
+
+@pytest.mark.parametrize("states", [["Utah"], ["Texas", "Idaho"]])
+def test_select_states_matches_pivot_of_their_rows(states):
+    """Selecting states is the pivot of only those states' rows."""
+    df = long_table(3, missing=9)
+    subset = df[df["STATE_NAME"].isin(states)]
+    assert_matches_pivot(long_to_wide(df).select_states(states).to_frame(), subset)
+
+
+def test_duplicate_rows_are_rejected():
+    """A repeated (year, state) row raises like the pivot does."""
+    df = long_table(0)
+    duplicated = pd.concat([df, df.iloc[:1]])
+    with pytest.raises(ValueError):
+        long_to_wide(duplicated)
+    builder = IncrementalWideBuilder()
+    builder.add_batch(df)
+    with pytest.raises(ValueError):
+        builder.add_batch(df.iloc[:1])